@@ -2,4 +2,5 @@ from host import Host, CongestionControl
 from link import Link
 from packet_types import Packet, AckPacket
 from router import Router
+from routing_protocol import RoutingProtocol
 from network import Network
@@ -0,0 +1,262 @@
+import math
+import random
+
+from components.packet_types import FlowPacket, Packet
+
+
+class AQM:
+    """
+    Active queue management policies of a link buffer
+    """
+    # Only drop when the buffer is full
+    TAIL_DROP = "taildrop"
+    # Random early detection, drops early based on the average queue length
+    RED = "red"
+    # Controlled delay, drops when packets stay in the queue too long
+    CODEL = "codel"
+
+    ALL = [TAIL_DROP, RED, CODEL]
+
+    @staticmethod
+    def create(policy, link, parameters=None, seed=None, ecn=False):
+        """
+        Creates the AQM of one direction of a link
+
+        :param policy: Name of the policy
+        :type policy: str
+        :param link: Link the queue belongs to
+        :type link: Link
+        :param parameters: Overrides of the policy's constants
+        :type parameters: dict[str, object]
+        :param seed: Seed of RED's random generator
+        :type seed: int
+        :param ecn: Whether to mark ECN capable packets instead of dropping
+        :type ecn: bool
+        :return: AQM
+        :rtype: TailDrop
+        """
+        if policy == AQM.TAIL_DROP:
+            return TailDrop(link, parameters, ecn)
+        if policy == AQM.RED:
+            return RED(link, parameters, seed, ecn)
+        if policy == AQM.CODEL:
+            return CoDel(link, parameters, ecn)
+        raise ValueError("Unknown AQM %s. Known: %s"
+                         % (policy, ", ".join(AQM.ALL)))
+
+
+class TailDrop(object):
+    def __init__(self, link, parameters=None, ecn=False):
+        """
+        Queue management of one direction of a link. The buffer asks it
+        whether to drop each packet when it's queued and which packet to send
+        when the link frees up. This one never drops, the link drops what
+        doesn't fit in the buffer.
+
+        Args:
+            link (Link):            Link the queue belongs to.
+            parameters (dict):      Overrides of the policy's constants,
+                                    e.g. {"TARGET": 10}.
+            ecn (bool):             Whether to mark ECN capable packets
+                                    instead of dropping them.
+        """
+        self.link = link
+        self.ecn = ecn
+        for parameter, value in (parameters or {}).items():
+            if not parameter.isupper() or not hasattr(self, parameter):
+                raise ValueError("%s has no parameter %s"
+                                 % (self.__class__.__name__, parameter))
+            setattr(self, parameter, value)
+        # Packets dropped and marked by the policy
+        self.drops = 0
+        self.marks = 0
+
+    def mark(self, packet):
+        """
+        Marks the packet congestion experienced, if ECN is on and the packet
+        supports it
+
+        :param packet: Packet that would be dropped
+        :type packet: Packet
+        :return: True if the packet was marked and shouldn't be dropped
+        :rtype: bool
+        """
+        if not self.ecn or packet.ecn == Packet.NOT_ECT:
+            return False
+        packet.ecn = Packet.CE
+        self.marks += 1
+        return True
+
+    def drop_on_enqueue(self, queue, packet, time):
+        """
+        Whether to drop a packet instead of queuing it
+
+        :param queue: Queue the packet would join
+        :type queue: FIFOScheduler
+        :param packet: Arriving packet
+        :type packet: Packet
+        :param time: Arrival time
+        :type time: float
+        :rtype: bool
+        """
+        return False
+
+    def dequeue(self, queue, time):
+        """
+        Takes the next packet to send from the queue
+
+        :param queue: Queue to take the packet from
+        :type queue: FIFOScheduler
+        :param time: Time the link is free
+        :type time: float
+        :return: (packet, entry time) to send, None if there's nothing left,
+                 and the (packet, entry time) that were dropped instead
+        :rtype: ((Packet, float), list[(Packet, float)])
+        """
+        return queue.pop(), []
+
+
+class RED(TailDrop):
+    # EWMA weight of the instantaneous queue length
+    WEIGHT = 0.002
+    # Average queue lengths, as fractions of the buffer size, between which
+    # packets are dropped with a probability growing up to MAX_P
+    MIN_THRESHOLD = 0.25
+    MAX_THRESHOLD = 0.75
+    MAX_P = 0.1
+
+    def __init__(self, link, parameters=None, seed=None, ecn=False):
+        """
+        Random early detection. Drops arriving packets with a probability
+        that grows with the average queue length, so flows back off at
+        different times instead of all losing packets once the buffer fills.
+        With ECN, those packets are marked instead; above the maximum
+        threshold they're dropped all the same.
+        """
+        super(RED, self).__init__(link, parameters, ecn)
+        self.random = random.Random(seed)
+        self.min_bytes = self.MIN_THRESHOLD * link.buffer_size
+        self.max_bytes = self.MAX_THRESHOLD * link.buffer_size
+        # Average queue length, in bytes
+        self.average = 0.
+        # Packets queued since the last drop
+        self.count = -1
+        # Time the queue became empty, None while it isn't
+        self.idle_since = 0.
+        # Time to send a full packet, the queue "drains" one per idle period
+        self.packet_time = FlowPacket.FLOW_PACKET_SIZE * 8 / (link.rate * 1e3)
+
+    def drop_on_enqueue(self, queue, packet, time):
+        if self.idle_since is not None:
+            # The average decays as if empty packets were sent while idle
+            idle_packets = (time - self.idle_since) / self.packet_time
+            self.average *= (1 - self.WEIGHT) ** idle_packets
+            self.idle_since = None
+        self.average += self.WEIGHT * (queue.bytes - self.average)
+
+        if self.average < self.min_bytes:
+            self.count = -1
+            return False
+        if self.average >= self.max_bytes:
+            self.count = 0
+            self.drops += 1
+            return True
+        self.count += 1
+        p_b = self.MAX_P * (self.average - self.min_bytes) / \
+            (self.max_bytes - self.min_bytes)
+        # Spreads the drops evenly instead of in bursts
+        p_a = p_b / max(1 - self.count * p_b, p_b)
+        if self.random.random() < p_a:
+            self.count = 0
+            if self.mark(packet):
+                return False
+            self.drops += 1
+            return True
+        return False
+
+    def dequeue(self, queue, time):
+        item = queue.pop()
+        if not len(queue):
+            self.idle_since = time
+        return item, []
+
+
+class CoDel(TailDrop):
+    # Acceptable standing queue delay, in ms
+    TARGET = 5.
+    # Time the delay must stay above the target before dropping, in ms
+    INTERVAL = 100.
+
+    def __init__(self, link, parameters=None, ecn=False):
+        """
+        Controlled delay. Looks at how long dequeued packets waited: once
+        every packet for INTERVAL waited more than TARGET, it drops one and
+        then drops more and more often, at INTERVAL / sqrt(drops), until the
+        delay goes back under TARGET. With ECN, packets that support it are
+        marked and sent instead.
+        """
+        super(CoDel, self).__init__(link, parameters, ecn)
+        # Time the delay will have been above the target for an interval
+        self.first_above_time = 0.
+        # Whether we're in the dropping state, and when to drop next
+        self.dropping = False
+        self.drop_next = 0.
+        # Drops since entering the dropping state, and at the last exit
+        self.count = 0
+        self.last_count = 0
+
+    def control_law(self, time):
+        return time + self.INTERVAL / math.sqrt(self.count)
+
+    def ok_to_drop(self, queue, item, time):
+        """
+        Whether the delay of the dequeued packet has been above the target
+        for an interval
+        """
+        if item is None:
+            self.first_above_time = 0.
+            return False
+        sojourn_time = time - item[1]
+        if sojourn_time < self.TARGET or \
+                queue.bytes <= FlowPacket.FLOW_PACKET_SIZE:
+            # Good queue, or too short to be standing
+            self.first_above_time = 0.
+            return False
+        if self.first_above_time == 0:
+            self.first_above_time = time + self.INTERVAL
+            return False
+        return time >= self.first_above_time
+
+    def dequeue(self, queue, time):
+        dropped = []
+        item = queue.pop()
+        ok_to_drop = self.ok_to_drop(queue, item, time)
+        if self.dropping:
+            if not ok_to_drop:
+                self.dropping = False
+            while self.dropping and time >= self.drop_next:
+                self.count += 1
+                if self.mark(item[0]):
+                    self.drop_next = self.control_law(self.drop_next)
+                    break
+                dropped.append(item)
+                item = queue.pop()
+                if not self.ok_to_drop(queue, item, time):
+                    self.dropping = False
+                else:
+                    self.drop_next = self.control_law(self.drop_next)
+        elif ok_to_drop:
+            if not self.mark(item[0]):
+                dropped.append(item)
+                item = queue.pop()
+            self.dropping = True
+            # Drop faster right away if we recently left the dropping state
+            delta = self.count - self.last_count
+            if delta > 1 and time - self.drop_next < 16 * self.INTERVAL:
+                self.count = delta
+            else:
+                self.count = 1
+            self.drop_next = self.control_law(time)
+            self.last_count = self.count
+        self.drops += len(dropped)
+        return item, dropped
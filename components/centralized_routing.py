@@ -0,0 +1,86 @@
+from events import EventTarget
+from events.event_types import UpdateCentralizedRoutingEvent
+from utils import Logger
+from utils.shortest_paths import dijkstra
+
+
+class CentralizedRouting(EventTarget):
+    # Interval between dynamic routing table updates, in ms
+    DYNAMIC_UPDATE_INTERVAL = 3000
+
+    def __init__(self, routers, links):
+        """
+        Computes the routing tables of the given routers from the whole
+        topology with Dijkstra and installs them directly, without routing
+        packets.
+
+        Args:
+            routers (Router[]):     Routers whose tables are computed.
+            links (Link[]):         Every link of the network.
+        """
+        super(CentralizedRouting, self).__init__()
+        self.routers = routers
+        self.links = links
+        # Packets are only forwarded through routers, never through hosts
+        self.transit = set(router.id for router in routers)
+        self.dynamic_routers = [r for r in routers if r.dynamicEnabled]
+
+    def __repr__(self):
+        return "CentralizedRouting[%d routers]" % len(self.routers)
+
+    def graph(self, dynamic):
+        """
+        Adjacency of the network with static or dynamic link costs
+
+        :param dynamic: Whether to use the dynamic link costs
+        :type dynamic: bool
+        :return: { node_id : [(neighbor_id, cost, link)] }
+        :rtype: dict[str, list[(str, float, Link)]]
+        """
+        graph = {}
+        for link in self.links:
+            cost = link.dynamic_cost() if dynamic else link.static_cost()
+            graph.setdefault(link.node1.id, []).append(
+                (link.node2.id, cost, link))
+            graph.setdefault(link.node2.id, []).append(
+                (link.node1.id, cost, link))
+        return graph
+
+    def install_tables(self, routers, dynamic):
+        graph = self.graph(dynamic)
+        for router in routers:
+            router.install_routes(dijkstra(graph, router.id, self.transit),
+                                  dynamic)
+
+    def start(self, time):
+        """
+        Installs the initial tables and schedules the dynamic updates
+
+        :param time: Current time
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        static_routers = [r for r in self.routers if not r.dynamicEnabled]
+        self.install_tables(static_routers, dynamic=False)
+        # Nothing is buffered yet, dynamic costs are the static ones
+        self.install_tables(self.dynamic_routers, dynamic=True)
+        Logger.debug(time, "%s: routing tables installed." % self)
+        if self.dynamic_routers:
+            self.add_timer(UpdateCentralizedRoutingEvent(None, self), time,
+                           self.DYNAMIC_UPDATE_INTERVAL)
+
+    def update_dynamic_tables(self, time):
+        """
+        Recomputes the dynamic routing tables from the current link costs
+
+        :param time: Current time
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        for link in self.links:
+            link.fix_dynamic_cost(time)
+        self.install_tables(self.dynamic_routers, dynamic=True)
+        for link in self.links:
+            link.reset_dynamic_cost(time)
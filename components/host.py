@@ -1,17 +1,34 @@
-from components.packet_types import AckPacket, Packet, RoutingPacket, FlowPacket
+from components.packet_types import AckPacket, Packet, RoutingPacket, \
+    FlowPacket, DatagramPacket
 from events.event_types import PacketSentToLinkEvent, FlowStartEvent
 from events.event_types.timeout_event import TimeoutEvent
-from events.event_types.graph_events import WindowSizeEvent, RTTEvent
 from errors import UnhandledPacketType
+from collections import deque, namedtuple
+
 from utils import Logger
+from utils.metrics_store import Metric
 from node import Node
-from congestion_control import NullProtocol, TCPTahoe, TCPReno, FAST_TCP
+from pacer import Pacer
+from congestion_control import get_protocol, RTTEstimator
+
+
+# Flow completed by a host, times in ms and size in bytes
+FlowCompletion = namedtuple("FlowCompletion",
+                            ["flow_id", "size", "arrival", "completion"])
+
 
 class CongestionControl:
-    NONE = 0
-    TAHOE = 1
-    RENO = 2
-    FAST = 3
+    """
+    Names of the built-in congestion control protocols. Any other registered
+    protocol name, or the dotted path to a Protocol subclass, works as well.
+    """
+    NONE = "NONE"
+    TAHOE = "TAHOE"
+    RENO = "RENO"
+    FAST = "FAST"
+    BBR = "BBR"
+    VEGAS = "VEGAS"
+    NEWRENO = "NEWRENO"
 
 
 class Host(Node):
@@ -27,7 +44,19 @@ class Host(Node):
         super(Host, self).__init__(identifier)
         self.link = None
         self.flow = None
+        # Time the flow arrived, which is before it started if it was queued
+        self.flow_arrival = None
+        # Flows waiting for the current one to complete, oldest first
+        self.pending_flows = deque()
+        # FlowCompletion of every flow this host finished sending
+        self.completed_flows = []
+        # Unreliable traffic sources (CBR, on/off) sent alongside the flow
+        self.sources = []
         self.congestion_control = None
+        # Traffic class of the packets of the flow
+        self.traffic_class = Packet.TRAFFIC_CLASS
+        # Whether the packets of the flow are ECN capable
+        self.ecn = False
         # Congestion window size.
         self.cwnd = None
         # Sequence Number / Base / Maximum
@@ -36,9 +65,16 @@ class Host(Node):
         self.current_request_num = None
         # Request Number, held by RECEIVER
         self.request_nums = {}
+        # Flows received completely, late packets of theirs are dropped
+        self.finished_flows = set()
 
+        # { packet key : (packet, sent time) } of the unacknowledged packets
         self.awaiting_ack = {}
         self.queue = set()
+        # Spaces out transmissions if the congestion control asks for it
+        self.pacer = Pacer(self)
+        # RTT estimate of the flow, shared with the congestion control
+        self.rtt_estimator = RTTEstimator()
 
     def __repr__(self):
         return "Host[%s]" % self.id
@@ -56,38 +92,153 @@ class Host(Node):
         self.link = link
 
     def set_flow(self, flow_id, destination, amount, start,
-                 congestion_method=CongestionControl.NONE):
+                 congestion_method=CongestionControl.NONE, parameters=None,
+                 pacing=False, traffic_class=Packet.TRAFFIC_CLASS, ecn=False):
+        """
+        Sets the flow sent by this host
+
+        :param flow_id: Flow identifier
+        :type flow_id: str
+        :param destination: Host the flow is sent to
+        :type destination: Host
+        :param amount: Amount of data to send, in MB
+        :type amount: float
+        :param start: Start time of the flow, in s
+        :type start: float
+        :param congestion_method: Name of the congestion control protocol
+        :type congestion_method: str
+        :param parameters: Overrides of the protocol's constants for this flow
+        :type parameters: dict[str, object]
+        :param pacing: Whether to pace the flow at cwnd / RTT if the protocol
+                       doesn't pace it itself
+        :type pacing: bool
+        :param traffic_class: Traffic class of the flow's packets and ACKs
+        :type traffic_class: int
+        :param ecn: Whether the flow's packets are ECN capable, congestion is
+                    then signalled by marks echoed in the ACKs
+        :type ecn: bool
+        :return: Nothing
+        :rtype: None
+        """
         byte_amount = int(amount * 1024 * 1024)
-        if congestion_method == CongestionControl.TAHOE:
-            self.congestion_control = TCPTahoe(self)
-        elif congestion_method == CongestionControl.RENO:
-            self.congestion_control = TCPReno(self)
-        elif congestion_method == CongestionControl.FAST:
-            self.congestion_control = FAST_TCP(self)
-        else:
-            self.congestion_control = NullProtocol(self)
+        protocol = get_protocol(congestion_method)
+        if ecn and not protocol.ECN_CAPABLE:
+            raise ValueError("%s doesn't react to ECN, flow %s can't use it."
+                             % (congestion_method, flow_id))
+        self.congestion_control = protocol(self, parameters)
         self.cwnd = self.congestion_control.INITIAL_CWND
+        self.pacer.enabled = pacing
+        self.traffic_class = traffic_class
+        self.ecn = ecn
         self.flow = (flow_id, destination, byte_amount, start, congestion_method)
+        self.flow_arrival = start * 1000.
+
+        # Sender state left over from a previous flow
+        self.sequence_nums = (0, 0, Host.SEQ_MAX)
+        self.current_request_num = None
+        self.awaiting_ack = {}
+        self.queue = set()
+        self.rtt_estimator = RTTEstimator()
+
+    def queue_flow(self, time, flow_id, destination, amount,
+                   congestion_method=CongestionControl.NONE, parameters=None,
+                   pacing=False, traffic_class=Packet.TRAFFIC_CLASS,
+                   ecn=False):
+        """
+        Starts a flow arriving at the given time, or queues it until the flows
+        that arrived before it are complete. See set_flow for the arguments.
+        """
+        flow = (time, flow_id, destination, amount, congestion_method,
+                parameters, pacing, traffic_class, ecn)
+        self.pending_flows.append(flow)
+        if self.flow is None:
+            self.start_next_flow(time)
+
+    def start_next_flow(self, time):
+        """
+        Starts the oldest flow waiting for the host
+
+        :param time: Current time
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        arrival, flow_id, destination, amount, congestion_method, \
+            parameters, pacing, traffic_class, ecn = \
+            self.pending_flows.popleft()
+        self.set_flow(flow_id, destination, amount, time / 1000.,
+                      congestion_method, parameters, pacing, traffic_class, ecn)
+        self.flow_arrival = arrival
+        self.begin_flow()
+
+    def finish_flow(self, time):
+        """
+        Records the completion of the current flow, drops its state and
+        starts the next waiting flow, if any
+
+        :param time: Time the last ACK of the flow was received
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        flow_id, destination, byte_amount, _, _ = self.flow
+        Logger.info(time, "Flow %s complete, %d bytes in %0.2fms"
+                    % (flow_id, byte_amount, time - self.flow_arrival))
+        self.completed_flows.append(FlowCompletion(
+            flow_id, byte_amount, self.flow_arrival, time))
+        # There is no FIN, the receiver is told directly
+        destination.request_nums.pop(flow_id, None)
+        destination.finished_flows.add(flow_id)
+        # Late packets of the flow are dropped without looking up their key
+        Packet.FLOW_INTERNER.release(flow_id)
+
+        self.flow = None
+        self.congestion_control = None
+        self.awaiting_ack = {}
+        self.queue = set()
+        if self.pending_flows:
+            self.start_next_flow(time)
 
+    def add_source(self, source):
+        """
+        Adds an unreliable traffic source sent by this host
+
+        :param source: Traffic source
+        :type source: CBRSource
+        :return: Nothing
+        :rtype: None
+        """
+        self.sources.append(source)
 
     def set_window_size(self, time, value):
         flow_id = self.flow[0]
         Logger.info(time, "Window size changed from %0.2f -> %0.2f for flow %s" % (self.cwnd, value, flow_id))
         self.cwnd = value
-        self.dispatch(WindowSizeEvent(time, flow_id, self.cwnd))
+        self.record_metric(Metric.WINDOW_SIZE, flow_id, time, self.cwnd)
 
     def start_flow(self):
-        if self.flow is None:
-            return
+        for source in self.sources:
+            source.start()
+        if self.flow is not None:
+            self.begin_flow()
+
+    def begin_flow(self):
+        """
+        Schedules the start of the current flow
+        """
         flow_id, destination, amount, start, congestion_method = self.flow
         time = start * 1000.
         self.dispatch(FlowStartEvent(time, self, flow_id))
-        self.dispatch(WindowSizeEvent(time, flow_id, self.cwnd))
+        self.record_metric(Metric.WINDOW_SIZE, flow_id, time, self.cwnd)
 
     def send_packets(self, time, flow_id):
         flow_id, destination, flow_amount, start, congestion_method = self.flow
         # We want to fill up our window
         while len(self.awaiting_ack) < self.cwnd:
+            if not self.pacer.ready(time):
+                # Too early for the next packet, have the pacer wake us up
+                self.pacer.schedule(time)
+                return
             # If there is nothing being retransmitted, add new flow packets
             if len(self.queue) == 0:
                 Sn, Sb, Sm = self.sequence_nums
@@ -103,23 +254,28 @@ class Host(Node):
                     size = FlowPacket.FLOW_PACKET_SIZE
 
                 packet = FlowPacket(flow_id, Sn, size, self, destination)
+                packet.traffic_class = self.traffic_class
+                if self.ecn:
+                    packet.ecn = Packet.ECT
 
                 Sn += 1
                 self.sequence_nums = (Sn, Sb, Sm)
 
-                if packet.id in self.awaiting_ack or \
+                if packet.key in self.awaiting_ack or \
                    packet.sequence_number < self.current_request_num:
                     # We already sent it out
                     continue
 
                 self.send(packet, time)
                 self.congestion_control.handle_send(packet, time)
+                self.pacer.packet_sent(packet, time)
             else:
                 # We need to retransmit packets
                 to_send = sorted(self.queue, key=lambda p: p.sequence_number)[0]
                 self.queue.remove(to_send)
                 self.send(to_send, time)
                 self.congestion_control.handle_send(to_send, time)
+                self.pacer.packet_sent(to_send, time)
 
     def send(self, packet, time):
         """
@@ -135,14 +291,55 @@ class Host(Node):
         assert self.link, "Can't send anything when link hasn't been connected"
         # Send the packet
         self.dispatch(PacketSentToLinkEvent(time, self, packet, self.link))
-        # Still awaiting Ack on receipt of this package
-        self.awaiting_ack[packet.id] = (packet, time)
+        # ACKs aren't acknowledged themselves, a lost one is covered by the
+        # next, so only flow packets wait for an Ack
         if isinstance(packet, FlowPacket):
+            # Still awaiting Ack on receipt of this package
+            self.awaiting_ack[packet.key] = (packet, time)
             # Dispatch an event to resend the package if we haven't received an
             # Ack by the timeout period
             timeout_time = time + TimeoutEvent.TIMEOUT_PERIOD
             self.dispatch(TimeoutEvent(timeout_time, self, packet))
 
+    def send_datagram(self, packet, time):
+        """
+        Sends a packet that is never acknowledged nor retransmitted
+
+        :param packet: Packet to send
+        :type packet: DatagramPacket
+        :param time: Time to send the packet
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        assert self.link, "Can't send anything when link hasn't been connected"
+        self.dispatch(PacketSentToLinkEvent(time, self, packet, self.link))
+
+    def retransmit(self, time, sequence_number):
+        """
+        Resends the outstanding packet with the given sequence number right
+        away, without waiting for it to time out
+
+        :param time: Time to resend the packet
+        :type time: float
+        :param sequence_number: Sequence number of the packet to resend
+        :type sequence_number: int
+        :return: Nothing
+        :rtype: None
+        """
+        for packet, _ in self.awaiting_ack.values():
+            if isinstance(packet, FlowPacket) and \
+               packet.sequence_number == sequence_number:
+                break
+        else:
+            # Already acknowledged, or never sent
+            return
+        Logger.info(time, "Fast retransmit of packet %s" % packet.id)
+        if packet in self.queue:
+            self.queue.remove(packet)
+        self.send(packet, time)
+        self.congestion_control.handle_send(packet, time)
+
     def receive(self, packet, time):
         """
         Handles receipt of a packet.
@@ -159,26 +356,36 @@ class Host(Node):
         if isinstance(packet, AckPacket):
             flow_id = packet.flow_id
             Rn = packet.request_number
+            if self.flow is None or flow_id != self.flow[0]:
+                # Late ACK of a flow that is already complete
+                return
 
             if self.current_request_num is None:
                 self.current_request_num = Rn
             else:
                 self.current_request_num = max(Rn, self.current_request_num)
 
+            # Sample the RTT of the packet that triggered this ACK
+            trigger_key = packet.trigger_packet.key
+            if trigger_key in self.awaiting_ack:
+                _, sent_time = self.awaiting_ack[trigger_key]
+                self.rtt_estimator.add_sample(time, time - sent_time)
+                self.record_metric(Metric.PACKET_DELAY, flow_id, time,
+                                   time - sent_time)
+
             # Receiving request number Rn means every packet with sequence
             # number <= Rn - 1 was received, so those have been acked. No need
             # to wait for their ack or to resend.
             acked_packets = []
-            for packet_id, packet_data in self.awaiting_ack.items():
+            for packet_key, packet_data in self.awaiting_ack.items():
                 acked_packet, _ = packet_data
                 if acked_packet.sequence_number < Rn:
-                    acked_packets.append(packet_id)
-            for acked_packet_id in acked_packets:
-                acked_packet, sent_time = self.awaiting_ack[acked_packet_id]
+                    acked_packets.append(packet_key)
+            for acked_packet_key in acked_packets:
+                acked_packet, _ = self.awaiting_ack[acked_packet_key]
                 if acked_packet in self.queue:
                     self.queue.remove(acked_packet)
-                del self.awaiting_ack[acked_packet_id]
-                self.dispatch(RTTEvent(flow_id, time, time - sent_time))
+                del self.awaiting_ack[acked_packet_key]
 
             self.congestion_control.handle_receive(packet, time)
 
@@ -190,10 +397,22 @@ class Host(Node):
                 self.send_packets(time, flow_id)
             self.sequence_nums = (Sn, Sb, Sm)
 
+            if Rn * FlowPacket.FLOW_PACKET_SIZE >= self.flow[2]:
+                self.finish_flow(time)
+
         elif isinstance(packet, RoutingPacket):
             return
+        # Unreliable traffic, nothing to acknowledge
+        elif isinstance(packet, DatagramPacket):
+            return
         # Regular packet, send acknowledgment of receipt
         elif isinstance(packet, FlowPacket):
+            if packet.flow_id in self.finished_flows:
+                # Duplicate or retransmission still in flight when the flow
+                # finished, the sender no longer needs an ACK
+                Logger.info(time, "Dropped packet %s of finished flow %s"
+                            % (packet.id, packet.flow_id))
+                return
             if packet.flow_id not in self.request_nums:
                 self.request_nums[packet.flow_id] = 0
             if packet.sequence_number == self.request_nums[packet.flow_id]:
@@ -202,6 +421,8 @@ class Host(Node):
             else:
                 Logger.info(time, "Incorrect packet received from %s. Expected %d, got %d." % (packet.src, self.request_nums[packet.flow_id], packet.sequence_number))
             ack_packet = AckPacket(packet.flow_id, self, packet.src, self.request_nums[packet.flow_id], packet)
+            ack_packet.traffic_class = packet.traffic_class
+            ack_packet.ece = packet.ecn == Packet.CE
             self.send(ack_packet, time)
         # Ignore routing packets
         else:
@@ -218,11 +439,15 @@ class Host(Node):
         :type packet: Packet
         """
         # We already received an Ack for it
-        if packet.id not in self.awaiting_ack:
+        if packet.key not in self.awaiting_ack:
             return
-        else:
-            # Otherwise, remove it so that it will be added again
-            del self.awaiting_ack[packet.id]
+        _, sent_time = self.awaiting_ack[packet.key]
+        if time < sent_time + TimeoutEvent.TIMEOUT_PERIOD:
+            # This timeout is for an earlier transmission, the packet has been
+            # retransmitted since
+            return
+        # Otherwise, remove it so that it will be added again
+        del self.awaiting_ack[packet.key]
 
         if not isinstance(packet, FlowPacket):
             # If an ACK packet is dropped, don't worry about it, it'll be sent
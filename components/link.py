@@ -1,13 +1,18 @@
 from components import Host
 from events import EventTarget
 from events.event_types import PacketSentOverLinkEvent, LinkFreeEvent
-from events.event_types.graph_events import DroppedPacketEvent, LinkThroughputEvent
+from aqm import AQM
 from link_buffer import LinkBuffer
+from link_scheduler import Scheduler
 from utils import Logger
+from utils.metrics_store import Metric
 
 
 class Link(EventTarget):
-    def __init__(self, identifier, rate, delay, buffer_size, node1, node2):
+    def __init__(self, identifier, rate, delay, buffer_size, node1, node2,
+                 scheduler=Scheduler.FIFO, scheduler_key=Scheduler.BY_FLOW,
+                 weights=None, aqm=AQM.TAIL_DROP, aqm_parameters=None,
+                 seed=None, ecn=False):
         """
         A network link.
 
@@ -18,6 +23,16 @@ class Link(EventTarget):
             buffer_size (int):          The buffer size, in KB.
             node1 (Node):               The first endpoint of the link.
             node2 (Node):               The second endpoint of the link.
+            scheduler (str):            Order buffered packets are sent in.
+            scheduler_key (str):        Whether DRR shares the link between
+                                        flows or traffic classes.
+            weights (dict):             DRR weights of the flows or classes.
+            aqm (str):                  Queue management of the buffer.
+            aqm_parameters (dict):      Overrides of the AQM's constants,
+                                        e.g. {"TARGET": 10}.
+            seed (int):                 Seed of the AQM's random generator.
+            ecn (bool):                 Whether the AQM marks ECN capable
+                                        packets instead of dropping them.
         """
         super(Link, self).__init__()
 
@@ -36,7 +51,8 @@ class Link(EventTarget):
         self.current_dir = None
 
         # The buffer of packets going towards node 1 or node 2
-        self.buffer = LinkBuffer(self)
+        self.buffer = LinkBuffer(self, scheduler, scheduler_key, weights,
+                                 aqm, aqm_parameters, seed, ecn)
 
         # Bytes sent over this link
         self.bytesSent = 0.0
@@ -148,11 +164,16 @@ class Link(EventTarget):
             if self.buffer.size() >= self.buffer_size:
                 # Drop packet if buffer is full
                 Logger.debug(time, "Buffer full; packet %s dropped." % packet)
-                self.dispatch(DroppedPacketEvent(time, self.id))
+                self.buffer.overflowDrops += 1
+                self.record_metric(Metric.DROPPED_PACKETS, self.id, time, 1)
+                return
+            if self.buffer.drop_early(packet, dst_id, time):
+                Logger.debug(time, "AQM dropped packet %s." % packet)
+                self.record_metric(Metric.DROPPED_PACKETS, self.id, time, 1)
                 return
             self.buffer.add_to_buffer(packet, dst_id, time)
         else:
-            if not from_free and self.buffer.buffers[dst_id] != []:
+            if not from_free and not self.buffer.is_empty(dst_id):
                 # Since events are not necessarily executed in the order we
                 # would expect, there may be a case where the link was free
                 # (nothing on the other side and nothing currently being put
@@ -163,6 +184,9 @@ class Link(EventTarget):
                 # take the first packet instead.
                 self.buffer.add_to_buffer(packet, dst_id, time)
                 packet = self.buffer.pop_from_buffer(dst_id, time)
+                if packet is None:
+                    # The AQM dropped everything that was queued
+                    return
             Logger.debug(time, "Link %s free, sending packet %s to %s" % (self.id, packet, destination))
             self.in_use = True
             self.current_dir = dst_id
@@ -197,7 +221,8 @@ class Link(EventTarget):
         assert self.sendTime != 0, "Packet should not be received at time 0."
         throughput = (8 * self.bytesSent) / (self.sendTime / 1000)  # bits/s
         Logger.debug(time, "%s throughput is %f" % (self, throughput))
-        self.dispatch(LinkThroughputEvent(time, self.id, throughput))
+        self.record_metric(Metric.LINK_THROUGHPUT, self.id, time,
+                           throughput / 1e6)
 
     @classmethod
     def get_other_id(cls, dst_id):
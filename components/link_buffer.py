@@ -1,32 +1,55 @@
-from collections import deque
-
+from aqm import AQM
 from components.packet_types import FlowPacket
-from events.event_types.graph_events import LinkBufferSizeEvent
+from link_scheduler import Scheduler
 from utils.logger import Logger
+from utils.metrics_store import Metric
 
 
 class LinkBuffer:
     """
     :type link: Link
-    :type buffers: dict[int, deque[Packet]]
-    :type entryTimes: dict[str, int]
+    :type buffers: dict[int, FIFOScheduler]
     """
     # ID for specifying the direction of the packet. i.e. to node 1 or to node 2
     NODE_1_ID = 1
     NODE_2_ID = 2
 
-    def __init__(self, link):
+    def __init__(self, link, scheduler=Scheduler.FIFO, key=Scheduler.BY_FLOW,
+                 weights=None, aqm=AQM.TAIL_DROP, aqm_parameters=None,
+                 seed=None, ecn=False):
+        """
+        Buffer of the packets waiting for a link, with a queue per direction
+        served by the given scheduler and managed by the given AQM.
+
+        Args:
+            link (Link):            Link the buffer belongs to.
+            scheduler (str):        Scheduling discipline of each direction.
+            key (str):              Whether DRR serves flows or classes.
+            weights (dict):         DRR weights of the flows or classes.
+            aqm (str):              Queue management policy.
+            aqm_parameters (dict):  Overrides of the policy's constants.
+            seed (int):             Seed of the policy's random generator.
+            ecn (bool):             Whether the policy marks ECN capable
+                                    packets instead of dropping them.
+        """
         self.link = link
         self.buffers = {
-            self.NODE_1_ID: deque(),
-            self.NODE_2_ID: deque()
+            self.NODE_1_ID: Scheduler.create(scheduler, key, weights),
+            self.NODE_2_ID: Scheduler.create(scheduler, key, weights)
         }
+        self.aqms = {
+            self.NODE_1_ID: AQM.create(aqm, link, aqm_parameters, seed, ecn),
+            self.NODE_2_ID: AQM.create(aqm, link, aqm_parameters, seed, ecn)
+        }
+        # Packets dropped because the buffer was full
+        self.overflowDrops = 0
         # Fixed average time a packet spends in the buffer
         self.fixedAvgBufferTime = 0
         # Dynamically updated avgBufferTime
         self.avgBufferTime = 0
-        # Entry times of packets into the buffer (used for avgBufferTime calc.)
-        self.entryTimes = {}
+        # Packets that entered the buffer before this time aren't counted in
+        # avgBufferTime, the queues keep the entry time of every packet
+        self.bufferTimeSince = 0
 
     def __repr__(self):
         return "LinkBuffer[%s]" % self.link
@@ -43,13 +66,11 @@ class LinkBuffer:
         :type time: int
         """
         if destination_id in self.buffers:
-            self.buffers[destination_id].append((packet, time))
+            self.buffers[destination_id].push(packet, time)
         else:
             raise Exception("Packet being added to link buffer but not going "
                             "through link")
         self.update_buffer_size(time)
-        # Track packet entry into buffer
-        self.entryTimes[packet.id] = time
 
     def pop_from_buffer(self, destination_id, time):
         """
@@ -65,15 +86,50 @@ class LinkBuffer:
         if destination_id not in self.buffers:
             raise Exception("Packet being popped from nonexistent link buffer "
                             "but not going through link")
-        if len(self.buffers[destination_id]) == 0:
+        if self.is_empty(destination_id):
             return
-        packet = self.buffers[destination_id].popleft()[0]
+        item, dropped = self.aqms[destination_id].dequeue(
+            self.buffers[destination_id], time)
+        for packet, _ in dropped:
+            Logger.debug(time, "%s: AQM dropped packet %s." % (self, packet))
+            self.link.record_metric(Metric.DROPPED_PACKETS, self.link.id,
+                                    time, 1)
         self.update_buffer_size(time)
-        entry_time = self.entryTimes.pop(packet.id, None)
-        if entry_time:
+        if item is None:
+            return
+        packet, entry_time = item
+        if entry_time and entry_time >= self.bufferTimeSince:
             self.avgBufferTime = (self.avgBufferTime + (time - entry_time)) / 2
         return packet
 
+    def drop_early(self, packet, destination_id, time):
+        """
+        Whether the AQM drops the packet instead of queuing it
+
+        :param packet: Packet about to be queued
+        :type packet: Packet
+        :param destination_id: Destination where packet is going (Node 1 or 2)
+        :type destination_id: int
+        :param time: Time the packet arrived
+        :type time: float
+        :rtype: bool
+        """
+        return self.aqms[destination_id].drop_on_enqueue(
+            self.buffers[destination_id], packet, time)
+
+    def drop_statistics(self):
+        """
+        Packets lost or marked in this buffer so far
+
+        :return: { "overflow" : drops of a full buffer, "aqm" : drops of the
+                 AQM, "marked" : packets marked by the AQM }
+        :rtype: dict[str, int]
+        """
+        aqms = self.aqms.values()
+        return {"overflow": self.overflowDrops,
+                "aqm": sum(aqm.drops for aqm in aqms),
+                "marked": sum(aqm.marks for aqm in aqms)}
+
     def fix_avg_buffer_time(self, time):
         """
         Fixes the average buffer time at the given time. Should be fixed right
@@ -97,22 +153,31 @@ class LinkBuffer:
         :rtype: None
         """
         Logger.debug(time, "%s: Resetting buffer time." % self)
-        self.entryTimes = {}
+        self.bufferTimeSince = time
         self.avgBufferTime = 0
 
     def get_oldest_packet_and_time(self, destination_id):
-        return self.buffers[destination_id][0]
+        return self.buffers[destination_id].peek()
+
+    def is_empty(self, destination_id):
+        """
+        Whether no packet is waiting to go towards the given destination
+
+        :param destination_id: Destination ID (Node 1 or 2)
+        :type destination_id: int
+        :rtype: bool
+        """
+        return len(self.buffers[destination_id]) == 0
 
     def update_buffer_size(self, time):
         """
-        Dispatch event to track buffer size changes
+        Record the buffer size to track its changes
 
-        :param time: Time to execute the event
+        :param time: Time of the change
         :type time: int
         """
-        event = LinkBufferSizeEvent(time, self.link.id,
-                                    self.size() / FlowPacket.FLOW_PACKET_SIZE)
-        self.link.dispatch(event)
+        self.link.record_metric(Metric.LINK_BUFFER, self.link.id, time,
+                                self.size() / FlowPacket.FLOW_PACKET_SIZE)
 
     def size(self):
         """
@@ -121,6 +186,5 @@ class LinkBuffer:
         :return: Size of the buffer
         :rtype: int
         """
-        sum_fn = lambda total, packet_tuple: total + packet_tuple[0].size()
-        items = list(self.buffers[self.NODE_1_ID]) + list(self.buffers[self.NODE_2_ID])
-        return reduce(sum_fn, items, 0)
+        return self.buffers[self.NODE_1_ID].bytes + \
+            self.buffers[self.NODE_2_ID].bytes
@@ -0,0 +1,242 @@
+from collections import deque
+
+
+class Scheduler:
+    """
+    Disciplines deciding which buffered packet a link sends next
+    """
+    # First in, first out
+    FIFO = "fifo"
+    # Highest traffic class first, FIFO within a class
+    PRIORITY = "priority"
+    # Deficit round robin, a weighted fair queuing approximation
+    DRR = "drr"
+
+    ALL = [FIFO, PRIORITY, DRR]
+
+    # What DRR keeps separate queues for
+    BY_FLOW = "flow"
+    BY_CLASS = "class"
+
+    @staticmethod
+    def create(discipline=FIFO, key=BY_FLOW, weights=None):
+        """
+        Creates the queue of one direction of a link
+
+        :param discipline: Scheduling discipline
+        :type discipline: str
+        :param key: Whether DRR serves flows or traffic classes
+        :type key: str
+        :param weights: DRR weights of the flows or classes, 1 if missing
+        :type weights: dict
+        :return: Queue of (packet, entry time) tuples
+        :rtype: FIFOScheduler
+        """
+        if discipline == Scheduler.FIFO:
+            return FIFOScheduler()
+        if discipline == Scheduler.PRIORITY:
+            return PriorityScheduler()
+        if discipline == Scheduler.DRR:
+            return DRRScheduler(key, weights)
+        raise ValueError("Unknown scheduler %s. Known: %s"
+                         % (discipline, ", ".join(Scheduler.ALL)))
+
+
+class FIFOScheduler(object):
+    def __init__(self):
+        """
+        Queue of (packet, entry time) tuples, sent in arrival order. Every
+        scheduler keeps the byte count of its packets so the buffer occupancy
+        is known without walking the queue.
+        """
+        self.queue = deque()
+        # Bytes of the queued packets
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def push(self, packet, time):
+        """
+        Queues a packet
+
+        :param packet: Packet to queue
+        :type packet: Packet
+        :param time: Time the packet entered the queue
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        self.queue.append((packet, time))
+        self.bytes += packet.size()
+
+    def pop(self):
+        """
+        Removes the next packet to send
+
+        :return: (packet, entry time), None if the queue is empty
+        :rtype: (Packet, float)
+        """
+        if not self.queue:
+            return None
+        item = self.queue.popleft()
+        self.bytes -= item[0].size()
+        return item
+
+    def peek(self):
+        """
+        :return: (packet, entry time) of the next packet to send
+        :rtype: (Packet, float)
+        """
+        return self.queue[0]
+
+
+class PriorityScheduler(FIFOScheduler):
+    def __init__(self):
+        """
+        Strict priority: a packet is only sent when no packet of a higher
+        traffic class is queued. Low classes can starve.
+        """
+        super(PriorityScheduler, self).__init__()
+        # { traffic class : deque[(packet, entry time)] }
+        self.queues = {}
+        # Traffic classes seen so far, highest first
+        self.classes = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, packet, time):
+        traffic_class = packet.traffic_class
+        if traffic_class not in self.queues:
+            self.queues[traffic_class] = deque()
+            self.classes = sorted(self.queues, reverse=True)
+        self.queues[traffic_class].append((packet, time))
+        self.bytes += packet.size()
+        self.count += 1
+
+    def pop(self):
+        for traffic_class in self.classes:
+            queue = self.queues[traffic_class]
+            if queue:
+                item = queue.popleft()
+                self.bytes -= item[0].size()
+                self.count -= 1
+                return item
+        return None
+
+    def peek(self):
+        for traffic_class in self.classes:
+            if self.queues[traffic_class]:
+                return self.queues[traffic_class][0]
+        raise IndexError("peek from an empty queue")
+
+
+class DRRScheduler(FIFOScheduler):
+    # Bytes a weight of 1 lets a queue send per round
+    QUANTUM = 1024
+
+    def __init__(self, key=Scheduler.BY_FLOW, weights=None):
+        """
+        Deficit round robin over per-flow or per-class queues. Each round a
+        backlogged queue may send QUANTUM * weight bytes, so the link is
+        shared in proportion to the weights. Only backlogged queues are in
+        the round, which makes a pop O(1) as long as quanta are at least a
+        packet.
+
+        Args:
+            key (str):          Scheduler.BY_FLOW or Scheduler.BY_CLASS.
+            weights (dict):     Weight of each flow ID or traffic class,
+                                1 if missing.
+        """
+        super(DRRScheduler, self).__init__()
+        if key not in (Scheduler.BY_FLOW, Scheduler.BY_CLASS):
+            raise ValueError("DRR queues are per %s or per %s, not %s"
+                             % (Scheduler.BY_FLOW, Scheduler.BY_CLASS, key))
+        if any(weight <= 0 for weight in (weights or {}).values()):
+            raise ValueError("DRR weights must be positive.")
+        self.key = key
+        self.weights = weights or {}
+        # { key : deque[(packet, entry time)] } of the backlogged queues
+        self.queues = {}
+        # Keys of the backlogged queues, the head is being served
+        self.active = deque()
+        # { key : bytes the queue may still send this round }
+        self.deficits = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def queue_key(self, packet):
+        """
+        :return: Flow ID (None for routing packets) or traffic class
+        """
+        if self.key == Scheduler.BY_CLASS:
+            return packet.traffic_class
+        return getattr(packet, "flow_id", None)
+
+    def push(self, packet, time):
+        key = self.queue_key(packet)
+        if key not in self.queues:
+            self.queues[key] = deque()
+            self.deficits[key] = 0
+            self.active.append(key)
+            if len(self.active) == 1:
+                self.start_turn()
+        self.queues[key].append((packet, time))
+        self.bytes += packet.size()
+        self.count += 1
+
+    def pop(self):
+        if not self.active:
+            return None
+        while True:
+            key = self.active[0]
+            queue = self.queues[key]
+            size = queue[0][0].size()
+            if self.deficits[key] >= size:
+                break
+            # Turn over, the deficit is kept for the next round
+            self.active.rotate(-1)
+            self.start_turn()
+        item = queue.popleft()
+        self.deficits[key] -= size
+        if not queue:
+            # Idle queues don't keep credit
+            self.active.popleft()
+            del self.queues[key]
+            del self.deficits[key]
+            if self.active:
+                self.start_turn()
+        self.bytes -= size
+        self.count -= 1
+        return item
+
+    def start_turn(self):
+        """
+        Gives the queue at the head of the round its quantum
+        """
+        key = self.active[0]
+        self.deficits[key] += self.QUANTUM * self.weights.get(key, 1)
+
+    def peek(self):
+        """
+        The packet pop would return, found by walking the round the same way
+        without handing out any quantum
+        """
+        if not self.active:
+            raise IndexError("peek from an empty queue")
+        # { key : quantum the queue would get before being served }
+        credit = {}
+        turn = 0
+        while True:
+            key = self.active[turn % len(self.active)]
+            head = self.queues[key][0]
+            if self.deficits[key] + credit.get(key, 0) >= head[0].size():
+                return head
+            turn += 1
+            key = self.active[turn % len(self.active)]
+            credit[key] = credit.get(key, 0) + \
+                self.QUANTUM * self.weights.get(key, 1)
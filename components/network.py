@@ -1,7 +1,12 @@
+from centralized_routing import CentralizedRouting
+from node import Node
+from components.packet_types import Packet
+from routing_protocol import RoutingProtocol
 from events.event_dispatcher import EventDispatcher
 from events.event_target import EventTarget
 from utils.grapher import Grapher
-from utils.graphing_helpers import get_flow_throughput_events
+from utils.metrics_sink import MetricsSink
+from utils import Logger
 
 
 class Network(EventTarget):
@@ -9,8 +14,12 @@ class Network(EventTarget):
     # Global program clock
     TIME = None
 
+    # Flow completion time percentiles reported at the end of a run
+    FCT_PERCENTILES = [50, 95, 99]
+
     def __init__(self, hosts, routers, links, display_graph=True,
-                 graph_output=None):
+                 graph_output=None, workloads=None, metrics_file=None,
+                 max_graph_points=Grapher.MAX_POINTS):
         """
         A network instance with flows.
 
@@ -20,35 +29,66 @@ class Network(EventTarget):
             links (Link[]):     The list of links.
             display_graph(bool) Whether we should display the graph when done
             graph_output(str)   Output folder if data needs saving
+            workloads (Workload[]): Workloads creating flows during the run.
+            metrics_file (str): File the graph samples are written to during
+                                the run, instead of being kept in memory.
+            max_graph_points (int): Most points plotted per series, or None
+                                    to plot every sample.
         """
         super(Network, self).__init__()
         Network.TIME = 0
+        # Indices are dense per network: flows and nodes of earlier networks
+        # in the process are forgotten
+        Packet.FLOW_INTERNER.clear()
+        Node.INTERNER.clear()
+        for node in hosts + routers:
+            node.index = Node.INTERNER.intern(node.id)
         self.hosts = hosts
         self.routers = routers
         self.links = links
+        self.workloads = workloads or []
+        # Routers whose tables are computed by the network, not by themselves
+        centralized = [router for router in self.routers
+                       if router.routing == RoutingProtocol.CENTRALIZED]
+        self.centralized_routing = \
+            CentralizedRouting(centralized, self.links) if centralized else None
 
-        self.event_queue = EventDispatcher()
+        self.sink = MetricsSink(metrics_file) if metrics_file else None
+        self.event_queue = EventDispatcher(self.sink)
 
-        for target in self.hosts + self.routers + self.links:
+        for target in self.hosts + self.routers + self.links + self.workloads:
             self.event_queue.listen(target)
 
         self.running = False
 
-        self.grapher = Grapher(graph_output)
+        # Figures that are only saved are rendered in parallel
+        self.grapher = Grapher(graph_output, max_graph_points,
+                               processes=1 if display_graph else None)
         self.displayGraph = display_graph
 
     def run(self):
         """
         Starts the event dispatcher and begins running the clock.
         """
+        if self.centralized_routing:
+            self.event_queue.listen(self.centralized_routing)
+            self.centralized_routing.start(Network.TIME)
         for router in self.routers:
             router.create_routing_table()
         for host in self.hosts:
             host.start_flow()
+        for workload in self.workloads:
+            workload.start()
 
         self._run()
-        
-        self.create_graphs()
+        self.report_flow_completion_times()
+        self.report_drop_statistics()
+
+        if self.sink is not None:
+            self.sink.close()
+        # Without graphs to show or save, graphing support isn't even loaded
+        if self.displayGraph or self.grapher.outputFolder is not None:
+            self.create_graphs()
         if self.displayGraph:
             self.display_graphs()
 
@@ -64,15 +104,57 @@ class Network(EventTarget):
         except KeyboardInterrupt:
             pass
 
+    def report_flow_completion_times(self):
+        """
+        Logs the flow completion time percentiles of all completed flows
+        """
+        fcts = sorted(flow.completion - flow.arrival for host in self.hosts
+                      for flow in host.completed_flows)
+        if not fcts:
+            return
+        percentiles = ", ".join(
+            "p%d %0.2fms" % (p, self.percentile(fcts, p))
+            for p in self.FCT_PERCENTILES)
+        Logger.warning(Network.TIME, "%d flows completed. FCT mean %0.2fms, %s"
+                       % (len(fcts), sum(fcts) / len(fcts), percentiles))
+
+    def report_drop_statistics(self):
+        """
+        Logs the packets each link dropped or marked, if any
+        """
+        for link in self.links:
+            statistics = link.buffer.drop_statistics()
+            if not any(statistics.values()):
+                continue
+            Logger.warning(Network.TIME, "%s: %d dropped (buffer full), %d "
+                                         "dropped and %d marked by AQM"
+                           % (link.id, statistics["overflow"],
+                              statistics["aqm"], statistics["marked"]))
+
+    @staticmethod
+    def percentile(values, p):
+        """
+        Nearest-rank percentile
+
+        :param values: Sorted values
+        :type values: list[float]
+        :param p: Percentile, between 0 and 100
+        :type p: float
+        :return: Value at the percentile
+        :rtype: float
+        """
+        rank = max(int(-(-p * len(values) // 100)), 1)
+        return values[rank - 1]
+
     def create_graphs(self):
         """
         Handle graph events processing and graphing
         """
-        graph_events = self.event_queue.graph_events
-        p_received_events = self.event_queue.packet_received_events
-        # Add the flow throughput events to the graph events
-        graph_events += get_flow_throughput_events(p_received_events)
-        self.grapher.graph_all(self.event_queue.graph_events)        
+        if self.sink is not None:
+            self.sink.close()
+            self.grapher.graph_metrics_file(self.sink.filename)
+            return
+        self.grapher.graph_all(self.event_queue.metrics)
 
     def display_graphs(self):
         """
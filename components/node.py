@@ -1,15 +1,21 @@
 import abc
 
 from events import EventTarget
+from utils import Interner
 
 
 class Node(EventTarget):
     """
     Interface for a node in the network graph.
     """
+    # Dense integer index of every node ID
+    INTERNER = Interner()
+
     def __init__(self, identifier):
         super(Node, self).__init__()
         self.id = identifier
+        # Index of the node in forwarding tables
+        self.index = Node.INTERNER.intern(identifier)
 
     @abc.abstractmethod
     def add_link(self, link):
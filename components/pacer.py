@@ -0,0 +1,102 @@
+from events.event_types import SendPacketsEvent
+
+
+class Pacer(object):
+    # Pacing rate relative to cwnd / srtt when the controller doesn't give
+    # one. A bit above 1 so that pacing doesn't hold a growing window back.
+    WINDOW_GAIN = 1.25
+
+    def __init__(self, host, enabled=False):
+        """
+        Spreads a host's transmissions out over time at the pacing rate given
+        by its congestion controller. Only a single SendPacketsEvent is ever
+        pending for the host; it is rescheduled each time the window is still
+        open after it fires.
+
+        Args:
+            host (Host):        The host whose transmissions are paced.
+            enabled (bool):     Whether to pace controllers that don't give a
+                                rate of their own at cwnd / srtt.
+        """
+        self.host = host
+        self.enabled = enabled
+        # Earliest time at which the next packet may be sent
+        self.next_send_time = None
+        # Whether a SendPacketsEvent is waiting to fire
+        self.event_pending = False
+
+    def __repr__(self):
+        return "Pacer[%s]" % self.host
+
+    def ready(self, time):
+        """
+        Whether a packet may be sent at the given time
+
+        :param time: Time the packet would be sent
+        :type time: float
+        :return: True if the packet may be sent now
+        :rtype: bool
+        """
+        return self.next_send_time is None or time >= self.next_send_time
+
+    def packet_sent(self, packet, time):
+        """
+        Records that a packet was sent and computes when the next one may go
+
+        :param packet: Packet that was sent
+        :type packet: Packet
+        :param time: Time the packet was sent
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        rate = self.host.congestion_control.pacing_rate(time)
+        if not rate and self.enabled:
+            rate = self.window_rate()
+        if not rate:
+            # Controller doesn't pace, send as fast as the window allows
+            self.next_send_time = None
+            return
+        # Rate is in packets per ms
+        self.next_send_time = time + 1. / rate
+
+    def window_rate(self):
+        """
+        Rate that sends a window's worth of packets per smoothed RTT
+
+        :return: Rate in packets per ms, None until the RTT has been sampled
+        :rtype: float | None
+        """
+        srtt = self.host.rtt_estimator.srtt
+        if not srtt:
+            return None
+        return self.WINDOW_GAIN * self.host.cwnd / srtt
+
+    def schedule(self, time):
+        """
+        Schedule the event releasing the next packet, unless one is pending
+
+        :param time: Time at which the host was held back
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        if self.event_pending:
+            return
+        self.event_pending = True
+        self.host.dispatch(SendPacketsEvent(max(time, self.next_send_time),
+                                            self))
+
+    def release(self, time):
+        """
+        Called by the SendPacketsEvent once the next packet may be sent
+
+        :param time: Time the event fired
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        self.event_pending = False
+        if self.host.flow is None:
+            return
+        self.host.send_packets(time, self.host.flow[0])
@@ -4,3 +4,5 @@ from routing_packet import RoutingPacket
 from static_routing_packet import StaticRoutingPacket
 from dynamic_routing_packet import DynamicRoutingPacket
 from flow_packet import FlowPacket
+from link_state_packet import LinkStatePacket
+from datagram_packet import DatagramPacket
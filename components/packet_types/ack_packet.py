@@ -2,22 +2,27 @@ from packet import Packet
 
 
 class AckPacket(Packet):
+    __slots__ = ("flow_id", "request_number", "trigger_packet", "ece")
     ACK_PACKET_SIZE = 64
 
     def __init__(self, flow_id, src, dest, request_number, trigger_packet):
+        # Sent for every segment received, the slots are set like FlowPacket's
+        self.key = Packet.flow_key(flow_id, request_number)
+        self.src = src
+        self.dest = dest
+        self.traffic_class = Packet.TRAFFIC_CLASS
+        self.ecn = Packet.NOT_ECT
+        # Size of packet is the size of the header
+        self._size = AckPacket.ACK_PACKET_SIZE
         self.flow_id = flow_id
         self.request_number = request_number
         self.trigger_packet = trigger_packet
+        # ECN-Echo, the acknowledged packet was marked congestion experienced
+        self.ece = False
 
-        identifier = "%s.%d" % (self.flow_id, self.request_number)
-
-        super(AckPacket, self).__init__(identifier, src, dest)
-
-    def size(self):
-        """
-        Size of packet is the size of the header. Size is in bytes.
-        """
-        return AckPacket.ACK_PACKET_SIZE
+    @property
+    def id(self):
+        return "%s.%d" % (self.flow_id, self.request_number)
 
     def __repr__(self):
         return "Ack(flow=%s, Rn=%d)" % (self.flow_id, self.request_number)
@@ -0,0 +1,12 @@
+from flow_packet import FlowPacket
+
+
+class DatagramPacket(FlowPacket):
+    """
+    Data packet of an unreliable traffic source. It is never acknowledged,
+    timed out or retransmitted.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return "Datagram(id=%s)" % self.id
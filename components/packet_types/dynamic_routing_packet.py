@@ -5,27 +5,28 @@ class DynamicRoutingPacket(RoutingPacket):
     """
     Routing packet used for dynamic routing
     """
+    __slots__ = ()
     # Auto-incrementing routing ID index
     ROUTING_INDEX = 0
     # Identifier Prefix
     ID_PREFIX = "DR."
 
     def __init__(self, cost_table, src, dest):
-        identifier = self._get_packet_id()
+        key = self._get_packet_key()
         super(DynamicRoutingPacket, self).\
-            __init__(identifier, src, dest, cost_table)
+            __init__(key, src, dest, cost_table)
 
     def __repr__(self):
         return "DynamicRouting(src=%s table=%s)" % (self.src, self.costTable)
 
     @classmethod
-    def _get_packet_id(cls):
+    def _get_packet_key(cls):
         """
-        Private method, used to get the auto-incrementing routing packet ID
+        Private method, used to get the auto-incrementing routing packet key
 
-        :return: Packet ID
-        :rtype: str
+        :return: Packet key
+        :rtype: int
         """
-        packet_id = cls.ID_PREFIX + str(cls.ROUTING_INDEX)
+        key = cls.ROUTING_INDEX
         cls.ROUTING_INDEX += 1
-        return packet_id
+        return key
@@ -2,22 +2,26 @@ from packet import Packet
 
 
 class FlowPacket(Packet):
+    __slots__ = ("flow_id", "sequence_number", "packet_size")
     FLOW_PACKET_SIZE = 1024  # 1 KB for flow-generated data packets
 
     def __init__(self, flow_id, packet_index, size, src, dest):
+        # One is created for every segment sent, so the slots are all set
+        # here rather than through Packet.__init__
+        self.key = Packet.flow_key(flow_id, packet_index)
+        self.src = src
+        self.dest = dest
+        self.traffic_class = Packet.TRAFFIC_CLASS
+        self.ecn = Packet.NOT_ECT
+        # Size of packet is the size of the header and the actual payload size
+        self._size = FlowPacket.FLOW_PACKET_SIZE
         self.flow_id = flow_id
         self.sequence_number = packet_index
         self.packet_size = size
 
-        packet_id = "%s.%s" % (flow_id, packet_index)
-        super(FlowPacket, self).__init__(packet_id, src, dest)
-
-    def size(self):
-        """
-        Size of packet is the size of the header and the actual payload size.
-        Size is in bytes.
-        """
-        return FlowPacket.FLOW_PACKET_SIZE
+    @property
+    def id(self):
+        return "%s.%s" % (self.flow_id, self.sequence_number)
 
     def __repr__(self):
         return "Flow(id=%s)" % self.id
@@ -0,0 +1,38 @@
+from routing_packet import RoutingPacket
+
+
+class LinkStatePacket(RoutingPacket):
+    """
+    Routing packet flooding a link-state advertisement: the cost of every
+    link of the router that originated it
+    """
+    __slots__ = ("origin_id", "sequence_number")
+    # Auto-incrementing routing ID index
+    ROUTING_INDEX = 0
+    # Identifier Prefix
+    ID_PREFIX = "LS."
+
+    def __init__(self, origin_id, sequence_number, cost_table, src, dest):
+        key = self._get_packet_key()
+        super(LinkStatePacket, self).\
+            __init__(key, src, dest, cost_table)
+        self.origin_id = origin_id
+        self.sequence_number = sequence_number
+        # Size of the routing packet plus the origin and sequence number
+        self._size += 2 * 8
+
+    def __repr__(self):
+        return "LinkState(src=%s origin=%s seq=%d table=%s)" \
+            % (self.src, self.origin_id, self.sequence_number, self.costTable)
+
+    @classmethod
+    def _get_packet_key(cls):
+        """
+        Private method, used to get the auto-incrementing routing packet key
+
+        :return: Packet key
+        :rtype: int
+        """
+        key = cls.ROUTING_INDEX
+        cls.ROUTING_INDEX += 1
+        return key
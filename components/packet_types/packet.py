@@ -1,28 +1,77 @@
 import abc
 
+from utils import Interner
+
 
 class Packet(object):
     __metaclass__ = abc.ABCMeta
+    __slots__ = ("key", "src", "dest", "traffic_class", "ecn", "_size")
+    # Traffic class of the packets of this type, higher classes are sent first
+    # by priority schedulers
+    TRAFFIC_CLASS = 0
+    # ECN codepoints: not ECN capable, ECN capable, congestion experienced
+    NOT_ECT = 0
+    ECT = 2
+    CE = 3
+    # Dense integer index of every flow ID, flow packet keys are built from it
+    FLOW_INTERNER = Interner()
+    # Low bits of a flow packet key holding the sequence number
+    SEQUENCE_BITS = 32
 
-    def __init__(self, identifier, src, dest):
+    def __init__(self, key, src, dest, size=None):
         """
-        A network packet.
+        A network packet. Packets are created for every segment sent, so they
+        are slotted and identified by an integer key; the string ID is only
+        formatted when something prints it.
 
         Args:
-            identifier (str):   ID for the packet.
+            key (int):          Integer identity of the packet.
             src (Host):         Source host.
             dest (Host):        Destination host.
+            size (int):         Size of the packet in bytes, the header size
+                                if None.
         """
-        self.id = identifier
+        self.key = key
         self.src = src
         self.dest = dest
+        self.traffic_class = self.TRAFFIC_CLASS
+        self.ecn = Packet.NOT_ECT
+        if size is None:
+            # 2, 64-bit integers and the str identifier (1 byte per char for
+            # an ASCII string)
+            size = 2 * 8 + len(self.id)
+        self._size = size
+
+    @staticmethod
+    def flow_key(flow_id, sequence_number):
+        """
+        Key of the packet of the given flow with the given sequence number
+
+        :param flow_id: Flow ID
+        :type flow_id: str
+        :param sequence_number: Sequence (or request) number of the packet
+        :type sequence_number: int
+        :return: Packet key
+        :rtype: int
+        """
+        index = Packet.FLOW_INTERNER.indices.get(flow_id)
+        if index is None:
+            index = Packet.FLOW_INTERNER.intern(flow_id)
+        return index << Packet.SEQUENCE_BITS | sequence_number
+
+    @property
+    def id(self):
+        """
+        :return: Readable ID of the packet
+        :rtype: str
+        """
+        return str(self.key)
 
     def size(self):
         """
-        Size of packet is the size of 2, 64-bit integers and str identifier
-        (1 byte per char for ASCII string). Size is in bytes.
+        Size of the packet in bytes, computed when it was created
         """
-        return 2 * 8 + len(self.id)
+        return self._size
 
     def __repr__(self):
         return "Packet(id=%s,size=%i)" % (self.id, self.size())
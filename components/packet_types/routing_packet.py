@@ -5,17 +5,22 @@ class RoutingPacket(Packet):
     """
     Routing packet base class
     """
+    __slots__ = ("costTable",)
+    # Network control, routing isn't held up by data
+    TRAFFIC_CLASS = 7
+    # Identifier Prefix
+    ID_PREFIX = "R."
 
-    def __init__(self, identifier, src, dest, cost_table):
-        super(RoutingPacket, self).__init__(identifier, src, dest)
+    def __init__(self, key, src, dest, cost_table):
         self.costTable = cost_table
+        super(RoutingPacket, self).__init__(key, src, dest)
+        # Size of routing packet is the size of the header plus the size of
+        # the cost_table dictionary (dictionary of 8-byte ints)
+        self._size += 2 * 8 * len(cost_table)
 
-    def size(self):
-        """
-        Size of routing packet is the size of the header plus the size of the
-        cost_table dictionary (dictionary of 8-byte ints). Size is in bytes.
-        """
-        return super(RoutingPacket, self).size() + 2 * 8 * len(self.costTable)
+    @property
+    def id(self):
+        return self.ID_PREFIX + str(self.key)
 
     def __repr__(self):
         return "Routing(src=%s table=%s)" % (self.src, self.costTable)
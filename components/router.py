@@ -1,42 +1,60 @@
-from collections import namedtuple
-from copy import deepcopy
+from collections import deque, namedtuple
 
 from components.network import Network
 from components.packet_types import AckPacket, Packet, StaticRoutingPacket, \
-    DynamicRoutingPacket
+    DynamicRoutingPacket, LinkStatePacket
 from errors import UnhandledPacketType
 from events.event_types import PacketSentToLinkEvent, \
-    UpdateDynamicRoutingTableEvent
+    UpdateDynamicRoutingTableEvent, SPFEvent
 from node import Node
+from routing_protocol import RoutingProtocol
+from routing_table import RoutingTable
 from utils import Logger
+from utils.shortest_paths import dijkstra
 
 LinkCostTuple = namedtuple("LinkCostTuple", ["link", "cost"])
 
 # Interval after which we should begin creating a new dynamic routing table
 DYNAMIC_UPDATE_INTERVAL = 3000
 
+
 class Router(Node):
     """
     :type links: list[Links]
-    :type routingTable: dict[str, LinkCostTuple]
-    :type dynamicRoutingTable: dict[str, LinkCostTuple]
+    :type routingTable: RoutingTable
+    :type dynamicRoutingTable: RoutingTable
     """
 
     # Times the same data should be observed before we stop broadcasting updates
     SAME_DATA_THRESHOLD = 2
+    # Time SPF waits for more link-state advertisements to arrive, in ms
+    SPF_DELAY = 5
+    # Packets held while their destination isn't routable yet
+    HOLD_QUEUE_SIZE = 64
 
-    def __init__(self, identifier, dynamic_enabled):
+    def __init__(self, identifier, dynamic_enabled,
+                 routing=RoutingProtocol.DISTANCE_VECTOR, ecmp=False):
         """
         A network router.
 
         Args:
             identifier (str):       The name of the router.
             dynamic_enabled (bool): Whether we should use dynamic/static routing
+            routing (str):          How the routing tables are built
+            ecmp (bool):            Whether to spread flows over every
+                                    equal-cost next hop
         """
         super(Router, self).__init__(identifier)
+        if routing not in RoutingProtocol.ALL:
+            raise ValueError("Unknown routing protocol %s" % routing)
         self.dynamicEnabled = dynamic_enabled
+        self.routing = routing
+        self.ecmp = ecmp
         # List of Links
         self.links = []
+        # Port index of each link, its position in the links list
+        # { Link : port }
+        self.ports = {}
         # { node_id : LinkCostTuple }
         self.routingTable = None
         self.dynamicRoutingTable = None
@@ -45,6 +63,15 @@ class Router(Node):
         self.sameDataCounter = 0
         # Whether the dynamic routing table timer has been added
         self.dynamicRoutingTableTimerAdded = False
+        # Link-state database, { origin_id : (sequence_number, cost_table) }
+        self.linkStateDatabase = {}
+        # Sequence number of this router's last link-state advertisement
+        self.lsaSequenceNumber = 0
+        # Whether an SPF run has been scheduled
+        self.spfPending = False
+        # Packets waiting for a route, { destination index : deque[Packet] }
+        self.heldPackets = {}
+        self.heldPacketCount = 0
 
     def __repr__(self):
         return "Router[%s]" % self.id
@@ -60,6 +87,7 @@ class Router(Node):
         """
         if link in self.links:
             return
+        self.ports[link] = len(self.links)
         self.links.append(link)
 
     def receive(self, packet, time):
@@ -78,22 +106,100 @@ class Router(Node):
             self.handle_routing_packet(packet, dynamic=False)
         elif isinstance(packet, DynamicRoutingPacket):
             self.handle_routing_packet(packet, dynamic=True)
+        elif isinstance(packet, LinkStatePacket):
+            self.handle_link_state_packet(packet)
         # Route the packet
         elif isinstance(packet, AckPacket) or isinstance(packet, Packet):
-            if not routing_table:
-                Logger.warning(time, "%s dropped packet %s, no routing table. "
-                                     "Creating one now." % (self, packet))
-                self.create_routing_table(self.dynamicEnabled)
-                return
-            elif packet.dest.id not in routing_table:
-                # TODO: should we keep a packet queue for packets w/o dest.?
-                Logger.warning(time, "%s dropped packet %s, dest. not in "
-                                     "routing table." % (self, packet))
+            if routing_table:
+                self.forward(packet, routing_table, time)
                 return
-            dest_link = routing_table[packet.dest.id].link
-            self.send(packet, dest_link, time)
+            Logger.warning(time, "%s holding packet %s, no routing table. "
+                                 "Creating one now." % (self, packet))
+            self.hold(packet, time)
+            self.create_routing_table(self.dynamicEnabled)
         else:
             raise UnhandledPacketType
+        # The routing table may have learned the destination of held packets
+        self.release_held_packets(time)
+
+    def forward(self, packet, routing_table, time):
+        """
+        Sends the packet towards its destination, or holds it until the
+        destination is in the routing table
+
+        :param packet: Packet to forward
+        :type packet: Packet
+        :param routing_table: Routing table to use
+        :type routing_table: RoutingTable
+        :param time: Time the packet is forwarded
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        flow_hash = self.flow_hash(packet) if self.ecmp else 0
+        port = routing_table.port(packet.dest.index, flow_hash)
+        if port == RoutingTable.NO_ROUTE:
+            Logger.info(time, "%s holding packet %s, dest. not in routing "
+                              "table." % (self, packet))
+            self.hold(packet, time)
+            return
+        self.send(packet, self.links[port], time)
+
+    def hold(self, packet, time):
+        """
+        Queues a packet until its destination becomes routable. Packets are
+        dropped once HOLD_QUEUE_SIZE packets are held.
+
+        :param packet: Packet to hold
+        :type packet: Packet
+        :param time: Time the packet is held
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        if self.heldPacketCount >= self.HOLD_QUEUE_SIZE:
+            Logger.warning(time, "%s dropped packet %s, hold queue full."
+                           % (self, packet))
+            return
+        self.heldPackets.setdefault(packet.dest.index, deque()).append(packet)
+        self.heldPacketCount += 1
+
+    def release_held_packets(self, time):
+        """
+        Forwards the held packets whose destination is now routable, in the
+        order they arrived
+
+        :param time: Time the packets are forwarded
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        if not self.heldPackets:
+            return
+        routing_table = self.get_routing_table()
+        if not routing_table:
+            return
+        for dest_index in self.heldPackets.keys():
+            if routing_table.port(dest_index) == RoutingTable.NO_ROUTE:
+                continue
+            packets = self.heldPackets.pop(dest_index)
+            self.heldPacketCount -= len(packets)
+            for packet in packets:
+                self.forward(packet, routing_table, time)
+
+    @staticmethod
+    def flow_hash(packet):
+        """
+        Hash of the flow a packet belongs to. Every packet of a flow takes the
+        same path, so they stay in order.
+
+        :param packet: Packet to forward
+        :type packet: Packet
+        :return: Hash of (source, destination, flow ID)
+        :rtype: int
+        """
+        return hash((packet.src.id, packet.dest.id,
+                     getattr(packet, "flow_id", None)))
 
     def send(self, packet, link, time):
         """
@@ -124,17 +230,30 @@ class Router(Node):
         :return: Nothing
         :rtype: None
         """
+        if self.routing == RoutingProtocol.CENTRALIZED:
+            # The network installs the tables
+            return
         if not dynamic:
             dynamic = self.dynamicEnabled
+        if dynamic and self.routing == RoutingProtocol.INCREMENTAL and \
+                self.newDynamicRoutingTable is not None and \
+                self.dynamicRoutingTable is not self.newDynamicRoutingTable:
+            # Updates stop once the tables converged, so the threshold may not
+            # have been reached. Promote last epoch's table before starting anew
+            self.update_dynamic_routing_table(self.newDynamicRoutingTable)
         # Only add the dynamic routing table update timer once
         if dynamic and not self.dynamicRoutingTableTimerAdded:
             self.add_timer(UpdateDynamicRoutingTableEvent(None, self),
                            Network.get_time(), DYNAMIC_UPDATE_INTERVAL)
             self.dynamicRoutingTableTimerAdded = True
+        if self.routing == RoutingProtocol.LINK_STATE:
+            self.originate_link_state(dynamic)
+            return
         # Reset the dynamic routing table same data counter
         self.sameDataCounter = 0
         # Initialize cost of reaching oneself as 0
-        routing_table = {self.id: LinkCostTuple(None, 0)}
+        routing_table = RoutingTable(self.ports,
+                                     {self.id: LinkCostTuple(None, 0)})
         # Create cost table to broadcast with costs of this router's neighbors
         # { node_id : cost }
         cost_table = {}
@@ -145,7 +264,10 @@ class Router(Node):
             cost_table[other_node_id] = cost
             routing_table[other_node_id] = LinkCostTuple(link, cost)
         self.store_routing_table(dynamic, routing_table)
-        self.broadcast_table(cost_table, dynamic)
+        if self.routing == RoutingProtocol.INCREMENTAL:
+            self.broadcast_changes(cost_table, dynamic)
+        else:
+            self.broadcast_table(cost_table, dynamic)
 
     def broadcast_table(self, cost_table, dynamic):
         """
@@ -159,8 +281,41 @@ class Router(Node):
         :rtype: None
         """
         packet_type = DynamicRoutingPacket if dynamic else StaticRoutingPacket
+        # Receivers don't modify the table, every packet shares it
+        for link in self.links:
+            packet = packet_type(cost_table, self, link.other_node(self))
+            self.send(packet, link, Network.get_time())
+
+    def broadcast_changes(self, changes, dynamic):
+        """
+        Sends the changed entries of the routing table to the neighboring
+        routers. Split horizon: an entry isn't sent back over the link it is
+        routed through, that neighbor's route can't go through us.
+
+        :param changes: Changed costs, { node_id : cost }
+        :type changes: dict[str, float]
+        :param dynamic: Whether we're broadcasting dynamic/static routing table
+        :type dynamic: bool
+        :return: Nothing
+        :rtype: None
+        """
+        packet_type = DynamicRoutingPacket if dynamic else StaticRoutingPacket
+        routing_table = self._get_intermediate_routing_table(dynamic)
+        # Links some of the changed entries are routed through
+        next_hops = set(routing_table[node_id].link for node_id in changes)
         for link in self.links:
-            packet = packet_type(deepcopy(cost_table), self, link.other_node(self))
+            neighbor = link.other_node(self)
+            if not isinstance(neighbor, Router):
+                # Hosts don't route
+                continue
+            cost_table = changes
+            if link in next_hops:
+                cost_table = {node_id: cost
+                              for node_id, cost in changes.items()
+                              if routing_table[node_id].link is not link}
+            if not cost_table:
+                continue
+            packet = packet_type(cost_table, self, neighbor)
             self.send(packet, link, Network.get_time())
 
     def handle_routing_packet(self, packet, dynamic):
@@ -183,26 +338,36 @@ class Router(Node):
 
         # Get the appropriate routing table
         routing_table = self._get_intermediate_routing_table(dynamic)
-        # Update costs by adding the cost to travel to the source node
+        # Costs through the source node include the cost to travel to it. The
+        # received table is shared with other packets, leave it as it is
         src_cost = routing_table[src_id].cost
-        for identifier in cost_table.keys():
-            cost_table[identifier] = cost_table[identifier] + src_cost
-
         src_link = routing_table[src_id].link
+        # { node_id : cost } of the entries that changed
+        changes = {}
         # Update our routing table based on the received table
         for identifier, cost in cost_table.items():
+            cost += src_cost
             # New entry to tables or smaller cost
             if identifier not in routing_table or \
                     cost < routing_table[identifier].cost:
                 did_update = True
                 routing_table[identifier] = LinkCostTuple(src_link, cost)
+                changes[identifier] = cost
+            elif self.ecmp and cost == routing_table[identifier].cost and \
+                    identifier != self.id:
+                # Another path as good as the current one, the cost stays
+                # the same so there's nothing to tell the neighbors
+                routing_table.add_next_hop(identifier, src_link)
 
         # Store and broadcast the updated table if an update occurred
         if did_update:
             self.sameDataCounter = 0
             self.store_routing_table(dynamic, routing_table)
-            new_cost_table = self.cost_table_from_routing_table(dynamic)
-            self.broadcast_table(new_cost_table, dynamic)
+            if self.routing == RoutingProtocol.INCREMENTAL:
+                self.broadcast_changes(changes, dynamic)
+            else:
+                new_cost_table = self.cost_table_from_routing_table(dynamic)
+                self.broadcast_table(new_cost_table, dynamic)
         else:
             self.sameDataCounter += 1
             # Log the same data receipt
@@ -248,13 +413,123 @@ class Router(Node):
             cost_table[node_id] = link_cost.cost
         return cost_table
 
+    # ------------------------- Link State ------------------------- #
+    def originate_link_state(self, dynamic):
+        """
+        Floods a new link-state advertisement with the current costs of this
+        router's links
+
+        :param dynamic: Whether to advertise dynamic or static link costs
+        :type dynamic: bool
+        :return: Nothing
+        :rtype: None
+        """
+        cost_table = {}
+        for link in self.links:
+            cost = link.dynamic_cost() if dynamic else link.static_cost()
+            cost_table[link.other_node(self).id] = cost
+        self.lsaSequenceNumber += 1
+        self.linkStateDatabase[self.id] = (self.lsaSequenceNumber, cost_table)
+        self.flood_link_state(self.id, self.lsaSequenceNumber, cost_table)
+        if dynamic:
+            # The costs are advertised, start measuring the next ones
+            map(lambda l: l.reset_dynamic_cost(Network.get_time()), self.links)
+        if self.get_routing_table() is None:
+            # Route to the neighbors right away
+            self.run_spf(dynamic)
+        else:
+            self.schedule_spf(dynamic)
+
+    def flood_link_state(self, origin_id, sequence_number, cost_table,
+                         in_link=None):
+        """
+        Sends a link-state advertisement to every neighboring router but the
+        one it came from
+
+        :param origin_id: ID of the router that originated the advertisement
+        :type origin_id: str
+        :param sequence_number: Sequence number of the advertisement
+        :type sequence_number: int
+        :param cost_table: Link costs of the origin, { node_id : cost }
+        :type cost_table: dict[str, float]
+        :param in_link: Link the advertisement was received on
+        :type in_link: Link
+        :return: Nothing
+        :rtype: None
+        """
+        for link in self.links:
+            neighbor = link.other_node(self)
+            if link is in_link or not isinstance(neighbor, Router):
+                continue
+            packet = LinkStatePacket(origin_id, sequence_number, cost_table,
+                                     self, neighbor)
+            self.send(packet, link, Network.get_time())
+
+    def handle_link_state_packet(self, packet):
+        """
+        Stores and floods on a link-state advertisement that is newer than
+        the one in the database, and schedules an SPF run
+
+        :param packet: Link-state packet
+        :type packet: LinkStatePacket
+        :return: Nothing
+        :rtype: None
+        """
+        origin_id = packet.origin_id
+        if origin_id in self.linkStateDatabase and \
+                self.linkStateDatabase[origin_id][0] >= packet.sequence_number:
+            # Already known
+            return
+        self.linkStateDatabase[origin_id] = (packet.sequence_number,
+                                             packet.costTable)
+        self.flood_link_state(origin_id, packet.sequence_number,
+                              packet.costTable,
+                              self.link_connected_to_node(packet.src.id))
+        self.schedule_spf(self.dynamicEnabled)
+
+    def schedule_spf(self, dynamic):
+        """
+        Runs SPF after SPF_DELAY, unless a run is already scheduled, so that
+        a burst of advertisements only causes one run
+        """
+        if self.spfPending:
+            return
+        self.spfPending = True
+        self.dispatch(SPFEvent(Network.get_time() + self.SPF_DELAY, self,
+                               dynamic))
+
+    def run_spf(self, dynamic):
+        """
+        Computes and installs the routing table from the link-state database
+
+        :param dynamic: Whether to install the dynamic or static table
+        :type dynamic: bool
+        :return: Nothing
+        :rtype: None
+        """
+        self.spfPending = False
+        graph = {}
+        for origin_id, (_, cost_table) in self.linkStateDatabase.items():
+            graph[origin_id] = [(node_id, cost, None)
+                                for node_id, cost in cost_table.items()]
+        # Our own edges carry the links the paths start with
+        _, own_costs = self.linkStateDatabase.get(self.id, (0, {}))
+        graph[self.id] = []
+        for link in self.links:
+            node_id = link.other_node(self).id
+            cost = own_costs.get(node_id, link.static_cost())
+            graph[self.id].append((node_id, cost, link))
+        # Only routers that advertised their links forward packets
+        transit = set(self.linkStateDatabase)
+        self.install_routes(dijkstra(graph, self.id, transit), dynamic)
+
     # --------- Dynamic/Static Routing Table Helpers --------- #
     def get_routing_table(self):
         """
         Get the appropriate routing table to use when routing a packet
 
         :return: Appropriate routing table
-        :rtype: dict[str, LinkCostTuple]
+        :rtype: RoutingTable
         """
         if not self.dynamicEnabled:
             return self.routingTable
@@ -271,7 +546,7 @@ class Router(Node):
         :param dynamic: Dynamic routing table if True, else static routing table
         :type dynamic: bool
         :return: Appropriate routing table
-        :rtype: dict[str, LinkCostTuple]
+        :rtype: RoutingTable
         """
         return self.newDynamicRoutingTable if dynamic else self.routingTable
 
@@ -282,7 +557,7 @@ class Router(Node):
         :param dynamic: Dynamic routing table if True, else static routing table
         :type dynamic: bool
         :param routing_table: Routing table to store
-        :type routing_table: dict[str, LinkCostTuple]
+        :type routing_table: RoutingTable
         :return: Nothing
         :rtype: None
         """
@@ -291,13 +566,37 @@ class Router(Node):
         else:
             self.routingTable = routing_table
 
+    def install_routes(self, paths, dynamic):
+        """
+        Installs a routing table computed outside of the router
+
+        :param paths: Cost of reaching each node and the links to use,
+                      { node_id : (cost, [link]) }
+        :type paths: dict[str, (float, list[Link])]
+        :param dynamic: Dynamic routing table if True, else static routing table
+        :type dynamic: bool
+        :return: Nothing
+        :rtype: None
+        """
+        routing_table = RoutingTable(self.ports)
+        for node_id, (cost, links) in paths.items():
+            routing_table[node_id] = LinkCostTuple(
+                links[0] if links else None, cost)
+            if self.ecmp:
+                for link in links[1:]:
+                    routing_table.add_next_hop(node_id, link)
+        self.store_routing_table(dynamic, routing_table)
+        if dynamic:
+            self.update_dynamic_routing_table(routing_table)
+        self.release_held_packets(Network.get_time())
+
     # ------------- Dynamic Routing Table Helpers ------------ #
     def update_dynamic_routing_table(self, routing_table):
         """
         Replace the old dynamicRoutingTable with the given new one
 
         :param routing_table: Routing table to update the old one with
-        :type routing_table: dict[str, LinkCostTuple]
+        :type routing_table: RoutingTable
         :return: Nothing
         :rtype: None
         """
@@ -320,6 +619,9 @@ class Router(Node):
             self.update_dynamic_routing_table(self.newDynamicRoutingTable)
             # Reset the dynamic cost for the links, we're done updating
             map(lambda l: l.reset_dynamic_cost(Network.get_time()), self.links)
+        elif self.routing == RoutingProtocol.INCREMENTAL:
+            # Neighbors already have everything that changed
+            return
         else:
             new_cost_table = self.cost_table_from_routing_table(dynamic=True)
             self.broadcast_table(new_cost_table, dynamic=True)
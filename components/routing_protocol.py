@@ -0,0 +1,15 @@
+class RoutingProtocol:
+    """
+    How routers build their routing tables
+    """
+    # Bellman-Ford with routing packets exchanged between neighbors
+    DISTANCE_VECTOR = "distance-vector"
+    # Distance-vector sending only the entries that changed, to routers only,
+    # with split horizon
+    INCREMENTAL = "incremental"
+    # Routers flood the costs of their links and run Dijkstra on their own
+    LINK_STATE = "link-state"
+    # Dijkstra over the whole topology, tables are installed by the network
+    CENTRALIZED = "centralized"
+
+    ALL = [DISTANCE_VECTOR, INCREMENTAL, LINK_STATE, CENTRALIZED]
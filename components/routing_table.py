@@ -0,0 +1,112 @@
+from array import array
+
+from node import Node
+
+
+class RoutingTable(dict):
+    """
+    Routing table, { node_id : LinkCostTuple }, that keeps a compact
+    forwarding table in sync with its entries. The forwarding table maps the
+    index of each destination node to the index of the router port (link)
+    that leads to it, so forwarding a packet is a single array lookup.
+
+    Destinations with several equal-cost next hops map to a group of ports
+    instead, encoded as FIRST_GROUP - group index. The entry itself keeps the
+    first next hop found.
+    """
+    # Forwarding table value of unreachable destinations
+    NO_ROUTE = -1
+    # Forwarding table value of the first group of equal-cost ports
+    FIRST_GROUP = -2
+
+    def __init__(self, ports, entries=None):
+        """
+        Args:
+            ports (dict):       Index of each of the router's links,
+                                { Link : port }.
+            entries (dict):     Initial entries, { node_id : LinkCostTuple }.
+        """
+        super(RoutingTable, self).__init__()
+        self.ports = ports
+        # Port to forward to, indexed by destination node index
+        self.forwarding = array('i')
+        # Sorted tuples of equal-cost ports, shared by every destination
+        # using the same ones, and the index of each
+        self.groups = []
+        self.group_indices = {}
+        if entries:
+            self.update(entries)
+
+    def __setitem__(self, node_id, link_cost):
+        super(RoutingTable, self).__setitem__(node_id, link_cost)
+        index = Node.INTERNER.intern(node_id)
+        if index >= len(self.forwarding):
+            self.forwarding.extend(
+                [self.NO_ROUTE] * (index + 1 - len(self.forwarding)))
+        link = link_cost.link
+        self.forwarding[index] = \
+            self.ports[link] if link is not None else self.NO_ROUTE
+
+    def update(self, entries):
+        for node_id, link_cost in entries.items():
+            self[node_id] = link_cost
+
+    def add_next_hop(self, node_id, link):
+        """
+        Adds a next hop with the same cost as the entry's to a destination
+
+        :param node_id: Destination node ID, must already have an entry
+        :type node_id: str
+        :param link: Link of the equal-cost next hop
+        :type link: Link
+        :return: Nothing
+        :rtype: None
+        """
+        index = Node.INTERNER.intern(node_id)
+        ports = self.next_hop_ports(index)
+        port = self.ports[link]
+        if port in ports:
+            return
+        group = tuple(sorted(ports + (port,)))
+        if group not in self.group_indices:
+            self.group_indices[group] = len(self.groups)
+            self.groups.append(group)
+        self.forwarding[index] = self.FIRST_GROUP - self.group_indices[group]
+
+    def next_hop_ports(self, node_index):
+        """
+        Every port packets for the given destination may be forwarded to
+
+        :param node_index: Index of the destination node
+        :type node_index: int
+        :return: Port indices, empty if the destination isn't reachable
+        :rtype: tuple[int]
+        """
+        if node_index >= len(self.forwarding):
+            return ()
+        value = self.forwarding[node_index]
+        if value == self.NO_ROUTE:
+            return ()
+        if value > self.NO_ROUTE:
+            return value,
+        return self.groups[self.FIRST_GROUP - value]
+
+    def port(self, node_index, flow_hash=0):
+        """
+        Port to forward packets for the given destination to
+
+        :param node_index: Index of the destination node
+        :type node_index: int
+        :param flow_hash: Hash of the packet's flow, picks one of several
+                          equal-cost ports
+        :type flow_hash: int
+        :return: Port index, NO_ROUTE if the destination isn't reachable
+        :rtype: int
+        """
+        if node_index >= len(self.forwarding):
+            return self.NO_ROUTE
+        value = self.forwarding[node_index]
+        if value >= self.NO_ROUTE:
+            return value
+        group = self.groups[self.FIRST_GROUP - value]
+        return group[flow_hash % len(group)]
@@ -0,0 +1,182 @@
+import random
+
+from components.packet_types import DatagramPacket, FlowPacket, Packet
+from events.event_types import SourceEvent
+from utils import Logger
+
+
+class SourceType:
+    """
+    Kinds of flows a flow specification can describe
+    """
+    # Window based flow controlled by the host's congestion control
+    TCP = "tcp"
+    # Unreliable sources, they don't react to loss
+    CBR = "cbr"
+    ON_OFF = "onoff"
+
+
+class CBRSource(object):
+    def __init__(self, host, flow_id, destination, rate, start, stop=None,
+                 amount=None, traffic_class=Packet.TRAFFIC_CLASS):
+        """
+        Constant bit rate source. Packets are sent at the given rate with no
+        acknowledgments, timeouts or retransmissions. A single SourceEvent per
+        source is pending at any time, each one schedules the next.
+
+        Args:
+            host (Host):            Host sending the traffic.
+            flow_id (str):          Flow identifier.
+            destination (Host):     Host the traffic is sent to.
+            rate (float):           Sending rate, in Mbps.
+            start (float):          Start time of the source, in s.
+            stop (float):           Time the source stops, in s.
+            amount (float):         Amount of data to send, in MB.
+            traffic_class (int):    Traffic class of the packets.
+        """
+        if stop is None and amount is None:
+            raise ValueError("Source %s needs a stop time or an amount of "
+                             "data to send." % flow_id)
+        self.host = host
+        self.flow_id = flow_id
+        self.destination = destination
+        self.rate = rate
+        self.traffic_class = traffic_class
+        self.start_time = start * 1000.
+        self.stop_time = stop * 1000. if stop is not None else None
+        self.byte_amount = int(amount * 1024 * 1024) \
+            if amount is not None else None
+        # Time between packets, in ms
+        self.packet_interval = FlowPacket.FLOW_PACKET_SIZE * 8 / (rate * 1e3)
+
+        self.sequence_number = 0
+        self.bytes_sent = 0
+
+    def __repr__(self):
+        return "CBRSource[%s:%s]" % (self.host, self.flow_id)
+
+    def start(self):
+        """
+        Schedules the first packet of the source
+        """
+        self.host.dispatch(SourceEvent(self.start_time, self))
+
+    def done(self, time):
+        """
+        Whether the source has stopped by the given time
+
+        :param time: Time to check
+        :type time: float
+        :return: True if nothing more should be sent
+        :rtype: bool
+        """
+        if self.stop_time is not None and time >= self.stop_time:
+            return True
+        return self.byte_amount is not None and \
+            self.bytes_sent >= self.byte_amount
+
+    def emit(self, time):
+        """
+        Sends the next packet and schedules the one after it
+
+        :param time: Time the packet is sent
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        if self.done(time):
+            return
+        packet = DatagramPacket(self.flow_id, self.sequence_number,
+                                FlowPacket.FLOW_PACKET_SIZE, self.host,
+                                self.destination)
+        packet.traffic_class = self.traffic_class
+        self.host.send_datagram(packet, time)
+        self.sequence_number += 1
+        self.bytes_sent += packet.size()
+
+        next_time = self.next_send_time(time)
+        if self.done(next_time):
+            Logger.info(time, "%s done after %d packets."
+                        % (self, self.sequence_number))
+            return
+        self.host.dispatch(SourceEvent(next_time, self))
+
+    def next_send_time(self, time):
+        """
+        Time the packet after the one sent at the given time goes out
+
+        :param time: Time the last packet was sent
+        :type time: float
+        :return: Time of the next packet
+        :rtype: float
+        """
+        return time + self.packet_interval
+
+
+class OnOffSource(CBRSource):
+    # Distributions of the on and off period lengths
+    EXPONENTIAL = "exponential"
+    PARETO = "pareto"
+
+    def __init__(self, host, flow_id, destination, rate, start, stop=None,
+                 amount=None, on_time=100, off_time=100,
+                 distribution=EXPONENTIAL, shape=1.5, seed=None,
+                 traffic_class=Packet.TRAFFIC_CLASS):
+        """
+        Source alternating between sending at a constant bit rate and staying
+        silent, for random periods.
+
+        Args:
+            host (Host):            Host sending the traffic.
+            flow_id (str):          Flow identifier.
+            destination (Host):     Host the traffic is sent to.
+            rate (float):           Sending rate while on, in Mbps.
+            start (float):          Start time of the source, in s.
+            stop (float):           Time the source stops, in s.
+            amount (float):         Amount of data to send, in MB.
+            on_time (float):        Mean length of the on periods, in ms.
+            off_time (float):       Mean length of the off periods, in ms.
+            distribution (str):     Distribution of the period lengths.
+            shape (float):          Shape of the Pareto distribution, > 1.
+            seed (int):             Seed of the source's random generator.
+            traffic_class (int):    Traffic class of the packets.
+        """
+        super(OnOffSource, self).__init__(host, flow_id, destination, rate,
+                                          start, stop, amount, traffic_class)
+        if distribution not in (self.EXPONENTIAL, self.PARETO):
+            raise ValueError("Unknown on/off distribution %s" % distribution)
+        if distribution == self.PARETO and shape <= 1:
+            raise ValueError("Pareto shape must be > 1 to have a mean.")
+        self.on_time = on_time
+        self.off_time = off_time
+        self.distribution = distribution
+        self.shape = shape
+        self.random = random.Random(seed)
+        # End of the current on period
+        self.on_until = self.start_time + self.period(self.on_time)
+
+    def __repr__(self):
+        return "OnOffSource[%s:%s]" % (self.host, self.flow_id)
+
+    def period(self, mean):
+        """
+        Draws the length of an on or off period
+
+        :param mean: Mean length of the period, in ms
+        :type mean: float
+        :return: Length of the period, in ms
+        :rtype: float
+        """
+        if self.distribution == self.PARETO:
+            scale = mean * (self.shape - 1) / self.shape
+            return scale * self.random.paretovariate(self.shape)
+        return self.random.expovariate(1. / mean)
+
+    def next_send_time(self, time):
+        next_time = time + self.packet_interval
+        if next_time < self.on_until:
+            return next_time
+        # Stay silent for an off period, then start the next on period
+        next_time = self.on_until + self.period(self.off_time)
+        self.on_until = next_time + self.period(self.on_time)
+        return next_time
@@ -0,0 +1,180 @@
+import bisect
+import random
+
+from components.packet_types import FlowPacket, Packet
+from events import EventTarget
+from events.event_types import FlowArrivalEvent
+from utils import Logger
+
+
+class FlowSizes(object):
+    # Empirical distributions, as (flow size in packets, cumulative probability)
+    WEB_SEARCH = "websearch"
+    DATA_MINING = "datamining"
+    # Parametric distributions with the given mean, in packets
+    PARETO = "pareto"
+    EXPONENTIAL = "exponential"
+
+    CDFS = {
+        WEB_SEARCH: [(1, 0), (6, 0.15), (13, 0.2), (19, 0.3), (33, 0.4),
+                     (53, 0.53), (133, 0.6), (667, 0.7), (1333, 0.8),
+                     (3333, 0.9), (6667, 0.97), (20000, 1)],
+        DATA_MINING: [(1, 0), (1, 0.5), (2, 0.6), (3, 0.7), (7, 0.8),
+                      (267, 0.9), (2107, 0.95), (66667, 0.99), (666667, 1)],
+    }
+
+    def __init__(self, distribution, rng, mean=None, shape=1.5):
+        """
+        Distribution of the sizes of the flows of a workload.
+
+        Args:
+            distribution (str):     Name of the distribution.
+            rng (random.Random):    Random generator to draw sizes with.
+            mean (float):           Mean flow size of parametric
+                                    distributions, in packets.
+            shape (float):          Shape of the Pareto distribution, > 1.
+        """
+        if distribution in self.CDFS:
+            cdf = self.CDFS[distribution]
+            self.sizes = [size for size, _ in cdf]
+            self.probabilities = [probability for _, probability in cdf]
+        elif distribution in (self.PARETO, self.EXPONENTIAL):
+            if mean is None:
+                raise ValueError("The %s flow size distribution needs a mean."
+                                 % distribution)
+            if distribution == self.PARETO and shape <= 1:
+                raise ValueError("Pareto shape must be > 1 to have a mean.")
+        else:
+            raise ValueError("Unknown flow size distribution %s. Known: %s"
+                             % (distribution, ", ".join(
+                                 sorted(self.CDFS.keys() +
+                                        [self.PARETO, self.EXPONENTIAL]))))
+        self.distribution = distribution
+        self.random = rng
+        self.mean = mean
+        self.shape = shape
+
+    def sample(self):
+        """
+        Draws a flow size
+
+        :return: Flow size in packets, at least 1
+        :rtype: int
+        """
+        if self.distribution == self.PARETO:
+            scale = self.mean * (self.shape - 1) / self.shape
+            size = scale * self.random.paretovariate(self.shape)
+        elif self.distribution == self.EXPONENTIAL:
+            size = self.random.expovariate(1. / self.mean)
+        else:
+            # Inverse of the piecewise linear CDF
+            u = self.random.random()
+            i = max(bisect.bisect_left(self.probabilities, u), 1)
+            p0, p1 = self.probabilities[i - 1], self.probabilities[i]
+            s0, s1 = self.sizes[i - 1], self.sizes[i]
+            size = s0 + (s1 - s0) * (u - p0) / (p1 - p0)
+        return max(int(round(size)), 1)
+
+
+class Workload(EventTarget):
+    def __init__(self, identifier, sources, destinations, rate, start,
+                 stop=None, count=None, sizes=FlowSizes.WEB_SEARCH, mean=None,
+                 shape=1.5, seed=None, congestion_method="RENO",
+                 parameters=None, pacing=False,
+                 traffic_class=Packet.TRAFFIC_CLASS, ecn=False):
+        """
+        Flows arriving as a Poisson process between random host pairs. Flows
+        are only created when they arrive, by a single FlowArrivalEvent that
+        schedules the next arrival.
+
+        Args:
+            identifier (str):           Name of the workload, prefixes the
+                                        flow IDs.
+            sources (Host[]):           Hosts the flows are sent from.
+            destinations (Host[]):      Hosts the flows are sent to.
+            rate (float):               Mean arrival rate, in flows per s.
+            start (float):              Time of the first arrival, in s.
+            stop (float):               Time arrivals stop, in s.
+            count (int):                Number of flows to create.
+            sizes (str):                Flow size distribution.
+            mean (float):               Mean flow size, in packets, for the
+                                        parametric distributions.
+            shape (float):              Shape of the Pareto distribution.
+            seed (int):                 Seed of the workload's random
+                                        generator.
+            congestion_method (str):    Congestion control of the flows.
+            parameters (dict):          Overrides of the protocol's constants.
+            pacing (bool):              Whether to pace the flows.
+            traffic_class (int):        Traffic class of the flows' packets.
+            ecn (bool):                 Whether the flows use ECN.
+        """
+        super(Workload, self).__init__()
+        if stop is None and count is None:
+            raise ValueError("Workload %s needs a stop time or a flow count."
+                             % identifier)
+        for source in sources:
+            if not any(host is not source for host in destinations):
+                raise ValueError("Workload %s has no destination for %s."
+                                 % (identifier, source))
+        self.id = identifier
+        self.sources = sources
+        self.destinations = destinations
+        self.rate = rate
+        self.start_time = start * 1000.
+        self.stop_time = stop * 1000. if stop is not None else None
+        self.count = count
+        # Sizes and arrivals are drawn from the same seeded generator
+        self.random = random.Random(seed)
+        self.sizes = FlowSizes(sizes, self.random, mean, shape)
+        self.congestion_method = congestion_method
+        self.parameters = parameters
+        self.pacing = pacing
+        self.traffic_class = traffic_class
+        self.ecn = ecn
+
+        # Number of flows created so far
+        self.arrivals = 0
+
+    def __repr__(self):
+        return "Workload[%s]" % self.id
+
+    def start(self):
+        """
+        Schedules the first arrival
+        """
+        self.dispatch(FlowArrivalEvent(self.start_time, self))
+
+    def done(self, time):
+        if self.count is not None and self.arrivals >= self.count:
+            return True
+        return self.stop_time is not None and time >= self.stop_time
+
+    def arrive(self, time):
+        """
+        Creates the flow arriving at the given time and schedules the next
+        arrival
+
+        :param time: Arrival time
+        :type time: float
+        :return: Nothing
+        :rtype: None
+        """
+        if self.done(time):
+            return
+        source = self.random.choice(self.sources)
+        destination = self.random.choice(
+            [host for host in self.destinations if host is not source])
+        packets = self.sizes.sample()
+        flow_id = "%s.%d" % (self.id, self.arrivals)
+        amount = packets * FlowPacket.FLOW_PACKET_SIZE / (1024. * 1024.)
+        Logger.info(time, "%s: flow %s of %d packets from %s to %s"
+                    % (self, flow_id, packets, source, destination))
+        source.queue_flow(time, flow_id, destination, amount,
+                          self.congestion_method, self.parameters,
+                          self.pacing, self.traffic_class, self.ecn)
+        self.arrivals += 1
+
+        # Poisson arrivals, rate is per s and time in ms
+        next_time = time + self.random.expovariate(self.rate / 1000.)
+        if not self.done(next_time):
+            self.dispatch(FlowArrivalEvent(next_time, self))
@@ -1,4 +1,9 @@
+from protocol import Protocol, get_protocol
 from null_protocol import NullProtocol
 from tcp_tahoe import TCPTahoe
 from tcp_reno import TCPReno
 from fast_tcp import FAST_TCP
+from bbr import BBR
+from tcp_vegas import TCPVegas
+from rtt_estimator import RTTEstimator
+from tcp_new_reno import TCPNewReno
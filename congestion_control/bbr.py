@@ -0,0 +1,272 @@
+from collections import deque
+
+from utils import Logger
+from protocol import Protocol
+from components.packet_types import AckPacket
+
+
+class BBRState:
+    STARTUP = "STARTUP"
+    DRAIN = "DRAIN"
+    PROBE_BW = "PROBE_BW"
+    PROBE_RTT = "PROBE_RTT"
+
+
+class BBR(Protocol):
+    """
+    Model-based congestion control. The bottleneck bandwidth and the minimum
+    RTT of the path are estimated from the ACK stream; the host is paced at
+    (a multiple of) the bottleneck bandwidth and the window is capped at a
+    multiple of the bandwidth-delay product.
+    """
+    NAME = "BBR"
+    INITIAL_CWND = 4
+    MIN_CWND = 4
+    # Gain used to double the sending rate every round trip during startup
+    HIGH_GAIN = 2.885
+    DRAIN_GAIN = 1 / 2.885
+    CWND_GAIN = 2
+    # Pacing gains cycled through while probing for bandwidth
+    PACING_GAIN_CYCLE = [1.25, 0.75, 1, 1, 1, 1, 1, 1]
+    # Length of the bandwidth max filter in round trips
+    BTL_BW_FILTER_LENGTH = 10
+    # Length of the min RTT filter in ms
+    MIN_RTT_FILTER_LENGTH = 10000
+    # Time spent draining the queue to measure the min RTT, in ms
+    PROBE_RTT_DURATION = 200
+    # Growth in bandwidth, and rounds without it, marking a full pipe
+    FULL_BW_THRESHOLD = 1.25
+    FULL_BW_COUNT = 3
+
+    def __init__(self, host, parameters=None):
+        super(BBR, self).__init__(host, parameters)
+
+        self.state = BBRState.STARTUP
+        self.pacing_gain = self.HIGH_GAIN
+        self.cwnd_gain = self.HIGH_GAIN
+
+        # Packets delivered so far and when the last delivery happened
+        self.delivered = 0
+        self.delivered_time = None
+        # Request number of the last ACK and out of order deliveries since
+        self.last_ack = 0
+        self.dup_delivered = 0
+        # { sequence_number : (delivered, delivered_time) } at send time
+        self.packet_states = {}
+
+        # Round trip counting
+        self.round_count = 0
+        self.next_round_delivered = 0
+        # Max delivery rate (packets/ms) of each of the last rounds
+        self.bw_samples = deque(maxlen=self.BTL_BW_FILTER_LENGTH)
+
+        self.min_rtt = None
+        self.min_rtt_stamp = None
+
+        # Startup full pipe detection
+        self.filled_pipe = False
+        self.full_bw = 0
+        self.full_bw_count = 0
+
+        # Probe BW gain cycling
+        self.cycle_index = 0
+        self.cycle_stamp = None
+
+        # Probe RTT
+        self.probe_rtt_done_stamp = None
+        self.prior_cwnd = None
+
+    def btl_bw(self):
+        """
+        Estimated bottleneck bandwidth
+
+        :return: Bandwidth in packets per ms, None if there is no estimate yet
+        :rtype: float | None
+        """
+        if len(self.bw_samples) == 0 or max(self.bw_samples) == 0:
+            return None
+        return max(self.bw_samples)
+
+    def bdp(self):
+        """
+        Estimated bandwidth-delay product of the path, in packets
+        """
+        btl_bw = self.btl_bw()
+        if btl_bw is None or self.min_rtt is None:
+            return None
+        return btl_bw * self.min_rtt
+
+    def pacing_rate(self, time):
+        btl_bw = self.btl_bw()
+        if btl_bw is None:
+            # No model yet, let the initial window out unpaced
+            return None
+        return self.pacing_gain * btl_bw
+
+    def handle_send(self, packet, time):
+        if self.delivered_time is None:
+            self.delivered_time = time
+        self.packet_states[packet.sequence_number] = \
+            (self.delivered, self.delivered_time)
+
+    def handle_receive(self, packet, time):
+        if not isinstance(packet, AckPacket):
+            return
+        state = self.packet_states.get(packet.trigger_packet.sequence_number)
+        newly_delivered = self.update_delivered(packet.request_number, time)
+        if state is not None:
+            self.update_model(state, time)
+        self.update_state(time)
+        self.update_window_size(time, newly_delivered)
+
+    def handle_timeout(self, packet, time):
+        # Losses are not a congestion signal for BBR, the model is unchanged
+        pass
+
+    # ------------------------- Model Estimation ------------------------ #
+    def update_delivered(self, Rn, time):
+        """
+        Counts the packets delivered by the ACK with the given request number
+
+        :param Rn: Request number of the ACK
+        :type Rn: int
+        :param time: Time the ACK was received
+        :type time: float
+        :return: Number of packets newly delivered
+        :rtype: int
+        """
+        if Rn > self.last_ack:
+            # Out of order packets already counted when they were dup-ACKed
+            newly_delivered = max(Rn - self.last_ack - self.dup_delivered, 0)
+            for sequence_number in range(self.last_ack, Rn):
+                self.packet_states.pop(sequence_number, None)
+            self.last_ack = Rn
+            self.dup_delivered = 0
+        else:
+            # A duplicate ACK still means a packet left the network
+            newly_delivered = 1
+            self.dup_delivered += 1
+        self.delivered += newly_delivered
+        self.delivered_time = time
+        return newly_delivered
+
+    def update_model(self, packet_state, time):
+        """
+        Updates the bandwidth and RTT estimates with the rate sample of the
+        packet that triggered the ACK
+
+        :param packet_state: (delivered, delivered time) at send
+        :type packet_state: (int, float)
+        :param time: Time the ACK was received
+        :type time: float
+        """
+        delivered, delivered_time = packet_state
+        # Round trips are counted by packets sent after the round started
+        if delivered >= self.next_round_delivered:
+            self.next_round_delivered = self.delivered
+            self.round_count += 1
+            self.bw_samples.append(0)
+            self.check_full_pipe()
+
+        interval = time - delivered_time
+        if interval > 0:
+            rate = (self.delivered - delivered) / float(interval)
+            self.bw_samples[-1] = max(self.bw_samples[-1], rate)
+
+        # The host has already sampled this ACK's RTT
+        rtt = self.host.rtt_estimator.last_rtt
+        if rtt is None:
+            return
+        if self.min_rtt is None or rtt <= self.min_rtt:
+            self.min_rtt = rtt
+            self.min_rtt_stamp = time
+
+    def check_full_pipe(self):
+        """
+        The pipe is full once the bandwidth stops growing during startup
+        """
+        btl_bw = self.btl_bw()
+        if self.filled_pipe or btl_bw is None:
+            return
+        if btl_bw >= self.full_bw * self.FULL_BW_THRESHOLD:
+            self.full_bw = btl_bw
+            self.full_bw_count = 0
+            return
+        self.full_bw_count += 1
+        if self.full_bw_count >= self.FULL_BW_COUNT:
+            self.filled_pipe = True
+
+    # -------------------------- State Machine -------------------------- #
+    def update_state(self, time):
+        """
+        Moves through the STARTUP, DRAIN, PROBE_BW and PROBE_RTT states
+        """
+        if self.state == BBRState.STARTUP and self.filled_pipe:
+            self.enter_state(time, BBRState.DRAIN,
+                             self.DRAIN_GAIN, self.HIGH_GAIN)
+        if self.state == BBRState.DRAIN:
+            bdp = self.bdp()
+            if bdp is not None and len(self.host.awaiting_ack) <= bdp:
+                self.enter_probe_bw(time)
+        if self.state == BBRState.PROBE_BW:
+            self.advance_cycle(time)
+
+        min_rtt_expired = self.min_rtt_stamp is not None and \
+            time - self.min_rtt_stamp > self.MIN_RTT_FILTER_LENGTH
+        if min_rtt_expired and self.state != BBRState.PROBE_RTT:
+            self.prior_cwnd = self.host.cwnd
+            self.probe_rtt_done_stamp = time + self.PROBE_RTT_DURATION
+            self.enter_state(time, BBRState.PROBE_RTT, 1, 1)
+        if self.state == BBRState.PROBE_RTT and \
+           time >= self.probe_rtt_done_stamp:
+            # Whatever RTT was seen while drained is the new minimum
+            self.min_rtt_stamp = time
+            self.set_window_size(time, max(self.host.cwnd, self.prior_cwnd))
+            if self.filled_pipe:
+                self.enter_probe_bw(time)
+            else:
+                self.enter_state(time, BBRState.STARTUP,
+                                 self.HIGH_GAIN, self.HIGH_GAIN)
+
+    def enter_state(self, time, state, pacing_gain, cwnd_gain):
+        Logger.info(time, "BBR flow %s: %s -> %s"
+                    % (self.host.flow[0], self.state, state))
+        self.state = state
+        self.pacing_gain = pacing_gain
+        self.cwnd_gain = cwnd_gain
+
+    def enter_probe_bw(self, time):
+        self.enter_state(time, BBRState.PROBE_BW,
+                         self.PACING_GAIN_CYCLE[0], self.CWND_GAIN)
+        self.cycle_index = 0
+        self.cycle_stamp = time
+
+    def advance_cycle(self, time):
+        """
+        Moves to the next pacing gain once per min RTT
+        """
+        if self.min_rtt is None or time - self.cycle_stamp <= self.min_rtt:
+            return
+        self.cycle_index = (self.cycle_index + 1) % len(self.PACING_GAIN_CYCLE)
+        self.cycle_stamp = time
+        self.pacing_gain = self.PACING_GAIN_CYCLE[self.cycle_index]
+
+    def update_window_size(self, time, newly_delivered):
+        """
+        Grows the window towards cwnd_gain * BDP
+        """
+        cwnd = self.host.cwnd
+        bdp = self.bdp()
+        if self.state == BBRState.PROBE_RTT:
+            cwnd = self.MIN_CWND
+        elif bdp is None:
+            cwnd += newly_delivered
+        else:
+            target = self.cwnd_gain * bdp
+            if self.filled_pipe:
+                cwnd = min(cwnd + newly_delivered, target)
+            elif cwnd < target:
+                cwnd += newly_delivered
+        cwnd = max(cwnd, self.MIN_CWND)
+        if cwnd != self.host.cwnd:
+            self.set_window_size(time, cwnd)
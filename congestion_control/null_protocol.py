@@ -2,10 +2,11 @@ from protocol import Protocol
 
 
 class NullProtocol(Protocol):
+    NAME = "NONE"
     INITIAL_CWND = 1e10
 
-    def __init__(self, host):
-        super(NullProtocol, self).__init__(host)
+    def __init__(self, host, parameters=None):
+        super(NullProtocol, self).__init__(host, parameters)
 
     def handle_send(self, packet, time):
         pass
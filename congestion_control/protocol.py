@@ -1,11 +1,82 @@
 import abc
+import importlib
+
+from components.packet_types import FlowPacket
+
+
+class ProtocolRegistry(abc.ABCMeta):
+    """
+    Metaclass registering every Protocol subclass that defines a NAME, so
+    that flow specifications can select it by name.
+    """
+    # { NAME : Protocol subclass }
+    protocols = {}
+
+    def __init__(cls, name, bases, attrs):
+        super(ProtocolRegistry, cls).__init__(name, bases, attrs)
+        if attrs.get("NAME"):
+            ProtocolRegistry.protocols[attrs["NAME"].upper()] = cls
+
+
+def get_protocol(name):
+    """
+    Get the congestion control protocol with the given name. The name is
+    either the NAME a protocol registered itself under, or the dotted path to
+    a Protocol subclass in a module that isn't loaded yet.
+
+    :param name: Registered name or dotted path of the protocol
+    :type name: str
+    :return: Protocol class
+    :rtype: type
+    """
+    if name.upper() in ProtocolRegistry.protocols:
+        return ProtocolRegistry.protocols[name.upper()]
+    module_name, _, class_name = name.rpartition(".")
+    module = None
+    if module_name:
+        # Importing the module registers the protocols defined in it
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            pass
+    if module is not None:
+        protocol = getattr(module, class_name, None)
+        if isinstance(protocol, type) and issubclass(protocol, Protocol):
+            return protocol
+    raise ValueError("Unknown congestion control %s. Known protocols: %s"
+                     % (name, ", ".join(sorted(ProtocolRegistry.protocols))))
 
 
 class Protocol(object):
-    __metaclass__ = abc.ABCMeta
+    __metaclass__ = ProtocolRegistry
 
-    def __init__(self, host):
+    # Name the protocol is selected by in the flow specification
+    NAME = None
+    # Whether the protocol reacts to ECN-Echo ACKs, flows can only use ECN if
+    # it does
+    ECN_CAPABLE = False
+
+    def __init__(self, host, parameters=None):
+        """
+        Congestion control of a host's flow.
+
+        Args:
+            host (Host):            The host whose flow is controlled.
+            parameters (dict):      Overrides of the protocol's constants for
+                                    this flow, e.g. {"ALPHA": 20}.
+        """
         self.host = host
+        for parameter, value in (parameters or {}).items():
+            # Constants of this base class describe the protocol, they
+            # aren't tunable
+            if not parameter.isupper() or not hasattr(self, parameter) or \
+                    hasattr(Protocol, parameter):
+                raise ValueError("%s has no parameter %s"
+                                 % (self.__class__.__name__, parameter))
+            setattr(self, parameter, value)
+        # Packets below this sequence number were sent before the last ECN
+        # window reduction
+        self.ecn_recover = 0
 
     @abc.abstractmethod
     def handle_send(self, packet, time):
@@ -19,5 +90,42 @@ class Protocol(object):
     def handle_timeout(self, packet, time):
         raise NotImplementedError
 
+    def pacing_rate(self, time):
+        """
+        Rate at which the host should pace its transmissions
+
+        :param time: Current time
+        :type time: float
+        :return: Pacing rate in packets per ms, or None to send as fast as the
+                 window allows
+        :rtype: float | None
+        """
+        return None
+
+    def congestion_echoed(self, packet):
+        """
+        Whether the ACK echoes a congestion mark the window hasn't been
+        reduced for yet. The window is reduced at most once per window of
+        data, marks on packets sent before the last reduction are ignored.
+
+        :param packet: ACK received
+        :type packet: AckPacket
+        :return: True if the window should be reduced
+        :rtype: bool
+        """
+        if not packet.ece or packet.request_number <= self.ecn_recover:
+            return False
+        # Everything of the flow in flight was sent before this reduction
+        flow_id = self.host.flow[0]
+        in_flight = [sent.sequence_number
+                     for sent, _ in self.host.awaiting_ack.values()
+                     if isinstance(sent, FlowPacket) and
+                     sent.flow_id == flow_id]
+        self.ecn_recover = max(in_flight + [self.host.sequence_nums[0] - 1]) + 1
+        return True
+
     def set_window_size(self, time, value):
         self.host.set_window_size(time, value)
+
+    def retransmit(self, time, sequence_number):
+        self.host.retransmit(time, sequence_number)
@@ -0,0 +1,59 @@
+class RTTEstimator(object):
+    """
+    Per-flow RTT estimate shared by the host and its congestion control. Only
+    a fixed handful of values is kept, no matter how many samples are taken.
+    """
+    # Gains of the smoothed RTT and of the RTT variation (RFC 6298)
+    ALPHA = 0.125
+    BETA = 0.25
+
+    def __init__(self):
+        # Smallest RTT ever observed
+        self.base_rtt = None
+        # Smoothed RTT and RTT variation
+        self.srtt = None
+        self.rttvar = None
+        # Most recent sample
+        self.last_rtt = None
+        # Minimum RTT of the current round trip and of the last complete one
+        self.round_min_rtt = None
+        self.last_round_min_rtt = None
+        # Number of complete round trips and the time the current one ends
+        self.rounds = 0
+        self.round_end = None
+
+    def __repr__(self):
+        return "RTTEstimator(base=%s, srtt=%s)" % (self.base_rtt, self.srtt)
+
+    def add_sample(self, time, rtt):
+        """
+        Adds an RTT sample taken at the given time
+
+        :param time: Time the sample was taken
+        :type time: float
+        :param rtt: Round trip time in ms
+        :type rtt: float
+        :return: Nothing
+        :rtype: None
+        """
+        self.last_rtt = rtt
+        if self.base_rtt is None or rtt < self.base_rtt:
+            self.base_rtt = rtt
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2.
+            self.round_end = time + rtt
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + \
+                self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+
+        if self.round_min_rtt is None or rtt < self.round_min_rtt:
+            self.round_min_rtt = rtt
+        # A round trip is over once a smoothed RTT has passed since its start
+        if time >= self.round_end:
+            self.last_round_min_rtt = self.round_min_rtt
+            self.round_min_rtt = None
+            self.rounds += 1
+            self.round_end = time + self.srtt
+
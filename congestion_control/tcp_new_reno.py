@@ -0,0 +1,110 @@
+from utils import Logger
+from protocol import Protocol
+from components.packet_types import AckPacket
+
+
+class TCPNewReno(Protocol):
+    """
+    Reno with fast retransmit and NewReno fast recovery. The third duplicate
+    ACK retransmits the missing packet at once and inflates the window while
+    the duplicates keep coming; partial ACKs retransmit the next hole without
+    leaving recovery, so several losses in a window don't need a timeout.
+    """
+    NAME = "NEWRENO"
+    INITIAL_CWND = 2
+    INITIAL_SSTHRESH = 1e10
+    TIMEOUT_TOLERANCE = 1000
+    # Duplicate ACKs that trigger a fast retransmit
+    DUP_ACK_THRESHOLD = 3
+    ECN_CAPABLE = True
+
+    def __init__(self, host, parameters=None):
+        super(TCPNewReno, self).__init__(host, parameters)
+
+        # Self Start threshold
+        self.ssthresh = self.INITIAL_SSTHRESH
+        # Last drop
+        self.last_drop = None
+        # Highest request number received and duplicate ACKs for it
+        self.last_req_num = 0
+        self.dup_acks = 0
+        # Highest sequence number sent so far
+        self.high_seq = -1
+        # Whether we're in fast recovery and the packet that ends it
+        self.in_recovery = False
+        self.recover = None
+
+    def handle_send(self, packet, time):
+        self.high_seq = max(self.high_seq, packet.sequence_number)
+
+    def handle_receive(self, packet, time):
+        if not isinstance(packet, AckPacket):
+            return
+        Rn = packet.request_number
+        if Rn > self.last_req_num:
+            newly_acked = Rn - self.last_req_num
+            self.last_req_num = Rn
+            self.dup_acks = 0
+            if self.congestion_echoed(packet) and not self.in_recovery:
+                # Marked rather than lost, halve the window without a
+                # retransmission
+                self.ssthresh = max(self.host.cwnd / 2., self.INITIAL_CWND)
+                self.set_window_size(time, self.ssthresh)
+                Logger.info(time, "ECN echo received for flow %s."
+                            % self.host.flow[0])
+                return
+            self.handle_new_ack(time, Rn, newly_acked)
+        elif Rn == self.last_req_num:
+            self.dup_acks += 1
+            self.handle_duplicate_ack(time, Rn)
+
+    def handle_new_ack(self, time, Rn, newly_acked):
+        cwnd = self.host.cwnd
+        if self.in_recovery:
+            if Rn > self.recover:
+                # Full ACK, everything sent before the loss made it through
+                self.in_recovery = False
+                self.set_window_size(time, self.ssthresh)
+                Logger.info(time, "Fast recovery over for flow %s."
+                            % self.host.flow[0])
+            else:
+                # Partial ACK, the packet at Rn was lost as well
+                self.retransmit(time, Rn)
+                self.set_window_size(time, max(cwnd - newly_acked + 1,
+                                               self.INITIAL_CWND))
+        elif cwnd < self.ssthresh:
+            self.set_window_size(time, cwnd + newly_acked)
+        else:
+            self.set_window_size(time, cwnd + float(newly_acked) / cwnd)
+
+    def handle_duplicate_ack(self, time, Rn):
+        cwnd = self.host.cwnd
+        if self.in_recovery:
+            # Every duplicate means another packet left the network
+            self.set_window_size(time, cwnd + 1)
+            self.host.send_packets(time, self.host.flow[0])
+        elif self.dup_acks == self.DUP_ACK_THRESHOLD and \
+                (self.recover is None or Rn > self.recover):
+            # Duplicates of packets sent before the last loss don't start
+            # another recovery
+            Logger.warning(time, "Duplicate ACKs received for flow %s, fast "
+                                 "retransmit of %d." % (self.host.flow[0], Rn))
+            self.ssthresh = max(cwnd / 2., self.INITIAL_CWND)
+            self.in_recovery = True
+            self.recover = self.high_seq
+            self.retransmit(time, Rn)
+            self.set_window_size(time, self.ssthresh + self.DUP_ACK_THRESHOLD)
+
+    def handle_timeout(self, packet, time):
+        if self.last_drop is None or \
+           time - self.last_drop > self.TIMEOUT_TOLERANCE:
+            self.in_recovery = False
+            self.recover = self.high_seq
+            self.dup_acks = 0
+            self.ssthresh = max(self.host.cwnd / 2., self.INITIAL_CWND)
+            self.set_window_size(time, self.INITIAL_CWND)
+
+            self.last_drop = time
+
+            Logger.warning(time, "Timeout Received. SS_Threshold -> %d"
+                           % self.ssthresh)
@@ -4,22 +4,25 @@ from components.packet_types import AckPacket
 
 
 class TCPReno(Protocol):
+    NAME = "RENO"
     INITIAL_CWND = 2
     INITIAL_SSTHRESH = 1e10
     TIMEOUT_TOLERANCE = 1000
     MAX_DUPLICATES = 4
+    ECN_CAPABLE = True
 
-    def __init__(self, host):
-        super(TCPReno, self).__init__(host)
+    def __init__(self, host, parameters=None):
+        super(TCPReno, self).__init__(host, parameters)
 
         # Whether the flow is in slow start or not.
         self.ss = True
         # Self Start threshold
-        self.ssthresh = TCPReno.INITIAL_SSTHRESH
+        self.ssthresh = self.INITIAL_SSTHRESH
         # Last drop
         self.last_drop = None
-        # Last N request nums
-        self.last_n_req_nums = []
+        # Last request number and the number of duplicate ACKs for it
+        self.last_req_num = None
+        self.dup_acks = 0
 
     def handle_send(self, packet, time):
         pass
@@ -28,23 +31,33 @@ class TCPReno(Protocol):
         if isinstance(packet, AckPacket):
             Rn = packet.request_number
 
-            self.last_n_req_nums.append(Rn)
-            if len(self.last_n_req_nums) > TCPReno.MAX_DUPLICATES:
-                self.last_n_req_nums.pop(0)
+            if Rn == self.last_req_num:
+                self.dup_acks += 1
+            else:
+                self.last_req_num = Rn
+                self.dup_acks = 0
 
             Sn, Sb, Sm = self.host.sequence_nums
             cwnd = self.host.cwnd
             if self.last_drop is None or \
-               time - self.last_drop > TCPReno.TIMEOUT_TOLERANCE:
-                if len(self.last_n_req_nums) == TCPReno.MAX_DUPLICATES and \
-                   all(num == Rn for num in self.last_n_req_nums):
+               time - self.last_drop > self.TIMEOUT_TOLERANCE:
+                # The last MAX_DUPLICATES ACKs all requested Rn
+                if self.dup_acks >= self.MAX_DUPLICATES - 1:
                     # If we've had duplicate ACKs, then enter fast retransmit.
-                    self.ssthresh = max(self.host.cwnd / 2, TCPReno.INITIAL_CWND)
+                    self.ssthresh = max(self.host.cwnd / 2, self.INITIAL_CWND)
                     self.set_window_size(time, self.ssthresh)
                     Logger.warning(time, "Duplicate ACKs received for flow %s." % self.host.flow[0])
 
                     self.last_drop = time
-            if self.ss:
+            if self.congestion_echoed(packet):
+                # Marked rather than lost, halve the window without a
+                # retransmission
+                self.ss = False
+                self.ssthresh = max(cwnd / 2, self.INITIAL_CWND)
+                self.set_window_size(time, self.ssthresh)
+                Logger.info(time, "ECN echo received for flow %s."
+                            % self.host.flow[0])
+            elif self.ss:
                 self.set_window_size(time, cwnd + 1)
                 if self.host.cwnd >= self.ssthresh:
                     self.ss = False
@@ -56,9 +69,9 @@ class TCPReno(Protocol):
 
     def handle_timeout(self, packet, time):
         if self.last_drop is None or \
-           time - self.last_drop > TCPReno.TIMEOUT_TOLERANCE:
+           time - self.last_drop > self.TIMEOUT_TOLERANCE:
             self.ss = True
-            self.ssthresh = max(self.host.cwnd / 2, TCPReno.INITIAL_CWND)
+            self.ssthresh = max(self.host.cwnd / 2, self.INITIAL_CWND)
             self.set_window_size(time, self.ssthresh)
 
             self.last_drop = time
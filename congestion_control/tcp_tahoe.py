@@ -4,17 +4,19 @@ from components.packet_types import AckPacket
 
 
 class TCPTahoe(Protocol):
+    NAME = "TAHOE"
     INITIAL_CWND = 2
     INITIAL_SSTHRESH = 1e10
     TIMEOUT_TOLERANCE = 1000
+    ECN_CAPABLE = True
 
-    def __init__(self, host):
-        super(TCPTahoe, self).__init__(host)
+    def __init__(self, host, parameters=None):
+        super(TCPTahoe, self).__init__(host, parameters)
 
         # Whether the flow is in slow start or not.
         self.ss = True
         # Self Start threshold
-        self.ssthresh = TCPTahoe.INITIAL_SSTHRESH
+        self.ssthresh = self.INITIAL_SSTHRESH
         # Last drop
         self.last_drop = None
 
@@ -26,7 +28,15 @@ class TCPTahoe(Protocol):
             Rn = packet.request_number
             Sn, Sb, Sm = self.host.sequence_nums
             cwnd = self.host.cwnd
-            if self.ss:
+            if self.congestion_echoed(packet):
+                # Marked rather than lost, halve the window without a
+                # retransmission or slow start
+                self.ss = False
+                self.ssthresh = max(cwnd / 2, self.INITIAL_CWND)
+                self.set_window_size(time, self.ssthresh)
+                Logger.info(time, "ECN echo received for flow %s."
+                            % self.host.flow[0])
+            elif self.ss:
                 self.set_window_size(time, cwnd + 1)
                 if self.host.cwnd >= self.ssthresh:
                     self.ss = False
@@ -38,10 +48,10 @@ class TCPTahoe(Protocol):
 
     def handle_timeout(self, packet, time):
         if self.last_drop is None or \
-           time - self.last_drop > TCPTahoe.TIMEOUT_TOLERANCE:
+           time - self.last_drop > self.TIMEOUT_TOLERANCE:
             self.ss = True
-            self.ssthresh = max(self.host.cwnd / 2, TCPTahoe.INITIAL_CWND)
-            self.set_window_size(time, TCPTahoe.INITIAL_CWND)
+            self.ssthresh = max(self.host.cwnd / 2, self.INITIAL_CWND)
+            self.set_window_size(time, self.INITIAL_CWND)
 
             self.last_drop = time
 
@@ -0,0 +1,82 @@
+from utils import Logger
+from protocol import Protocol
+from components.packet_types import AckPacket
+
+
+class TCPVegas(Protocol):
+    """
+    Delay-based congestion control. Once per round trip the number of packets
+    queued in the network is estimated as cwnd * (1 - baseRTT / RTT) and the
+    window is adjusted to keep it between ALPHA and BETA.
+    """
+    NAME = "VEGAS"
+    INITIAL_CWND = 2
+    INITIAL_SSTHRESH = 1e10
+    TIMEOUT_TOLERANCE = 1000
+    # Bounds on the number of packets queued in the network
+    ALPHA = 2
+    BETA = 4
+    # Queued packets at which slow start ends
+    GAMMA = 1
+
+    def __init__(self, host, parameters=None):
+        super(TCPVegas, self).__init__(host, parameters)
+
+        # Whether the flow is in slow start or not.
+        self.ss = True
+        # Self Start threshold
+        self.ssthresh = self.INITIAL_SSTHRESH
+        # Last drop
+        self.last_drop = None
+        # Last round trip the window was adjusted for
+        self.last_round = 0
+
+    def handle_send(self, packet, time):
+        pass
+
+    def handle_receive(self, packet, time):
+        if not isinstance(packet, AckPacket):
+            return
+        cwnd = self.host.cwnd
+        rtt_estimator = self.host.rtt_estimator
+        if self.ss:
+            self.set_window_size(time, cwnd + 1)
+            if self.host.cwnd >= self.ssthresh:
+                self.ss = False
+                Logger.info(time, "SS phase over for Flow %s. CA started."
+                            % (self.host.flow[0]))
+        # The rest only happens once per round trip
+        if rtt_estimator.rounds == self.last_round or \
+           rtt_estimator.last_round_min_rtt is None:
+            return
+        self.last_round = rtt_estimator.rounds
+
+        base_rtt = rtt_estimator.base_rtt
+        rtt = rtt_estimator.last_round_min_rtt
+        cwnd = self.host.cwnd
+        queued = cwnd * (1 - base_rtt / float(rtt))
+        if self.ss:
+            if queued > self.GAMMA:
+                # Drain what was queued during slow start
+                self.ss = False
+                self.ssthresh = cwnd
+                self.set_window_size(time, max(cwnd - queued,
+                                               self.INITIAL_CWND))
+                Logger.info(time, "SS phase over for Flow %s. CA started."
+                            % (self.host.flow[0]))
+        elif queued < self.ALPHA:
+            self.set_window_size(time, cwnd + 1)
+        elif queued > self.BETA:
+            self.set_window_size(time, max(cwnd - 1, self.INITIAL_CWND))
+
+    def handle_timeout(self, packet, time):
+        if self.last_drop is None or \
+           time - self.last_drop > self.TIMEOUT_TOLERANCE:
+            self.ss = True
+            self.ssthresh = max(self.host.cwnd / 2, self.INITIAL_CWND)
+            self.set_window_size(time, self.INITIAL_CWND)
+
+            self.last_drop = time
+
+            Logger.warning(time, "Timeout Received. SS_Threshold -> %d"
+                           % self.ssthresh)
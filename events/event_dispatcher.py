@@ -2,26 +2,31 @@ from collections import namedtuple
 
 from events.event_types.event import Event
 from event_types import PacketReceivedEvent
-from events.event_types.graph_events import GraphEvent
 from utils import Logger
+from utils.graphing_helpers import FlowThroughputTracker
+from utils.metrics_store import MetricsStore
 
 TimerTuple = namedtuple("TimerTuple", ["interval", "event"])
 
 
 class EventDispatcher:
 
-    def __init__(self):
+    def __init__(self, sink=None):
         """
         An event queue that process events at a specific time.
+
+        Args:
+            sink (MetricsSink): Sink metric samples are written to as they
+                                happen, instead of being kept in memory.
         """
         # Queue containing events to dispatch, keys are dispatch times
         self.queue = {}
         # Timer queue containing timers to dispatch, keys are dispatch times
         self.timers = {}
-        # Events to use for graphing
-        self.graph_events = []
-        # PacketReceived events to use for generating flow throughput events
-        self.packet_received_events = []
+        # Metric samples to use for graphing
+        self.metrics = MetricsStore(sink)
+        # Flow throughput is computed as packets arrive
+        self.flow_throughput = FlowThroughputTracker(self.metrics)
 
     def push(self, event):
         """
@@ -53,12 +58,9 @@ class EventDispatcher:
             if event_time <= time:
                 for event in self.queue.pop(event_time, []):
                     Logger.trace(event_time, "Executing event %s" % event)
-                    # Filter graph events
-                    if isinstance(event, GraphEvent):
-                        self.graph_events.append(event)
                     # Filter PacketReceived events to create flow through. graph
                     if isinstance(event, PacketReceivedEvent):
-                        self.packet_received_events.append(event)
+                        self.flow_throughput.add(event)
                     event.execute()
             else:
                 break
@@ -77,6 +79,23 @@ class EventDispatcher:
                 break
         return len(self.queue) != 0
 
+    def record_metric(self, metric, identifier, time, value):
+        """
+        Records a metric sample dispatched by a component
+
+        :param metric: Name of the metric
+        :type metric: str
+        :param identifier: Flow or link the sample is about
+        :type identifier: str
+        :param time: Time of the sample
+        :type time: float
+        :param value: Value of the sample
+        :type value: float
+        :return: Nothing
+        :rtype: None
+        """
+        self.metrics.record(metric, identifier, time, value)
+
     def listen(self, component):
         """
         Listens to a network component for events.
@@ -30,6 +30,24 @@ class EventTarget(object):
             return
         self.listeners.append(listener)
 
+    def record_metric(self, metric, identifier, time, value):
+        """
+        Records a metric sample with the listeners
+
+        :param metric: Name of the metric
+        :type metric: str
+        :param identifier: Flow or link the sample is about
+        :type identifier: str
+        :param time: Time of the sample
+        :type time: float
+        :param value: Value of the sample
+        :type value: float
+        :return: Nothing
+        :rtype: None
+        """
+        for listener in self.listeners:
+            listener.record_metric(metric, identifier, time, value)
+
     def add_timer(self, event, time, interval):
         """
         Add the timer for the event to the listener
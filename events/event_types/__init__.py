@@ -5,3 +5,8 @@ from flow_start_event import FlowStartEvent
 from link_free_event import LinkFreeEvent
 from ack_received_event import AckReceivedEvent
 from update_dynamic_routing_table_event import UpdateDynamicRoutingTableEvent
+from send_packets_event import SendPacketsEvent
+from source_event import SourceEvent
+from flow_arrival_event import FlowArrivalEvent
+from update_centralized_routing_event import UpdateCentralizedRoutingEvent
+from spf_event import SPFEvent
@@ -0,0 +1,13 @@
+from events.event_types.event import Event
+
+
+class FlowArrivalEvent(Event):
+    def __init__(self, time, workload):
+        super(FlowArrivalEvent, self).__init__(time)
+        self.workload = workload
+
+    def execute(self):
+        self.workload.arrive(self.time)
+
+    def __repr__(self):
+        return "FlowArrival<%s>" % self.workload
@@ -1,8 +0,0 @@
-from graph_event import GraphEvent
-from dropped_packet_event import DroppedPacketEvent
-from window_size_event import WindowSizeEvent
-from link_throughput_event import LinkThroughputEvent
-from link_buffer_size_event import LinkBufferSizeEvent
-from flow_throughput_event import FlowThroughputEvent
-from bucket_event import BucketEvent
-from rtt_event import RTTEvent
@@ -0,0 +1,13 @@
+from events.event_types.event import Event
+
+
+class SendPacketsEvent(Event):
+    def __init__(self, time, pacer):
+        super(SendPacketsEvent, self).__init__(time)
+        self.pacer = pacer
+
+    def execute(self):
+        self.pacer.release(self.time)
+
+    def __repr__(self):
+        return "SendPackets<%s>" % self.pacer.host
@@ -0,0 +1,13 @@
+from events.event_types.event import Event
+
+
+class SourceEvent(Event):
+    def __init__(self, time, source):
+        super(SourceEvent, self).__init__(time)
+        self.source = source
+
+    def execute(self):
+        self.source.emit(self.time)
+
+    def __repr__(self):
+        return "Source<%s>" % self.source
@@ -0,0 +1,14 @@
+from event import Event
+
+
+class SPFEvent(Event):
+    def __init__(self, time, router, dynamic):
+        super(SPFEvent, self).__init__(time)
+        self.router = router
+        self.dynamic = dynamic
+
+    def execute(self):
+        self.router.run_spf(self.dynamic)
+
+    def __repr__(self):
+        return "SPFEvent<%s>" % self.router
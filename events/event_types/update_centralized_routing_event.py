@@ -0,0 +1,15 @@
+from event import Event
+from utils import Logger
+
+
+class UpdateCentralizedRoutingEvent(Event):
+    def __init__(self, time, routing):
+        super(UpdateCentralizedRoutingEvent, self).__init__(time)
+        self.routing = routing
+
+    def execute(self):
+        Logger.debug(self.time, "%s: Updating dynamic routing tables." % self)
+        self.routing.update_dynamic_tables(self.time)
+
+    def __repr__(self):
+        return "UpdateCentralizedRoutingEvent<%s>" % self.routing
@@ -1,11 +1,15 @@
 import argparse
 from utils.grapher import Grapher
+from utils.metrics_sink import MetricsSink
+from utils.metrics_store import Metric
+from utils.results_file import ResultsFile
 
 
 def get_argument_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("filenames",
-                        help="The filenames of the csv file to plot",
+                        help="The filenames of the results, metrics or csv "
+                             "files to plot",
                         nargs="*",
                         type=str)
     parser.add_argument("-b", "--bucket-size",
@@ -13,18 +17,36 @@ def get_argument_parser():
                         nargs="*",
                         type=int,
                         default=None)
+    parser.add_argument("-m", "--metrics",
+                        help="Metrics of a results file to plot, all if none",
+                        nargs="*",
+                        choices=Metric.ALL,
+                        default=None)
+    parser.add_argument("-p", "--max-points",
+                        help="Most points plotted per series, 0 to plot "
+                             "every sample",
+                        type=int,
+                        default=Grapher.MAX_POINTS)
     return parser
 
 if __name__ == '__main__':
     # Parse command line arguments
     args = get_argument_parser().parse_args()
     # Plot the files
-    grapher = Grapher()
+    grapher = Grapher(max_points=args.max_points)
     assert args.bucket_size is None or \
         len(args.filenames) == len(args.bucket_size), \
         "Need a bucket width for every graph"
     for i, filename in enumerate(args.filenames):
         bucket_size = int(args.bucket_size[i]) if args.bucket_size else None
-        grapher.plot_csv(filename, bucket_size)
+        if ResultsFile.is_results_file(filename):
+            grapher.graph_results_file(filename,
+                                       bucket_size or Grapher.BUCKET_SIZE,
+                                       args.metrics)
+        elif MetricsSink.is_metrics_file(filename):
+            grapher.graph_metrics_file(filename,
+                                       bucket_size or Grapher.BUCKET_SIZE)
+        else:
+            grapher.plot_csv(filename, bucket_size)
     # Show the graphs
     grapher.show()
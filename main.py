@@ -1,6 +1,7 @@
 import argparse
 
 from utils import Logger, LoggerLevel
+from utils.grapher import Grapher
 from utils.parser import Parser
 from components import Network
 
@@ -20,6 +21,16 @@ def get_argument_parser():
     parser.add_argument("-o", "--output",
                         help="the folder to output the graphs to",
                         type=str)
+    parser.add_argument("-m", "--metrics",
+                        help="write the graph samples to this file during "
+                             "the simulation instead of keeping them in "
+                             "memory",
+                        type=str)
+    parser.add_argument("-p", "--max-points",
+                        help="the most points plotted per series, 0 to plot "
+                             "every sample",
+                        type=int,
+                        default=Grapher.MAX_POINTS)
     return parser
 
 if __name__ == '__main__':
@@ -28,8 +39,11 @@ if __name__ == '__main__':
     # Set logger print level
     Logger.PRINT_LEVEL = LoggerLevel.__dict__[args.log]
     # Parse XML file
-    hosts, routers, links = Parser(args.flow_spec).parse()
+    parser = Parser(args.flow_spec)
+    hosts, routers, links = parser.parse()
     # Create and run network
     network = Network(hosts, routers, links, display_graph=args.graph,
-                      graph_output=args.output)
+                      graph_output=args.output, workloads=parser.workloads,
+                      metrics_file=args.metrics,
+                      max_graph_points=args.max_points)
     network.run()
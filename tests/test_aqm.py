@@ -0,0 +1,121 @@
+import unittest
+
+from components import Link, Host
+from components.aqm import AQM, RED, CoDel
+from components.link_buffer import LinkBuffer
+from components.link_scheduler import FIFOScheduler
+from components.packet_types import FlowPacket
+
+
+class AQMTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        # 64 KB buffer
+        self.link = Link("L", 10, 1, 64, self.h1, self.h2)
+        self.queue = FIFOScheduler()
+        self.sequence_number = 0
+
+    def packet(self):
+        self.sequence_number += 1
+        return FlowPacket("F", self.sequence_number, 1024, self.h1, self.h2)
+
+    def fill(self, packets, time=0):
+        for _ in range(packets):
+            self.queue.push(self.packet(), time)
+
+    def test_red(self):
+        red = RED(self.link, {"WEIGHT": 1.}, seed=1)
+        # Under the minimum threshold, 16 KB, nothing is dropped
+        self.fill(15)
+        self.assertFalse(red.drop_on_enqueue(self.queue, self.packet(), 0))
+        # Over the maximum threshold, 48 KB, everything is
+        self.fill(35)
+        self.assertTrue(red.drop_on_enqueue(self.queue, self.packet(), 0))
+        # In between, some are
+        while len(self.queue) > 32:
+            red.dequeue(self.queue, 0)
+        drops = sum(red.drop_on_enqueue(self.queue, self.packet(), 0)
+                    for _ in range(100))
+        self.assertTrue(0 < drops < 100)
+        self.assertEqual(drops + 1, red.drops)
+
+    def test_red_idle(self):
+        red = RED(self.link, seed=1)
+        red.average = 40 * 1024
+        red.idle_since = 0
+        # The average decays while the queue is empty
+        red.drop_on_enqueue(self.queue, self.packet(), 1000)
+        self.assertLess(red.average, 4 * 1024)
+
+    def test_codel(self):
+        codel = CoDel(self.link)
+        self.fill(100)
+        # Short sojourn times aren't a standing queue
+        self.assertEqual(1, codel.dequeue(self.queue, 4)[0][0].sequence_number)
+        # Above the target, but not for an interval yet
+        item, dropped = codel.dequeue(self.queue, 10)
+        self.assertEqual([], dropped)
+        self.assertEqual(110, codel.first_above_time)
+        item, dropped = codel.dequeue(self.queue, 110)
+        self.assertEqual(1, len(dropped))
+        self.assertTrue(codel.dropping)
+        self.assertEqual(210, codel.drop_next)
+        # Nothing else is dropped until the next drop time
+        self.assertEqual([], codel.dequeue(self.queue, 150)[1])
+        self.assertEqual(1, len(codel.dequeue(self.queue, 210)[1]))
+        # Drops get closer together
+        self.assertAlmostEqual(210 + 100 / 2 ** .5, codel.drop_next)
+        self.assertEqual(2, codel.drops)
+        # Once the delay is back under the target, dropping stops
+        late = self.packet()
+        while len(self.queue) > 1:
+            self.queue.pop()
+        self.queue.push(late, 300)
+        self.assertEqual([], codel.dequeue(self.queue, 301)[1])
+        self.assertFalse(codel.dropping)
+
+    def test_ecn(self):
+        codel = CoDel(self.link, ecn=True)
+        self.fill(100)
+        for packet, _ in self.queue.queue:
+            packet.ecn = FlowPacket.ECT
+        codel.dequeue(self.queue, 10)
+        # The packet is marked and sent instead of dropped
+        item, dropped = codel.dequeue(self.queue, 110)
+        self.assertEqual([], dropped)
+        self.assertEqual(FlowPacket.CE, item[0].ecn)
+        self.assertEqual(210, codel.drop_next)
+        # Packets that don't support ECN are still dropped
+        self.queue.queue[0][0].ecn = FlowPacket.NOT_ECT
+        item, dropped = codel.dequeue(self.queue, 210)
+        self.assertEqual(1, len(dropped))
+        self.assertEqual(FlowPacket.ECT, item[0].ecn)
+        self.assertEqual((1, 1), (codel.drops, codel.marks))
+
+        red = RED(self.link, {"WEIGHT": 1., "MAX_P": 1.}, seed=1, ecn=True)
+        while len(self.queue) > 47:
+            self.queue.pop()
+        packet = self.packet()
+        packet.ecn = FlowPacket.ECT
+        self.assertFalse(red.drop_on_enqueue(self.queue, packet, 0))
+        self.assertEqual(FlowPacket.CE, packet.ecn)
+        # Above the maximum threshold packets are dropped all the same
+        self.fill(1)
+        self.assertTrue(red.drop_on_enqueue(self.queue, packet, 0))
+        self.assertEqual((1, 1), (red.drops, red.marks))
+
+    def test_link_buffer(self):
+        self.assertRaises(ValueError, AQM.create, "blue", self.link)
+        self.assertRaises(ValueError, AQM.create, AQM.CODEL, self.link,
+                          {"MAX_P": 1})
+        link = Link("L2", 10, 1, 64, Host("h3"), Host("h4"), aqm=AQM.CODEL)
+        buffer = link.buffer
+        for _ in range(10):
+            buffer.add_to_buffer(self.packet(), LinkBuffer.NODE_2_ID, 0)
+        buffer.pop_from_buffer(LinkBuffer.NODE_2_ID, 10)
+        # The first drop
+        buffer.pop_from_buffer(LinkBuffer.NODE_2_ID, 110)
+        self.assertEqual(7, len(buffer.buffers[LinkBuffer.NODE_2_ID]))
+        self.assertEqual({"overflow": 0, "aqm": 1, "marked": 0},
+                         buffer.drop_statistics())
@@ -0,0 +1,334 @@
+import unittest
+
+from components import Host, Link, CongestionControl
+from components.packet_types import FlowPacket, AckPacket
+from components.pacer import Pacer
+from congestion_control import BBR, RTTEstimator, FAST_TCP, TCPReno, \
+    get_protocol
+
+
+class BBRTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=CongestionControl.BBR)
+        self.bbr = self.h1.congestion_control
+
+        self.sent_times = {}
+
+    def send(self, sequence_number, time):
+        packet = FlowPacket("F1", sequence_number, FlowPacket.FLOW_PACKET_SIZE,
+                            self.h1, self.h2)
+        self.sent_times[sequence_number] = time
+        self.bbr.handle_send(packet, time)
+        return packet
+
+    def ack(self, packet, request_number, time):
+        # The host samples the RTT before handing the ACK to the controller
+        rtt = time - self.sent_times[packet.sequence_number]
+        self.h1.rtt_estimator.add_sample(time, rtt)
+        ack = AckPacket("F1", self.h2, self.h1, request_number, packet)
+        self.bbr.handle_receive(ack, time)
+
+    def test_unpaced_without_model(self):
+        self.assertIsNone(self.bbr.pacing_rate(0))
+
+    def test_model_estimation(self):
+        """
+        Sends a window of 10 packets at once and ACKs them 1ms apart after a
+        20ms RTT, so the path delivers 1 packet per ms.
+        """
+        packets = [self.send(i, 0) for i in range(10)]
+        for i, packet in enumerate(packets):
+            self.ack(packet, i + 1, 20 + i)
+
+        self.assertEqual(20, self.bbr.min_rtt)
+        # The rate sample of the last ACK is 10 packets over 29ms
+        self.assertAlmostEqual(10 / 29., self.bbr.btl_bw())
+        self.assertAlmostEqual(BBR.HIGH_GAIN * 10 / 29.,
+                               self.bbr.pacing_rate(29))
+        # Delivered packets are forgotten once ACKed
+        self.assertEqual({}, self.bbr.packet_states)
+
+    def test_duplicate_acks_count_as_delivered(self):
+        packets = [self.send(i, 0) for i in range(3)]
+        # Packet 0 is lost, packets 1 and 2 generate duplicate ACKs
+        self.ack(packets[1], 0, 20)
+        self.ack(packets[2], 0, 21)
+        self.assertEqual(2, self.bbr.delivered)
+        # The retransmission fills the hole, only it is newly delivered
+        self.send(0, 25)
+        self.ack(packets[0], 3, 45)
+        self.assertEqual(3, self.bbr.delivered)
+
+
+
+class RTTEstimatorTests(unittest.TestCase):
+    def test_estimates(self):
+        estimator = RTTEstimator()
+        estimator.add_sample(20, 20)
+        self.assertEqual(20, estimator.base_rtt)
+        self.assertEqual(20, estimator.srtt)
+        self.assertEqual(0, estimator.rounds)
+
+        estimator.add_sample(30, 28)
+        estimator.add_sample(35, 24)
+        self.assertEqual(20, estimator.base_rtt)
+        self.assertEqual(24, estimator.last_rtt)
+        self.assertAlmostEqual(0.875 * (0.875 * 20 + 0.125 * 28) + 0.125 * 24,
+                               estimator.srtt)
+        # The first round ended at 40ms
+        self.assertEqual(0, estimator.rounds)
+        estimator.add_sample(41, 26)
+        self.assertEqual(1, estimator.rounds)
+        self.assertEqual(20, estimator.last_round_min_rtt)
+
+
+class VegasTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=CongestionControl.VEGAS)
+        self.vegas = self.h1.congestion_control
+        self.vegas.ss = False
+        self.h1.cwnd = 10
+
+    def ack(self, time, rtt):
+        self.h1.rtt_estimator.add_sample(time, rtt)
+        packet = FlowPacket("F1", 0, FlowPacket.FLOW_PACKET_SIZE,
+                            self.h1, self.h2)
+        ack = AckPacket("F1", self.h2, self.h1, 1, packet)
+        self.vegas.handle_receive(ack, time)
+
+    def test_window_adjusted_once_per_round(self):
+        self.ack(0, 20)
+        self.ack(5, 20)
+        self.assertEqual(10, self.h1.cwnd)
+        # Nothing is queued, the window grows by one packet per round trip
+        self.ack(20, 20)
+        self.assertEqual(11, self.h1.cwnd)
+        self.ack(25, 20)
+        self.assertEqual(11, self.h1.cwnd)
+
+    def test_window_shrinks_when_queueing(self):
+        self.ack(0, 20)
+        self.ack(20, 40)
+        self.assertEqual(11, self.h1.cwnd)
+        # 11 * (1 - 20 / 40) = 5.5 packets queued, more than BETA
+        self.ack(43, 40)
+        self.assertEqual(10, self.h1.cwnd)
+
+
+class NewRenoTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=CongestionControl.NEWRENO)
+        Link("L1", 10, 10, 64, self.h1, self.h2)
+        self.new_reno = self.h1.congestion_control
+        self.h1.cwnd = 10
+        # Packets 0-9 are in flight
+        for i in range(10):
+            packet = FlowPacket("F1", i, FlowPacket.FLOW_PACKET_SIZE,
+                                self.h1, self.h2)
+            self.h1.send(packet, 0)
+            self.new_reno.handle_send(packet, 0)
+        self.h1.sequence_nums = (10, 0, 1e6)
+
+    def ack(self, request_number, time):
+        for packet_key, (packet, _) in self.h1.awaiting_ack.items():
+            if packet.sequence_number < request_number:
+                del self.h1.awaiting_ack[packet_key]
+        packet = FlowPacket("F1", 0, FlowPacket.FLOW_PACKET_SIZE,
+                            self.h1, self.h2)
+        ack = AckPacket("F1", self.h2, self.h1, request_number, packet)
+        self.new_reno.handle_receive(ack, time)
+
+    def sent_time(self, sequence_number):
+        return self.h1.awaiting_ack[
+            FlowPacket.flow_key("F1", sequence_number)][1]
+
+    def test_fast_recovery(self):
+        self.ack(2, 20)
+        self.assertEqual(12, self.h1.cwnd)
+        # Packet 2 is lost, the third duplicate ACK retransmits it
+        self.ack(2, 21)
+        self.ack(2, 22)
+        self.assertFalse(self.new_reno.in_recovery)
+        self.ack(2, 23)
+        self.assertTrue(self.new_reno.in_recovery)
+        self.assertEqual(23, self.sent_time(2))
+        self.assertEqual(6, self.new_reno.ssthresh)
+        self.assertEqual(9, self.h1.cwnd)
+        # Further duplicates inflate the window
+        self.ack(2, 24)
+        self.assertEqual(10, self.h1.cwnd)
+        # Partial ACK, packet 5 was lost too and is retransmitted
+        self.ack(5, 43)
+        self.assertTrue(self.new_reno.in_recovery)
+        self.assertEqual(43, self.sent_time(5))
+        self.assertEqual(8, self.h1.cwnd)
+        # Full ACK ends recovery with the window deflated to ssthresh
+        self.ack(10, 63)
+        self.assertFalse(self.new_reno.in_recovery)
+        self.assertEqual(6, self.h1.cwnd)
+
+    def test_stale_timeout_ignored(self):
+        self.ack(2, 20)
+        for time in (21, 22, 23):
+            self.ack(2, time)
+        # The timeout of the first transmission of packet 2 is ignored
+        packet = self.h1.awaiting_ack[FlowPacket.flow_key("F1", 2)][0]
+        self.h1.timeout(150, packet)
+        self.assertIn(packet.key, self.h1.awaiting_ack)
+        self.assertTrue(self.new_reno.in_recovery)
+
+
+class ECNTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        self.link = Link("L1", 10, 10, 64, self.h1, self.h2)
+
+    def start(self, congestion_method):
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=congestion_method, ecn=True)
+        self.h1.cwnd = 10
+        self.h1.congestion_control.ss = False
+        self.send(range(10))
+
+    def send(self, sequence_numbers):
+        for i in sequence_numbers:
+            packet = FlowPacket("F1", i, FlowPacket.FLOW_PACKET_SIZE,
+                                self.h1, self.h2)
+            self.h1.send(packet, 0)
+        self.h1.sequence_nums = (max(sequence_numbers) + 1, 0, 1e6)
+
+    def ack(self, request_number, time, ece=True):
+        for packet_key, (packet, _) in self.h1.awaiting_ack.items():
+            if packet.sequence_number < request_number:
+                del self.h1.awaiting_ack[packet_key]
+        packet = FlowPacket("F1", 0, FlowPacket.FLOW_PACKET_SIZE,
+                            self.h1, self.h2)
+        ack = AckPacket("F1", self.h2, self.h1, request_number, packet)
+        ack.ece = ece
+        self.h1.congestion_control.handle_receive(ack, time)
+
+    def test_window_halved_once_per_window(self):
+        for congestion_method in (CongestionControl.RENO,
+                                  CongestionControl.TAHOE,
+                                  CongestionControl.NEWRENO):
+            self.start(congestion_method)
+            self.ack(1, 20)
+            self.assertEqual(5, self.h1.cwnd)
+            self.assertEqual(5, self.h1.congestion_control.ssthresh)
+            # Marks of packets sent before the reduction are ignored
+            self.ack(2, 21)
+            self.assertGreater(self.h1.cwnd, 5)
+            # Nothing is retransmitted
+            self.assertEqual(set(), self.h1.queue)
+            self.assertEqual(8, len(self.h1.awaiting_ack))
+            # A mark on a later packet reduces the window again
+            self.send(range(10, 12))
+            self.ack(11, 40)
+            self.assertLess(self.h1.cwnd, 5)
+
+    def test_other_packets_ignored(self):
+        self.start(CongestionControl.RENO)
+        # Packets of another flow don't delay the next reduction
+        other = FlowPacket("F2", 100, FlowPacket.FLOW_PACKET_SIZE, self.h1,
+                           self.h2)
+        self.h1.awaiting_ack[other.key] = (other, 0)
+        self.ack(1, 20)
+        self.assertEqual(10, self.h1.congestion_control.ecn_recover)
+
+    def test_echo(self):
+        acks = []
+        self.h2.send = lambda packet, time: acks.append(packet)
+        for ecn in (FlowPacket.ECT, FlowPacket.CE):
+            packet = FlowPacket("F1", 0, FlowPacket.FLOW_PACKET_SIZE,
+                                self.h1, self.h2)
+            packet.ecn = ecn
+            self.h2.receive(packet, 0)
+        self.assertEqual([False, True], [ack.ece for ack in acks])
+
+    def test_requires_capable_protocol(self):
+        self.assertRaises(ValueError, self.h1.set_flow, "F1", self.h2, 1, 0,
+                          congestion_method=CongestionControl.VEGAS, ecn=True)
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=CongestionControl.RENO, ecn=True)
+        self.h1.send_packets(0, "F1")
+        packets = [packet for packet, _ in self.h1.awaiting_ack.values()]
+        self.assertTrue(packets)
+        self.assertTrue(all(p.ecn == FlowPacket.ECT for p in packets))
+
+
+class PacerTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        self.packet = FlowPacket("F1", 0, FlowPacket.FLOW_PACKET_SIZE,
+                                 self.h1, self.h2)
+
+    def test_unpaced_by_default(self):
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=CongestionControl.RENO)
+        self.h1.rtt_estimator.add_sample(0, 20)
+        self.h1.pacer.packet_sent(self.packet, 0)
+        self.assertTrue(self.h1.pacer.ready(0))
+
+    def test_window_pacing(self):
+        self.h1.set_flow("F1", self.h2, 1, 0,
+                         congestion_method=CongestionControl.RENO,
+                         pacing=True)
+        # Nothing to pace at before the RTT is known
+        self.h1.pacer.packet_sent(self.packet, 0)
+        self.assertTrue(self.h1.pacer.ready(0))
+        self.h1.rtt_estimator.add_sample(0, 20)
+        self.h1.cwnd = 10
+        self.h1.pacer.packet_sent(self.packet, 0)
+        interval = 20 / (10 * Pacer.WINDOW_GAIN)
+        self.assertFalse(self.h1.pacer.ready(interval - 0.1))
+        self.assertTrue(self.h1.pacer.ready(interval))
+
+
+class RegistryTests(unittest.TestCase):
+    def test_lookup_by_name(self):
+        self.assertIs(TCPReno, get_protocol("RENO"))
+        self.assertIs(FAST_TCP, get_protocol("fast"))
+        self.assertIs(BBR, get_protocol(CongestionControl.BBR))
+
+    def test_lookup_by_dotted_path(self):
+        self.assertIs(TCPReno, get_protocol("congestion_control.TCPReno"))
+        self.assertIs(RTTTestProtocol,
+                      get_protocol("tests.test_congestion_control."
+                                   "RTTTestProtocol"))
+        # Defining the class registered it under its name
+        self.assertIs(RTTTestProtocol, get_protocol("RTT_TEST"))
+
+    def test_unknown_protocol(self):
+        self.assertRaises(ValueError, get_protocol, "CUBIC")
+        self.assertRaises(ValueError, get_protocol, "congestion_control.CUBIC")
+        self.assertRaises(ValueError, get_protocol, "nosuch.Mod")
+
+    def test_flow_parameters(self):
+        h1 = Host("h1")
+        h1.set_flow("F1", Host("h2"), 1, 0, CongestionControl.FAST,
+                    parameters={"ALPHA": 20, "INITIAL_CWND": 4})
+        self.assertEqual(20, h1.congestion_control.ALPHA)
+        self.assertEqual(4, h1.cwnd)
+        # Other flows keep the defaults
+        self.assertEqual(15, FAST_TCP.ALPHA)
+        self.assertRaises(ValueError, h1.set_flow, "F1", Host("h2"), 1, 0,
+                          CongestionControl.FAST, {"BETA": 1})
+        # Constants identifying the protocol can't be overridden
+        for parameter in ("NAME", "ECN_CAPABLE"):
+            self.assertRaises(ValueError, h1.set_flow, "F1", Host("h2"), 1,
+                              0, CongestionControl.FAST, {parameter: True})
+
+
+class RTTTestProtocol(FAST_TCP):
+    NAME = "RTT_TEST"
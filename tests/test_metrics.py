@@ -0,0 +1,236 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from components import Link, Host, Network, CongestionControl
+import numpy
+
+from utils.grapher import Grapher
+from utils.metrics_sink import MetricsSink
+from utils.metrics_store import Metric, MetricsStore
+from utils.results_file import ResultsFile
+
+
+class MetricsSinkTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "metrics.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_chunks(self):
+        sink = MetricsSink(self.filename, chunk_size=3)
+        for i in range(4):
+            sink.record("window_size", "F1", i, i * 2)
+        # A full chunk was written, the last sample is still buffered
+        self.assertEqual(1, len(sink.records))
+        self.assertEqual(3, len(MetricsSink.read(self.filename)
+                                ["window_size"]["F1"][0]))
+        sink.record("link_buffer", "L1", 1.5, 3)
+        sink.close()
+        self.assertEqual({"window_size": {"F1": ([0, 1, 2, 3], [0, 2, 4, 6])},
+                          "link_buffer": {"L1": ([1.5], [3])}},
+                         MetricsSink.read(self.filename))
+        self.assertEqual(["link_buffer"],
+                         MetricsSink.read(self.filename, "link_buffer").keys())
+        self.assertTrue(MetricsSink.is_metrics_file(self.filename))
+
+    def test_split(self):
+        sink = MetricsSink(self.filename)
+        for i in range(4):
+            sink.record("window_size", "F%d" % (i % 2), i, i * 2)
+            sink.record("link_buffer", "L1", i + 0.5, i)
+        sink.close()
+        parts_folder = os.path.join(self.folder, "parts")
+        os.mkdir(parts_folder)
+        parts = MetricsSink.split(self.filename, parts_folder)
+        self.assertEqual(["link_buffer", "window_size"], sorted(parts))
+        for metric, part in parts.items():
+            self.assertTrue(MetricsSink.is_metrics_file(part))
+            self.assertEqual(MetricsSink.read(self.filename, metric),
+                             MetricsSink.read(part))
+
+    def run_network(self, metrics_file=None):
+        h1 = Host("h1")
+        h2 = Host("h2")
+        link = Link("L1", 10, 1, 64, h1, h2)
+        h1.set_flow("F1", h2, 0.05, 0,
+                    congestion_method=CongestionControl.RENO)
+        network = Network([h1, h2], [], [link], display_graph=False,
+                          metrics_file=metrics_file)
+        h1.start_flow()
+        network._run()
+        return network
+
+    def test_streaming(self):
+        in_memory = self.run_network()
+        streamed = self.run_network(self.filename)
+        # Nothing is kept in memory when streaming
+        self.assertEqual(0, len(streamed.event_queue.metrics))
+        streamed.sink.close()
+
+        streamed_series = MetricsSink.read(self.filename)
+        metrics = in_memory.event_queue.metrics
+        self.assertEqual(sorted(streamed_series), sorted(metrics.series))
+        for metric, data in streamed_series.items():
+            arrays = metrics.arrays(metric)
+            self.assertEqual(sorted(data), sorted(arrays))
+            for identifier, (times, values) in data.items():
+                self.assertEqual(times, list(arrays[identifier][0]))
+                self.assertEqual(values, list(arrays[identifier][1]))
+
+    def test_buckets(self):
+        data = {"L1": ([0, 10, 80, 20, 160], [1, 2, 3, 6, 5])}
+        times, values = Grapher.make_buckets_data(data, 75)["L1"]
+        self.assertEqual([0, 75, 150], list(times))
+        self.assertEqual([3, 3, 5], list(values))
+
+
+class MetricsStoreTests(unittest.TestCase):
+    def test_arrays(self):
+        store = MetricsStore()
+        store.record(Metric.WINDOW_SIZE, "F1", 5, 1)
+        store.record(Metric.WINDOW_SIZE, "F1", 2, 2)
+        store.record(Metric.WINDOW_SIZE, "F1", 5, 3)
+        store.record(Metric.LINK_BUFFER, "L1", 1, 4)
+        self.assertEqual(4, len(store))
+        times, values = store.arrays(Metric.WINDOW_SIZE)["F1"]
+        self.assertEqual(numpy.float64, times.dtype)
+        # Sorted by time, samples at the same time stay in order
+        self.assertEqual([2, 5, 5], list(times))
+        self.assertEqual([2, 1, 3], list(values))
+        self.assertEqual({}, store.arrays(Metric.PACKET_DELAY))
+        # The exported arrays don't change with later samples
+        store.record(Metric.LINK_BUFFER, "L1", 2, 5)
+        self.assertEqual([1, 2], list(store.arrays(Metric.LINK_BUFFER)
+                                      ["L1"][0]))
+
+
+class ResultsFileTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "results.nsr")
+        self.metrics = {
+            Metric.WINDOW_SIZE: {"F1": ([0, 1.5, 3], [1, 2, 4]),
+                                 "F2": ([], [])},
+            Metric.LINK_BUFFER: {"L1": ([2], [7])}}
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def check_round_trip(self, compress):
+        ResultsFile.write(self.filename, self.metrics, compress)
+        self.assertTrue(ResultsFile.is_results_file(self.filename))
+        with ResultsFile(self.filename) as results:
+            self.assertEqual(sorted(self.metrics), results.metrics())
+            self.assertEqual(["F1", "F2"],
+                             results.identifiers(Metric.WINDOW_SIZE))
+            self.assertEqual([], results.identifiers(Metric.PACKET_DELAY))
+            for metric, data in self.metrics.items():
+                series = results.series(metric)
+                self.assertEqual(sorted(data), sorted(series))
+                for identifier, (times, values) in data.items():
+                    self.assertEqual(times, list(series[identifier][0]))
+                    self.assertEqual(values, list(series[identifier][1]))
+            times, values = results.load(Metric.LINK_BUFFER, "L1")
+        # Loaded arrays outlive the file
+        self.assertEqual([2], list(times))
+        self.assertEqual(numpy.float64, values.dtype)
+
+    def test_compressed(self):
+        self.check_round_trip(True)
+
+    def test_uncompressed(self):
+        self.check_round_trip(False)
+
+    def test_from_metrics_file(self):
+        metrics_file = os.path.join(self.folder, "metrics.csv")
+        sink = MetricsSink(metrics_file)
+        for metric, data in self.metrics.items():
+            for identifier, (times, values) in data.items():
+                for time, value in zip(times, values):
+                    sink.record(metric, identifier, time, value)
+        sink.close()
+        output = os.path.join(self.folder, "graphs")
+        grapher = Grapher(output)
+        grapher.timeStr = "run"
+        grapher.graph_metrics_file(metrics_file)
+        with ResultsFile(os.path.join(output, "results-run.nsr")) as results:
+            self.assertEqual([1, 2, 4],
+                             list(results.load(Metric.WINDOW_SIZE, "F1")[1]))
+            self.assertEqual([7], list(results.load(Metric.LINK_BUFFER,
+                                                    "L1")[1]))
+
+    def test_not_results_file(self):
+        sink = MetricsSink(self.filename)
+        sink.close()
+        self.assertFalse(ResultsFile.is_results_file(self.filename))
+        self.assertRaises(ValueError, ResultsFile, self.filename)
+
+
+class LazyGraphingTests(unittest.TestCase):
+    def test_no_plotting_imports(self):
+        # Running a network without graphs mustn't load matplotlib or NumPy
+        loaded = subprocess.check_output([sys.executable, "-c", """
+import sys
+from components import Network
+from utils.parser import Parser
+print sorted(m for m in ("matplotlib", "numpy") if m in sys.modules)
+"""], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual("[]", loaded.strip())
+
+
+class ParallelGraphingTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_pool(self):
+        store = MetricsStore()
+        for i in range(100):
+            store.record(Metric.WINDOW_SIZE, "F1", i, i % 7)
+            store.record(Metric.LINK_BUFFER, "L1", i, i % 5)
+            store.record(Metric.LINK_BUFFER, "L2", i, i % 3)
+        outputs = {}
+        for processes in [1, 3]:
+            folder = os.path.join(self.folder, str(processes))
+            grapher = Grapher(folder, processes=processes)
+            grapher.timeStr = "run"
+            grapher.graph_all(store)
+            outputs[processes] = sorted(os.listdir(folder))
+        self.assertEqual(outputs[1], outputs[3])
+        self.assertEqual(5, len(outputs[3]))
+        csvs = [name for name in outputs[3] if name.endswith(".csv")]
+        for name in csvs:
+            with open(os.path.join(self.folder, "1", name)) as serial, \
+                    open(os.path.join(self.folder, "3", name)) as pooled:
+                self.assertEqual(serial.read(), pooled.read())
+
+    def test_metrics_file_tasks(self):
+        metrics_file = os.path.join(self.folder, "metrics.csv")
+        sink = MetricsSink(metrics_file)
+        for i in range(10):
+            sink.record(Metric.WINDOW_SIZE, "F1", i, i % 7)
+            sink.record(Metric.LINK_BUFFER, "L1", i, i % 5)
+        sink.close()
+        tasks = {}
+
+        class RecordingGrapher(Grapher):
+            def graph_figures(self, figures, bucket_size=0):
+                for figure, data in figures:
+                    if len(data) > 0:
+                        tasks[figure[0]] = MetricsSink.read(data)
+
+        grapher = RecordingGrapher(os.path.join(self.folder, "graphs"))
+        grapher.graph_metrics_file(metrics_file)
+        # Each figure is only handed the samples of its own metric
+        self.assertEqual([Metric.LINK_BUFFER, Metric.WINDOW_SIZE],
+                         sorted(tasks))
+        for metric, series in tasks.items():
+            self.assertEqual(MetricsSink.read(metrics_file, metric), series)
@@ -0,0 +1,42 @@
+import unittest
+
+from components import Host
+from components.packet_types import Packet, FlowPacket, AckPacket, \
+    DatagramPacket, StaticRoutingPacket, LinkStatePacket
+
+
+class PacketTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+
+    def test_keys(self):
+        packet = FlowPacket("F1", 3, 512, self.h1, self.h2)
+        ack = AckPacket("F1", self.h2, self.h1, 3, packet)
+        # The ACK requesting a packet has the same key, like the old IDs
+        self.assertEqual(packet.key, ack.key)
+        self.assertEqual(Packet.flow_key("F1", 3), packet.key)
+        self.assertNotEqual(packet.key,
+                            FlowPacket("F2", 3, 512, self.h1, self.h2).key)
+        self.assertNotEqual(packet.key,
+                            FlowPacket("F1", 4, 512, self.h1, self.h2).key)
+        self.assertEqual(("F1.3", "F1.3"), (packet.id, ack.id))
+        self.assertEqual("F1.0",
+                         DatagramPacket("F1", 0, 1, self.h1, self.h2).id)
+        routing = StaticRoutingPacket({}, self.h1, self.h2)
+        self.assertEqual("SR.%d" % routing.key, routing.id)
+
+    def test_size(self):
+        self.assertEqual(1024,
+                         FlowPacket("F1", 0, 512, self.h1, self.h2).size())
+        self.assertEqual(64,
+                         AckPacket("F1", self.h2, self.h1, 0, None).size())
+        routing = StaticRoutingPacket({"h1": 1, "h2": 2}, self.h1, self.h2)
+        self.assertEqual(16 + len(routing.id) + 32, routing.size())
+        link_state = LinkStatePacket("R1", 0, {"h1": 1}, self.h1, self.h2)
+        self.assertEqual(16 + len(link_state.id) + 32, link_state.size())
+
+    def test_slots(self):
+        packet = FlowPacket("F1", 0, 512, self.h1, self.h2)
+        self.assertFalse(hasattr(packet, "__dict__"))
+        self.assertRaises(AttributeError, setattr, packet, "foo", 1)
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy
+
+from utils.resampler import Resampler, Statistic
+
+
+class ResamplerTests(unittest.TestCase):
+    def setUp(self):
+        self.times = [0, 10, 80, 20, 160, 149.5, 75]
+        self.values = [1, 2, 3, 6, 5, 9, 4]
+        self.resampler = Resampler(self.times, self.values)
+
+    def test_statistics(self):
+        resampled = self.resampler.resample(
+            [75, 100], [Statistic.MEAN, Statistic.MIN, Statistic.MAX,
+                        Statistic.COUNT, Statistic.MEDIAN])
+        times, means = resampled[75][Statistic.MEAN]
+        self.assertEqual([0, 75, 150], list(times))
+        self.assertEqual([3, 16 / 3.0, 5], list(means))
+        self.assertEqual([1, 3, 5], list(resampled[75][Statistic.MIN][1]))
+        self.assertEqual([6, 9, 5], list(resampled[75][Statistic.MAX][1]))
+        self.assertEqual([3, 3, 1], list(resampled[75][Statistic.COUNT][1]))
+        self.assertEqual([2, 4, 5], list(resampled[75][Statistic.MEDIAN][1]))
+        times, means = resampled[100][Statistic.MEAN]
+        self.assertEqual([0, 100], list(times))
+        self.assertEqual([16 / 5.0, 7], list(means))
+
+    def test_percentiles_match_numpy(self):
+        random = numpy.random.RandomState(1)
+        times = random.uniform(0, 1000, 5000)
+        values = random.exponential(10, 5000)
+        resampler = Resampler(times, values)
+        for q in [0, 12.5, 50, 99, 100]:
+            bucket_times, percentiles = resampler.bucket(
+                100, Statistic.percentile(q))
+            for bucket_time, percentile in zip(bucket_times, percentiles):
+                in_bucket = (times >= bucket_time) & \
+                    (times < bucket_time + 100)
+                self.assertAlmostEqual(
+                    numpy.percentile(values[in_bucket], q), percentile)
+
+    def test_empty(self):
+        times, values = Resampler([], []).bucket(75, Statistic.percentile(90))
+        self.assertEqual(0, len(times))
+        self.assertEqual(0, len(values))
+        self.assertRaises(ValueError, self.resampler.bucket, 75, "mode")
+
+    def test_envelope(self):
+        times = numpy.arange(100000, dtype=numpy.float64)
+        values = numpy.sin(times / 1000)
+        values[31337] = 50
+        values[77777] = -50
+        resampler = Resampler(times, values)
+        env_times, env_values = resampler.envelope(1000)
+        self.assertLessEqual(len(env_times), 1000)
+        # Spikes, the range and the ends of the series are kept
+        self.assertIn(31337, env_times)
+        self.assertIn(77777, env_times)
+        self.assertEqual(values.max(), env_values.max())
+        self.assertEqual(values.min(), env_values.min())
+        self.assertEqual([0, 99999], [env_times[0], env_times[-1]])
+        self.assertTrue((numpy.diff(env_times) > 0).all())
+        # Short series aren't reduced
+        self.assertEqual(7, len(self.resampler.envelope(7)[0]))
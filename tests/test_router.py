@@ -2,7 +2,11 @@ from mock import Mock
 import unittest
 
 from components import Link, Host, Network
+from components.packet_types import FlowPacket, DatagramPacket
 from components.router import Router, LinkCostTuple
+from components.routing_protocol import RoutingProtocol
+from components.routing_table import RoutingTable
+from utils import Interner
 
 
 class RoutingTests(unittest.TestCase):
@@ -318,5 +322,259 @@ class RoutingTests(unittest.TestCase):
                         rt_d_2 == r_d.newDynamicRoutingTable,
                         m2 % (r_d, rt_d_1, rt_d_2, r_d.newDynamicRoutingTable))
 
+    def test_incremental_routing_table(self):
+        """
+        Same graph and tables as test_static_routing_table2, built with
+        incremental updates
+        """
+        routers = [Router("n%d" % i, False, RoutingProtocol.INCREMENTAL)
+                   for i in range(1, 6)]
+        r_1, r_2, r_3, r_4, r_5 = routers
+
+        l12 = Link("L1-2", 1.0, 10, 64, r_1, r_2)
+        l23 = Link("L2-3", 2.0, 10, 64, r_2, r_3)
+        l35 = Link("L3-5", 5.0, 10, 64, r_3, r_5)
+        l25 = Link("L2-5", 4.0, 10, 64, r_2, r_5)
+        l45 = Link("L4-5", 6.0, 10, 64, r_4, r_5)
+        l14 = Link("L1-4", 3.0, 10, 64, r_1, r_4)
+
+        network = Network([], routers, [l12, l23, l25, l35, l45, l14],
+                          display_graph=False)
+        sent = []
+        send = r_2.send
+
+        def record_send(packet, link, time):
+            sent.append((packet, link))
+            send(packet, link, time)
+        r_2.send = record_send
+        map(lambda x: x.create_routing_table(dynamic=False), routers)
+        del r_2.send
+        # Split horizon, n1 isn't told about itself
+        tables = dict((link, packet.costTable) for packet, link in sent)
+        self.assertEqual({"n3": 2, "n5": 4}, tables[l12])
+        network._run()
+
+        rt_2 = {"n1": LinkCostTuple(l12, 1),
+                "n2": LinkCostTuple(None, 0),
+                "n3": LinkCostTuple(l23, 2),
+                "n4": LinkCostTuple(l12, 4),
+                "n5": LinkCostTuple(l25, 4)}
+        rt_4 = {"n1": LinkCostTuple(l14, 3),
+                "n2": LinkCostTuple(l14, 4),
+                "n3": LinkCostTuple(l14, 6),
+                "n4": LinkCostTuple(None, 0),
+                "n5": LinkCostTuple(l45, 6)}
+        self.assertEqual(rt_2, r_2.routingTable)
+        self.assertEqual(rt_4, r_4.routingTable)
+        # Received tables are left untouched
+        self.assertEqual({"n3": 2, "n5": 4}, tables[l12])
+
+    def test_centralized_routing_table(self):
+        """
+        Same graph as test_static_routing_table2, with a host on n3. The
+        tables are computed up front without running the network.
+        """
+        routers = [Router("n%d" % i, False, RoutingProtocol.CENTRALIZED)
+                   for i in range(1, 6)]
+        r_1, r_2, r_3, r_4, r_5 = routers
+        h = Host("h")
+
+        l12 = Link("L1-2", 1.0, 10, 64, r_1, r_2)
+        l23 = Link("L2-3", 2.0, 10, 64, r_2, r_3)
+        l35 = Link("L3-5", 5.0, 10, 64, r_3, r_5)
+        l25 = Link("L2-5", 4.0, 10, 64, r_2, r_5)
+        l45 = Link("L4-5", 6.0, 10, 64, r_4, r_5)
+        l14 = Link("L1-4", 3.0, 10, 64, r_1, r_4)
+        lh3 = Link("Lh-3", 1.0, 10, 64, h, r_3)
+
+        network = Network([h], routers,
+                          [l12, l23, l25, l35, l45, l14, lh3],
+                          display_graph=False)
+        network.centralized_routing.start(0)
+        # No routing packets were sent
+        self.assertEqual({}, network.event_queue.queue)
+
+        rt_1 = {"n1": LinkCostTuple(None, 0),
+                "n2": LinkCostTuple(l12, 1),
+                "n3": LinkCostTuple(l12, 3),
+                "n4": LinkCostTuple(l14, 3),
+                "n5": LinkCostTuple(l12, 5),
+                "h": LinkCostTuple(l12, 4)}
+        rt_4 = {"n1": LinkCostTuple(l14, 3),
+                "n2": LinkCostTuple(l14, 4),
+                "n3": LinkCostTuple(l14, 6),
+                "n4": LinkCostTuple(None, 0),
+                "n5": LinkCostTuple(l45, 6),
+                "h": LinkCostTuple(l14, 7)}
+        rt_5 = {"n1": LinkCostTuple(l25, 5),
+                "n2": LinkCostTuple(l25, 4),
+                "n3": LinkCostTuple(l35, 5),
+                "n4": LinkCostTuple(l45, 6),
+                "n5": LinkCostTuple(None, 0),
+                "h": LinkCostTuple(l35, 6)}
+        self.assertEqual(rt_1, r_1.routingTable)
+        self.assertEqual(rt_4, r_4.routingTable)
+        self.assertEqual(rt_5, r_5.routingTable)
+        # Distributed table creation does nothing in this mode
+        r_1.create_routing_table()
+        self.assertEqual({}, network.event_queue.queue)
+
+    def test_link_state_routing_table(self):
+        """
+        Same graph as test_centralized_routing_table, the tables are computed
+        by every router from the flooded link states
+        """
+        routers = [Router("n%d" % i, False, RoutingProtocol.LINK_STATE)
+                   for i in range(1, 6)]
+        r_1, r_2, r_3, r_4, r_5 = routers
+        h = Host("h")
+
+        l12 = Link("L1-2", 1.0, 10, 64, r_1, r_2)
+        l23 = Link("L2-3", 2.0, 10, 64, r_2, r_3)
+        l35 = Link("L3-5", 5.0, 10, 64, r_3, r_5)
+        l25 = Link("L2-5", 4.0, 10, 64, r_2, r_5)
+        l45 = Link("L4-5", 6.0, 10, 64, r_4, r_5)
+        l14 = Link("L1-4", 3.0, 10, 64, r_1, r_4)
+        lh3 = Link("Lh-3", 1.0, 10, 64, h, r_3)
+
+        network = Network([h], routers,
+                          [l12, l23, l25, l35, l45, l14, lh3],
+                          display_graph=False)
+        map(lambda x: x.create_routing_table(dynamic=False), routers)
+        # Neighbors are reachable before any advertisement arrives
+        self.assertEqual(LinkCostTuple(l14, 3), r_1.routingTable["n4"])
+        network._run()
+
+        rt_1 = {"n1": LinkCostTuple(None, 0),
+                "n2": LinkCostTuple(l12, 1),
+                "n3": LinkCostTuple(l12, 3),
+                "n4": LinkCostTuple(l14, 3),
+                "n5": LinkCostTuple(l12, 5),
+                "h": LinkCostTuple(l12, 4)}
+        rt_5 = {"n1": LinkCostTuple(l25, 5),
+                "n2": LinkCostTuple(l25, 4),
+                "n3": LinkCostTuple(l35, 5),
+                "n4": LinkCostTuple(l45, 6),
+                "n5": LinkCostTuple(None, 0),
+                "h": LinkCostTuple(l35, 6)}
+        self.assertEqual(rt_1, r_1.routingTable)
+        self.assertEqual(rt_5, r_5.routingTable)
+        # Every router holds the advertisement of every router
+        self.assertEqual(set("n%d" % i for i in range(1, 6)),
+                         set(r_4.linkStateDatabase))
+
+    def ecmp_square(self, routing):
+        """
+        h1 -- a -- b -- c -- h2, and a -- d -- c, every link with cost 1
+        """
+        h1 = Host("h1")
+        h2 = Host("h2")
+        routers = [Router(i, False, routing, ecmp=True) for i in "abcd"]
+        r_a, r_b, r_c, r_d = routers
+        links = [Link("L1", 1.0, 10, 64, r_a, r_b),
+                 Link("L2", 1.0, 10, 64, r_b, r_c),
+                 Link("L3", 1.0, 10, 64, r_c, r_d),
+                 Link("L4", 1.0, 10, 64, r_d, r_a),
+                 Link("L5", 1.0, 10, 64, h1, r_a),
+                 Link("L6", 1.0, 10, 64, h2, r_c)]
+        network = Network([h1, h2], routers, links, display_graph=False)
+        if routing == RoutingProtocol.CENTRALIZED:
+            network.centralized_routing.start(0)
+        else:
+            map(lambda x: x.create_routing_table(dynamic=False), routers)
+            network._run()
+        return r_a, h2, links
+
+    def test_ecmp(self):
+        for routing in (RoutingProtocol.DISTANCE_VECTOR,
+                        RoutingProtocol.CENTRALIZED,
+                        RoutingProtocol.LINK_STATE):
+            r_a, h2, links = self.ecmp_square(routing)
+            table = r_a.routingTable
+            # Both paths to c are kept, the entry has the first one found
+            ports = (r_a.ports[links[0]], r_a.ports[links[3]])
+            self.assertEqual(tuple(sorted(ports)),
+                             table.next_hop_ports(h2.index))
+            self.assertEqual(3, table["h2"].cost)
+            self.assertIn(table["h2"].link, (links[0], links[3]))
+            # Flows are spread over both, each one always takes the same
+            used = set()
+            for flow_id in range(20):
+                packet = FlowPacket("F%d" % flow_id, 0, 1024, Host("h1"), h2)
+                port = table.port(h2.index, r_a.flow_hash(packet))
+                self.assertEqual(port, table.port(h2.index,
+                                                  r_a.flow_hash(packet)))
+                used.add(port)
+            self.assertEqual(set(ports), used)
+
+    def test_held_packets(self):
+        """
+        h1 -- r1 -- r2 -- h2, packets arrive at r1 before it has a route
+        """
+        h1 = Host("h1")
+        h2 = Host("h2")
+        r_1 = Router("r1", False)
+        r_2 = Router("r2", False)
+        r_1.HOLD_QUEUE_SIZE = 2
+        links = [Link("L1", 1.0, 10, 64, h1, r_1),
+                 Link("L2", 1.0, 10, 64, r_1, r_2),
+                 Link("L3", 1.0, 10, 64, r_2, h2)]
+        network = Network([h1, h2], [r_1, r_2], links, display_graph=False)
+        received = []
+        h2.receive = lambda packet, time: received.append(packet)
+        packets = [DatagramPacket("F", i, 1024, h1, h2) for i in range(3)]
+
+        # No routing table, creating it only teaches r1 its neighbors
+        map(lambda packet: r_1.receive(packet, 0), packets)
+        self.assertIsNotNone(r_1.routingTable)
+        # The queue is full, the last packet was dropped
+        self.assertEqual(2, r_1.heldPacketCount)
+        r_2.create_routing_table(dynamic=False)
+        network._run()
+
+        self.assertEqual(0, r_1.heldPacketCount)
+        self.assertEqual({}, r_1.heldPackets)
+        self.assertEqual(packets[:2], [packet for packet in received
+                                       if isinstance(packet, DatagramPacket)])
+
     def execute_pass(self):
         pass
+
+
+class RoutingTableTests(unittest.TestCase):
+    def test_interner(self):
+        interner = Interner()
+        self.assertEqual(0, interner.intern("a"))
+        self.assertEqual(1, interner.intern("b"))
+        self.assertEqual(0, interner.intern("a"))
+        self.assertEqual("b", interner.key(1))
+        self.assertEqual(2, len(interner))
+        # Released indices aren't reused
+        interner.release("a")
+        self.assertEqual(1, len(interner))
+        self.assertEqual(2, interner.intern("c"))
+        self.assertEqual(3, interner.intern("a"))
+        interner.clear()
+        self.assertEqual(0, interner.intern("c"))
+
+    def test_forwarding_table(self):
+        router = Router("r", False)
+        h1 = Host("h1")
+        h2 = Host("h2")
+        l1 = Link("L1", 1.0, 10, 64, router, h1)
+        l2 = Link("L2", 1.0, 10, 64, router, h2)
+
+        table = RoutingTable(router.ports, {"r": LinkCostTuple(None, 0),
+                                            "h1": LinkCostTuple(l1, 1)})
+        table["h2"] = LinkCostTuple(l2, 1)
+        self.assertEqual(0, table.port(h1.index))
+        self.assertEqual(1, table.port(h2.index))
+        self.assertEqual(RoutingTable.NO_ROUTE, table.port(router.index))
+        # Nodes created after the table was filled in aren't reachable
+        self.assertEqual(RoutingTable.NO_ROUTE, table.port(Host("h3").index))
+        # Route change
+        table["h1"] = LinkCostTuple(l2, 5)
+        self.assertEqual(1, table.port(h1.index))
+        self.assertEqual({"r": LinkCostTuple(None, 0),
+                          "h1": LinkCostTuple(l2, 5),
+                          "h2": LinkCostTuple(l2, 1)}, table)
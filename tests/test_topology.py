@@ -0,0 +1,143 @@
+import unittest
+import xml.etree.ElementTree as et
+from StringIO import StringIO
+
+from components import Host, Router, Network
+from utils.parser import Parser
+from utils.topology import TopologyGenerator, TopologyType, TrafficMatrix
+
+
+class TopologyTests(unittest.TestCase):
+    def connected(self, generator):
+        neighbors = {}
+        for node1, node2, _ in generator.links:
+            neighbors.setdefault(node1, set()).add(node2)
+            neighbors.setdefault(node2, set()).add(node1)
+        seen = set()
+        stack = [generator.routers[0]]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(neighbors[node])
+        return seen == set(generator.hosts + generator.routers)
+
+    def test_dumbbell(self):
+        generator = TopologyGenerator()
+        generator.generate(TopologyType.DUMBBELL, 3)
+        self.assertEqual((6, 2, 7), (len(generator.hosts),
+                                     len(generator.routers),
+                                     len(generator.links)))
+        self.assertEqual([("S1", "T1"), ("S2", "T2"), ("S3", "T3")],
+                         generator.pairs)
+
+    def test_parking_lot(self):
+        generator = TopologyGenerator()
+        generator.parking_lot(3)
+        self.assertEqual(4, len(generator.routers))
+        self.assertIn(("S0", "R1", 12.5), generator.links)
+        self.assertIn(("T0", "R4", 12.5), generator.links)
+        self.assertIn(("S2", "R2", 12.5), generator.links)
+        self.assertIn(("T2", "R3", 12.5), generator.links)
+
+    def test_fat_tree(self):
+        generator = TopologyGenerator()
+        generator.fat_tree(4)
+        # k^3/4 hosts, 5k^2/4 switches, 3k^3/4 links
+        self.assertEqual((16, 20, 48), (len(generator.hosts),
+                                        len(generator.routers),
+                                        len(generator.links)))
+        self.assertTrue(self.connected(generator))
+        self.assertRaises(ValueError, generator.fat_tree, 3)
+
+    def test_random_graphs(self):
+        for topology, kwargs in ((TopologyType.WAXMAN, {"beta": 0.1}),
+                                 (TopologyType.BARABASI_ALBERT,
+                                  {"degree": 2})):
+            graphs = []
+            for _ in range(2):
+                generator = TopologyGenerator(seed=7)
+                generator.generate(topology, 30, **kwargs)
+                self.assertTrue(self.connected(generator))
+                graphs.append(generator.links)
+            # Seeded graphs are reproducible
+            self.assertEqual(graphs[0], graphs[1])
+        # A full mesh of 3 routers, then 2 links per router, and 30 hosts
+        self.assertEqual(3 + 27 * 2 + 30, len(generator.links))
+
+    def test_traffic(self):
+        generator = TopologyGenerator(seed=1)
+        generator.fat_tree(4)
+        generator.add_traffic(TrafficMatrix.PERMUTATION)
+        pairs = [(flow.get("src"), flow.get("dest"))
+                 for flow in generator.traffic]
+        self.assertEqual(sorted(generator.hosts),
+                         sorted(source for source, _ in pairs))
+        self.assertEqual(sorted(generator.hosts),
+                         sorted(destination for _, destination in pairs))
+        self.assertTrue(all(source != dest for source, dest in pairs))
+        self.assertRaises(ValueError, generator.add_traffic, "gravity")
+
+    def test_build(self):
+        generator = TopologyGenerator(routing="link-state", ecmp=True,
+                                      seed=1)
+        generator.dumbbell(2)
+        generator.add_traffic(TrafficMatrix.INCAST, amount=2)
+        generator.add_traffic(TrafficMatrix.WORKLOAD, rate=5, count=10)
+        output = StringIO()
+        generator.write(output)
+        spec = et.fromstring(output.getvalue())
+        self.assertEqual(["hosts", "routers", "links", "flows", "workloads"],
+                         [section.tag for section in spec])
+
+        hosts, routers, links = generator.build()
+        self.assertEqual(4, len(hosts))
+        self.assertTrue(all(isinstance(host, Host) for host in hosts))
+        self.assertTrue(all(isinstance(router, Router) and router.ecmp
+                            for router in routers))
+        self.assertEqual(5, len(links))
+        self.assertEqual(1, len(generator.workloads))
+        senders = [host for host in hosts if host.flow is not None]
+        self.assertEqual(3, len(senders))
+
+
+class GeneratedSpecRunTests(unittest.TestCase):
+    def run_spec(self, generator, duration):
+        """
+        Parses the generated spec and runs it for duration ms
+        """
+        output = StringIO()
+        generator.write(output)
+        parser = Parser()
+        hosts, routers, links = parser.parse_element(
+            et.fromstring(output.getvalue()))
+        network = Network(hosts, routers, links, display_graph=False,
+                          workloads=parser.workloads)
+        for router in routers:
+            router.create_routing_table()
+        for host in hosts:
+            host.start_flow()
+        for workload in parser.workloads:
+            workload.start()
+        while Network.TIME < duration and \
+                network.event_queue.execute(Network.TIME):
+            Network.TIME += 0.001
+        return hosts
+
+    def test_workload(self):
+        generator = TopologyGenerator(seed=1)
+        generator.dumbbell(2)
+        generator.add_traffic(TrafficMatrix.WORKLOAD, start=0, rate=200,
+                              count=6)
+        hosts = self.run_spec(generator, 100)
+        completed = [flow for host in hosts for flow in host.completed_flows]
+        self.assertTrue(completed)
+
+    def test_permutation(self):
+        generator = TopologyGenerator(seed=1)
+        generator.dumbbell(2)
+        generator.add_traffic(TrafficMatrix.PERMUTATION, amount=0.005,
+                              start=0)
+        hosts = self.run_spec(generator, 1000)
+        # Every host both sends and receives a flow
+        self.assertTrue(all(host.completed_flows for host in hosts))
@@ -0,0 +1,60 @@
+import unittest
+
+from components import Link, Host, Network
+from components.traffic_source import CBRSource, OnOffSource
+from utils.metrics_store import Metric
+
+
+class TrafficSourceTests(unittest.TestCase):
+    def setUp(self):
+        self.h1 = Host("h1")
+        self.h2 = Host("h2")
+        self.link = Link("L1", 10, 1, 64, self.h1, self.h2)
+
+    def run_network(self):
+        network = Network([self.h1, self.h2], [], [self.link],
+                          display_graph=False)
+        self.h1.start_flow()
+        network._run()
+        # The link records its throughput for every packet it carries, and
+        # only datagrams cross it
+        times, _ = network.event_queue.metrics.arrays(
+            Metric.LINK_THROUGHPUT).get(self.link.id, ([], []))
+        return times
+
+    def test_cbr_rate(self):
+        # 1 KB packets at 8.192 Mbps is one packet per ms
+        self.h1.add_source(CBRSource(self.h1, "C1", self.h2, 8.192, 0.01,
+                                     stop=0.02))
+        received = self.run_network()
+        self.assertEqual(10, len(received))
+        # Nothing waits for an ACK, and nothing is sent back
+        self.assertEqual({}, self.h1.awaiting_ack)
+        self.assertEqual({}, self.h2.awaiting_ack)
+
+    def test_cbr_amount(self):
+        self.h1.add_source(CBRSource(self.h1, "C1", self.h2, 8.192, 0,
+                                     amount=5 / 1024.))
+        self.assertEqual(5, len(self.run_network()))
+
+    def test_needs_an_end(self):
+        self.assertRaises(ValueError, CBRSource, self.h1, "C1", self.h2, 1, 0)
+
+    def test_on_off_periods(self):
+        def send_times(seed):
+            source = OnOffSource(self.h1, "O1", self.h2, 8.192, 0, stop=1,
+                                 on_time=10, off_time=20,
+                                 distribution=OnOffSource.PARETO, seed=seed)
+            times = [0]
+            while times[-1] < 1000:
+                times.append(source.next_send_time(times[-1]))
+            return times
+
+        times = send_times(1)
+        self.assertEqual(times, send_times(1))
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        # Back to back packets while on, silent periods in between
+        self.assertAlmostEqual(1, min(gaps))
+        self.assertGreater(max(gaps), 1)
+        # A third of the time on, at one packet per ms
+        self.assertAlmostEqual(1000 / 3., len(times), delta=150)
@@ -0,0 +1,120 @@
+import random
+import unittest
+
+from components import Link, Host, Network
+from components.packet_types import FlowPacket, Packet
+from components.workload import Workload, FlowSizes
+
+
+class FlowSizesTests(unittest.TestCase):
+    def test_empirical_cdf(self):
+        sizes = FlowSizes(FlowSizes.WEB_SEARCH, random.Random(1))
+        samples = sorted(sizes.sample() for _ in range(2000))
+        self.assertGreaterEqual(samples[0], 1)
+        self.assertLessEqual(samples[-1], 20000)
+        # Median of the web search distribution is around 45 packets
+        self.assertAlmostEqual(45, samples[1000], delta=15)
+
+    def test_unknown_distribution(self):
+        self.assertRaises(ValueError, FlowSizes, "cubic", random.Random())
+        self.assertRaises(ValueError, FlowSizes, FlowSizes.PARETO,
+                          random.Random())
+
+
+class WorkloadTests(unittest.TestCase):
+    def test_flows_complete(self):
+        h1 = Host("h1")
+        h2 = Host("h2")
+        link = Link("L1", 10, 1, 64, h1, h2)
+        # Closely spaced arrivals, so flows queue behind each other
+        workload = Workload("W", [h1], [h2], 2000, 0, count=5,
+                            sizes=FlowSizes.EXPONENTIAL, mean=3, seed=1,
+                            congestion_method="TAHOE")
+        network = Network([h1, h2], [], [link], display_graph=False,
+                          workloads=[workload])
+        workload.start()
+        network._run()
+
+        completed = h1.completed_flows
+        self.assertEqual(["W.%d" % i for i in range(5)],
+                         [flow.flow_id for flow in completed])
+        arrivals = [flow.arrival for flow in completed]
+        self.assertEqual(sorted(arrivals), arrivals)
+        for flow in completed:
+            self.assertGreater(flow.completion, flow.arrival)
+        # No state is left behind once every flow is done
+        self.assertIsNone(h1.flow)
+        self.assertEqual({}, h1.awaiting_ack)
+        self.assertEqual({}, h2.request_nums)
+
+    def test_hosts_send_and_receive(self):
+        h1 = Host("h1")
+        h2 = Host("h2")
+        link = Link("L1", 10, 1, 64, h1, h2)
+        # Both hosts are sources and destinations, so each one sends ACKs
+        # for the flows it receives while its own flow waits for ACKs
+        workload = Workload("W", [h1, h2], [h1, h2], 2000, 0, count=20,
+                            sizes=FlowSizes.EXPONENTIAL, mean=5, seed=3)
+        network = Network([h1, h2], [], [link], display_graph=False,
+                          workloads=[workload])
+        workload.start()
+        network._run()
+
+        completed = h1.completed_flows + h2.completed_flows
+        self.assertEqual(20, len(completed))
+        self.assertTrue(h1.completed_flows)
+        self.assertTrue(h2.completed_flows)
+        self.assertEqual({}, h1.awaiting_ack)
+        self.assertEqual({}, h2.awaiting_ack)
+
+    def test_late_packets_of_finished_flow(self):
+        h1 = Host("h1")
+        h2 = Host("h2")
+        link = Link("L1", 10, 1, 64, h1, h2)
+        workload = Workload("W", [h1], [h2], 2000, 0, count=1,
+                            sizes=FlowSizes.EXPONENTIAL, mean=3, seed=1)
+        network = Network([h1, h2], [], [link], display_graph=False,
+                          workloads=[workload])
+        workload.start()
+        network._run()
+        self.assertEqual({"W.0"}, h2.finished_flows)
+        # A retransmission arriving after the flow finished is dropped
+        acks = []
+        h2.send = lambda packet, time: acks.append(packet)
+        h2.receive(FlowPacket("W.0", 0, FlowPacket.FLOW_PACKET_SIZE, h1, h2),
+                   network.TIME)
+        self.assertEqual([], acks)
+        self.assertEqual({}, h2.request_nums)
+
+    def test_interned_state_released(self):
+        h1 = Host("h1")
+        h2 = Host("h2")
+        link = Link("L1", 10, 1, 64, h1, h2)
+        workload = Workload("W", [h1], [h2], 2000, 0, count=5,
+                            sizes=FlowSizes.EXPONENTIAL, mean=3, seed=1)
+        network = Network([h1, h2], [], [link], display_graph=False,
+                          workloads=[workload])
+        # Each network indexes its own nodes from 0
+        self.assertEqual([0, 1], [h1.index, h2.index])
+        workload.start()
+        network._run()
+        self.assertEqual(5, len(h1.completed_flows))
+        # Finished flows don't stay interned
+        self.assertEqual(0, len(Packet.FLOW_INTERNER))
+
+    def test_needs_destinations(self):
+        h1 = Host("h1")
+        h2 = Host("h2")
+        # Hosts don't send flows to themselves
+        self.assertRaises(ValueError, Workload, "W", [h1], [h1], 10, 0,
+                          count=1)
+        self.assertRaises(ValueError, Workload, "W", [h1, h2], [h2], 10, 0,
+                          count=1)
+        self.assertRaises(ValueError, Workload, "W", [h1], [], 10, 0,
+                          count=1)
+
+    def test_percentile(self):
+        values = range(1, 101)
+        self.assertEqual(50, Network.percentile(values, 50))
+        self.assertEqual(99, Network.percentile(values, 99))
+        self.assertEqual(1, Network.percentile([1], 95))
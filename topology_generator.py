@@ -0,0 +1,107 @@
+import argparse
+import sys
+
+from components import RoutingProtocol
+from utils.topology import TopologyGenerator, TopologyType, TrafficMatrix
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(
+        description="Generates the XML flow specification of a topology")
+    parser.add_argument("topology",
+                        help="the topology to generate",
+                        choices=TopologyType.ALL)
+    parser.add_argument("size",
+                        help="hosts per side of a dumbbell, bottlenecks of a "
+                             "parking lot, k of a fat-tree or routers of a "
+                             "random graph",
+                        type=int)
+    parser.add_argument("-o", "--output",
+                        help="the file to write the spec to, stdout if none",
+                        type=str)
+    parser.add_argument("-s", "--seed",
+                        help="seed of the random graphs and traffic",
+                        type=int)
+    parser.add_argument("-t", "--traffic",
+                        help="the traffic matrix",
+                        choices=TrafficMatrix.ALL,
+                        default=TrafficMatrix.PAIRS)
+    parser.add_argument("--amount",
+                        help="data sent by each flow, in MB",
+                        type=float, default=1)
+    parser.add_argument("--start",
+                        help="start time of the flows, in s",
+                        type=float, default=0.5)
+    parser.add_argument("--congestion-control",
+                        help="congestion control of the flows",
+                        default="RENO")
+    parser.add_argument("--workload-rate",
+                        help="arrival rate of the workload, in flows per s",
+                        type=float)
+    parser.add_argument("--workload-count",
+                        help="number of flows of the workload",
+                        type=int)
+    parser.add_argument("--rate",
+                        help="rate of the links between routers, in Mbps",
+                        type=float, default=10)
+    parser.add_argument("--access-rate",
+                        help="rate of the links of the hosts, in Mbps",
+                        type=float, default=12.5)
+    parser.add_argument("--delay",
+                        help="propagation delay of the links, in ms",
+                        type=float, default=10)
+    parser.add_argument("--buffer-size",
+                        help="buffer size of the links, in KB",
+                        type=float, default=64)
+    parser.add_argument("--static",
+                        help="only compute the routing tables once",
+                        action="store_false", dest="dynamic_routing")
+    parser.add_argument("--routing",
+                        help="the routing protocol of the routers",
+                        choices=RoutingProtocol.ALL)
+    parser.add_argument("--ecmp",
+                        help="spread flows over equal cost paths",
+                        action="store_true")
+    parser.add_argument("--alpha",
+                        help="Waxman alpha, higher makes long links likelier",
+                        type=float, default=0.4)
+    parser.add_argument("--beta",
+                        help="Waxman beta, higher makes links likelier",
+                        type=float, default=0.4)
+    parser.add_argument("--degree",
+                        help="links of every new Barabasi-Albert router",
+                        type=int, default=2)
+    parser.add_argument("--hosts-per-router",
+                        help="hosts connected to each router of a random "
+                             "graph",
+                        type=int, default=1)
+    return parser
+
+if __name__ == '__main__':
+    # Parse command line arguments
+    argument_parser = get_argument_parser()
+    args = argument_parser.parse_args()
+    generator = TopologyGenerator(args.rate, args.access_rate, args.delay,
+                                  args.buffer_size, args.dynamic_routing,
+                                  args.routing, args.ecmp, args.seed)
+    # Only the random graphs take extra parameters
+    kwargs = {}
+    if args.topology == TopologyType.WAXMAN:
+        kwargs = {"alpha": args.alpha, "beta": args.beta,
+                  "hosts_per_router": args.hosts_per_router}
+    elif args.topology == TopologyType.BARABASI_ALBERT:
+        kwargs = {"degree": args.degree,
+                  "hosts_per_router": args.hosts_per_router}
+    try:
+        generator.generate(args.topology, args.size, **kwargs)
+        generator.add_traffic(args.traffic, args.amount, args.start,
+                              args.congestion_control, args.workload_rate,
+                              args.workload_count)
+    except ValueError as e:
+        # Sizes the topology can't be built with, reported like bad arguments
+        argument_parser.error(str(e))
+    if args.output:
+        with open(args.output, "w") as output:
+            generator.write(output)
+    else:
+        generator.write(sys.stdout)
@@ -1 +1,2 @@
 from logger import Logger, LoggerLevel
+from interner import Interner
@@ -1,124 +1,293 @@
-import matplotlib.pyplot as plt
+import multiprocessing
 import os
+import shutil
+import sys
+import tempfile
 import time
-from numpy import ndarray
 
-from events.event_types.graph_events import *
 from csv_processor import CSVProcessor
+from metrics_sink import MetricsSink
+from metrics_store import Metric
+
+
+def pyplot(backend=None):
+    """
+    Imports matplotlib when the first graph is drawn, so runs that don't graph
+    don't pay for it. Without a display the non-interactive Agg backend is
+    used, unless a backend is set with MPLBACKEND.
+
+    :param backend: Backend to use instead, e.g. "Agg"
+    :type backend: str
+    :return: The matplotlib.pyplot module
+    :rtype: module
+    """
+    if "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        headless = os.name == "posix" and sys.platform != "darwin" and \
+            not os.environ.get("DISPLAY") and \
+            not os.environ.get("WAYLAND_DISPLAY")
+        if backend is not None:
+            matplotlib.use(backend)
+        elif headless and not os.environ.get("MPLBACKEND"):
+            matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    if backend is not None and plt.get_backend().lower() != backend.lower():
+        plt.switch_backend(backend)
+    return plt
+
+
+def render_figure(task):
+    """
+    Draws and saves the figure of one metric in a worker process, with the
+    Agg backend
+
+    :param task: Output folder, max points, time string, figure of
+                 Grapher.METRICS, the series or the metrics file with only
+                 the figure's metric, and the bucket size
+    :type task: tuple
+    :return: Nothing
+    :rtype: None
+    """
+    output_folder, max_points, time_str, figure, data, bucket_size = task
+    plt = pyplot("Agg")
+    grapher = Grapher(output_folder, max_points)
+    grapher.timeStr = time_str
+    grapher.graph_metric(grapher.load(data, figure[0]), *figure,
+                         bucket_size=bucket_size)
+    plt.close("all")
 
 
 class Grapher:
-    WINDOW_SIZE_NAME = "window_size"
-    LINK_BUFFER_NAME = "link_buffer"
-    DROPPED_PACKETS_NAME = "dropped_packets"
-    LINK_THROUGHPUT_NAME = "link_throughput"
-    FLOW_THROUGHPUT_NAME = "flow_throughput"
-    PACKET_DELAY_NAME = "packet_delay"
+    WINDOW_SIZE_NAME = Metric.WINDOW_SIZE
+    LINK_BUFFER_NAME = Metric.LINK_BUFFER
+    DROPPED_PACKETS_NAME = Metric.DROPPED_PACKETS
+    LINK_THROUGHPUT_NAME = Metric.LINK_THROUGHPUT
+    FLOW_THROUGHPUT_NAME = Metric.FLOW_THROUGHPUT
+    PACKET_DELAY_NAME = Metric.PACKET_DELAY
+
+    SUBPLOT = "Subplot"
+    BAR = "Bar"
+    OVERLAY = "Overlay"
+    # Graphs of the metrics, in the order they're drawn:
+    # (metric, title, y-label, graph type, whether to average in buckets)
+    METRICS = [
+        (WINDOW_SIZE_NAME, "Window Size", "Window Size (packets)", SUBPLOT,
+         False),
+        (LINK_BUFFER_NAME, "Link Buffer Occupancy", "# Packets", SUBPLOT,
+         True),
+        (LINK_THROUGHPUT_NAME, "Link Throughput", "Throughput (Mbps)",
+         SUBPLOT, True),
+        (FLOW_THROUGHPUT_NAME, "Flow Throughput", "Throughput (Mbps)",
+         SUBPLOT, True),
+        (DROPPED_PACKETS_NAME, "Dropped Packets", "# Packets", BAR, True),
+        (PACKET_DELAY_NAME, "Packet Delay", "RTT (ms)", SUBPLOT, True),
+    ]
+    X_LABEL = "Time (ms)"
 
     BUCKET_SIZE = 75  # In ms
+    # Longer series are reduced to this many points before being plotted
+    MAX_POINTS = 5000
+    # More items than this are overlaid on a single graph instead
+    MAX_SUBPLOTS = 9
 
-    def __init__(self, output_folder=None):
+    def __init__(self, output_folder=None, max_points=MAX_POINTS,
+                 processes=1):
+        """
+        Graphs the metrics of a run
+
+        Args:
+            output_folder (str):    Folder the graphs and data are saved to.
+            max_points (int):       Most points plotted per series, or None
+                                    to plot every sample.
+            processes (int):        Processes the figures are rendered and
+                                    saved in when they aren't displayed, one
+                                    per figure and CPU if None.
+        """
         self.outputFolder = output_folder
+        self.maxPoints = max_points
+        self.processes = processes
         self.csvProcessor = CSVProcessor()
         self.timeStr = time.strftime("%Y-%m_%d-%H_%M_%S")
 
-    def graph_all(self, graph_events):
-        self.graph_window_size_events(graph_events)
-        self.graph_link_buffer_events(graph_events)
-        self.graph_link_throughput_events(graph_events)
-        self.graph_flow_throughput_events(graph_events)
-        self.graph_dropped_packets_events(graph_events)
-        self.graph_packet_delay_events(graph_events)
-
-    def graph_window_size_events(self, graph_events):
-        flow_events = self.filter_events(graph_events, WindowSizeEvent)
-        if len(flow_events) == 0: return
-        header_strs = ["Window Size", "Time (ms)", "Window Size (packets)"]
-        self.graph_events_subplots(flow_events, *header_strs)
-        self.output_current_figure(Grapher.WINDOW_SIZE_NAME)
-        header_strs.append("Subplot")
-        self.output_csv(Grapher.WINDOW_SIZE_NAME, flow_events, header_strs)
-
-    def graph_link_buffer_events(self, graph_events):
-        link_events = self.filter_events(graph_events, LinkBufferSizeEvent)
-        if len(link_events) == 0: return
-        link_events = self.make_buckets(link_events)
-        header_strs = ["Link Buffer Occupancy", "Time (ms)", "# Packets"]
-        self.graph_events_subplots(link_events, *header_strs)
-        self.output_current_figure(Grapher.LINK_BUFFER_NAME)
-        header_strs.append("Subplot")
-        self.output_csv(Grapher.LINK_BUFFER_NAME, link_events, header_strs)
-
-    def graph_link_throughput_events(self, graph_events):
-        link_t_events = self.filter_events(graph_events, LinkThroughputEvent)
-        if len(link_t_events) == 0: return
-        link_t_events = self.make_buckets(link_t_events)
-        header_strs = ["Link Throughput", "Time (ms)", "Throughput (Mbps)"]
-        self.graph_events_subplots(link_t_events, *header_strs)
-        self.output_current_figure(Grapher.LINK_THROUGHPUT_NAME)
-        header_strs.append("Subplot")
-        self.output_csv(Grapher.LINK_THROUGHPUT_NAME, link_t_events, header_strs)
-
-    def graph_flow_throughput_events(self, graph_events):
-        flow_t_events = self.filter_events(graph_events, FlowThroughputEvent)
-        if len(flow_t_events) == 0: return
-        flow_t_events = self.make_buckets(flow_t_events)
-        header_strs = ["Flow Throughput", "Time (ms)", "Throughput (Mbps)"]
-        self.graph_events_subplots(flow_t_events, *header_strs)
-        self.output_current_figure(Grapher.FLOW_THROUGHPUT_NAME)
-        header_strs.append("Subplot")
-        self.output_csv(Grapher.FLOW_THROUGHPUT_NAME, flow_t_events, header_strs)
-
-    def graph_dropped_packets_events(self, graph_events):
-        d_packets_events = self.filter_events(graph_events, DroppedPacketEvent)
-        if len(d_packets_events) == 0: return
-        d_packets_events = self.make_buckets(d_packets_events)
-        header_strs = ["Dropped Packets", "Time (ms)", "# Packets"]
-        self.graph_events_bar(d_packets_events, *header_strs)
-        self.output_current_figure(Grapher.DROPPED_PACKETS_NAME)
-        header_strs.append("Bar")
-        self.output_csv(Grapher.DROPPED_PACKETS_NAME, d_packets_events, header_strs)
-
-    def graph_packet_delay_events(self, graph_events):
-        rtt_events = self.filter_events(graph_events, RTTEvent)
-        if len(rtt_events) == 0: return
-        rtt_events = self.make_buckets(rtt_events)
-        header_strs = ["Packet Delay", "Time (ms)", "RTT (ms)"]
-        self.graph_events_subplots(rtt_events, *header_strs)
-        self.output_current_figure(Grapher.PACKET_DELAY_NAME)
-        header_strs.append("Subplot")
-        self.output_csv(Grapher.PACKET_DELAY_NAME, rtt_events, header_strs)
+    def graph_all(self, metrics):
+        """
+        Graphs the metrics recorded during a run
+
+        :param metrics: Metric samples of the run
+        :type metrics: MetricsStore
+        :return: Nothing
+        :rtype: None
+        """
+        series = {metric: metrics.arrays(metric) for metric in Metric.ALL}
+        self.graph_figures([(figure, series[figure[0]])
+                            for figure in self.METRICS])
+        self.output_results(sorted(series.items()))
+
+    def graph_metrics_file(self, filename, bucket_size=BUCKET_SIZE):
+        """
+        Graphs the metrics written by a metrics sink, and saves them to a
+        results file too. The file is parsed once, into a file per metric,
+        then metrics are read one at a time, so only the samples of one graph
+        are in memory.
+
+        :param filename: File written by a metrics sink
+        :type filename: str
+        :param bucket_size: Bucket size of the averaged metrics, in ms
+        :type bucket_size: int
+        :return: Nothing
+        :rtype: None
+        """
+        folder = tempfile.mkdtemp()
+        try:
+            parts = MetricsSink.split(filename, folder)
+            self.graph_figures([(figure, parts.get(figure[0], {}))
+                                for figure in self.METRICS], bucket_size)
+            self.output_results((metric, self.load(parts[metric], metric))
+                                for metric in Metric.ALL if metric in parts)
+        finally:
+            shutil.rmtree(folder)
+
+    def graph_figures(self, figures, bucket_size=BUCKET_SIZE):
+        """
+        Graphs figures of Grapher.METRICS. When they're only saved, each is
+        rendered by a process of a pool, which is handed the figure's series
+        or reads them from a metrics file with only the figure's metric, as
+        written by MetricsSink.split.
+
+        :param figures: Figures with their series or the metrics file of
+                        their metric
+        :type figures: list[(tuple, dict | str)]
+        :param bucket_size: Bucket size of the averaged metrics, in ms
+        :type bucket_size: int
+        :return: Nothing
+        :rtype: None
+        """
+        tasks = [(self.outputFolder, self.maxPoints, self.timeStr, figure,
+                  data, bucket_size) for figure, data in figures
+                 if len(data) > 0]
+        processes = self.processes or \
+            min(len(tasks), multiprocessing.cpu_count())
+        if processes <= 1 or self.outputFolder is None:
+            for figure, data in figures:
+                self.graph_metric(self.load(data, figure[0]), *figure,
+                                  bucket_size=bucket_size)
+            return
+        pool = multiprocessing.Pool(processes)
+        try:
+            pool.map(render_figure, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    @staticmethod
+    def load(data, metric):
+        """
+        :param data: Series of the metric, or the metrics file of the metric
+                     written by MetricsSink.split
+        :type data: dict | str
+        :return: Series of the metric
+        :rtype: dict[str, (list[float], list[float])]
+        """
+        if isinstance(data, basestring):
+            return MetricsSink.read(data, metric).get(metric, {})
+        return data
+
+    def graph_results_file(self, filename, bucket_size=BUCKET_SIZE,
+                           metrics=None):
+        """
+        Graphs the metrics of a results file. Only the series of the graphed
+        metrics are loaded.
+
+        :param filename: File written by output_results
+        :type filename: str
+        :param bucket_size: Bucket size of the averaged metrics, in ms
+        :type bucket_size: int
+        :param metrics: Metrics to graph, all if None
+        :type metrics: list[str]
+        :return: Nothing
+        :rtype: None
+        """
+        from results_file import ResultsFile
+        with ResultsFile(filename) as results:
+            for metric, title, ylabel, graph_type, bucketed in self.METRICS:
+                if metrics is not None and metric not in metrics:
+                    continue
+                self.graph_metric(results.series(metric), metric, title,
+                                  ylabel, graph_type, bucketed, bucket_size)
+
+    def graph_metric(self, data, metric, title, ylabel, graph_type,
+                     bucketed, bucket_size=BUCKET_SIZE):
+        """
+        Graphs the samples of a metric, then saves the figure and the data if
+        there is an output folder
+
+        :param data: Mapping of flow or link IDs to a tuple with x and y
+                     values
+        :type data: dict[str, (numpy.ndarray, numpy.ndarray)]
+        :return: Nothing
+        :rtype: None
+        """
+        if len(data) == 0:
+            return
+        if bucketed:
+            data = self.make_buckets_data(data, bucket_size)
+        plot_data = self.downsample_data(data)
+        if graph_type == Grapher.BAR:
+            self.graph_data_bar(plot_data, title, Grapher.X_LABEL, ylabel)
+        else:
+            self.graph_data_subplots(plot_data, title, Grapher.X_LABEL, ylabel)
+        self.output_current_figure(metric)
+        self.output_csv(metric, data,
+                        [title, Grapher.X_LABEL, ylabel, graph_type])
 
     def show(self):
-        plt.show()
+        pyplot().show()
 
     def output_current_figure(self, filename):
         if self.outputFolder is None:
             return
         self.create_output_folder_if_needed()
         filename = "%s/%s-%s.png" % (self.outputFolder, filename, self.timeStr)
-        plt.savefig(filename)
+        pyplot().savefig(filename)
 
-    def output_csv(self, filename, graph_events, header_strs):
+    def output_results(self, series):
         """
-        Output the graph events to a csv file
+        Writes every metric series of the run to a results file, which
+        graphing_tool.py loads much faster than the CSV files
+
+        :param series: (metric, { identifier : (times, values) }) pairs, read
+                       one at a time
+        :type series: iterable[(str, dict[str, (list, list)])]
+        :return: Nothing
+        :rtype: None
+        """
+        if self.outputFolder is None:
+            return
+        from results_file import ResultsFile
+        self.create_output_folder_if_needed()
+        filename = "%s/results-%s%s" % (self.outputFolder, self.timeStr,
+                                        ResultsFile.EXTENSION)
+        ResultsFile.write_series(filename, series)
+
+    def output_csv(self, filename, data, header_strs):
+        """
+        Output the graph data to a csv file
 
         :param filename: Filename prefix for the csv file
         :type filename: str
-        :param graph_events: Graph events to output data for
-        :type graph_events: dict[str, list[GraphEvents]]
+        :param data: Mapping of IDs to a tuple with a list of x, y values
+        :type data: dict[str, (list[float], list[float])]
         :param header_strs: [title, x-label, y-label, graph-type]
         :type header_strs: list[str]
         :return: Nothing
         :rtype: None
         """
-        if self.outputFolder is None or len(graph_events) == 0:
+        if self.outputFolder is None or len(data) == 0:
             return
         self.create_output_folder_if_needed()
         title, xlabel, ylabel, graph_type = header_strs
         header = CSVProcessor.make_header(title, xlabel, ylabel, graph_type)
         filename = "%s/%s-%s.csv" % (self.outputFolder, filename, self.timeStr)
-        data = self.dict_from_events(graph_events)
         CSVProcessor.output_csv(filename, data, header)
 
     def plot_csv(self, filename, bucket_size):
@@ -135,15 +304,13 @@ class Grapher:
         header_dict, data = CSVProcessor.data_from_csv_file(filename)
         if bucket_size:
             data = self.make_buckets_data(data, bucket_size)
-        if header_dict["graph-type"] == "Subplot":
-            graph_fn = self.graph_events_subplots \
-                if bucket_size else self.graph_data_subplots
-        elif header_dict["graph-type"] == "Bar":
-            graph_fn = self.graph_events_bar \
-                if bucket_size else self.graph_data_bar
-        elif header_dict["graph-type"] == "Overlay":
-            graph_fn = self.graph_events_overlay \
-                if bucket_size else self.graph_data_overlay
+        data = self.downsample_data(data)
+        if header_dict["graph-type"] == Grapher.SUBPLOT:
+            graph_fn = self.graph_data_subplots
+        elif header_dict["graph-type"] == Grapher.BAR:
+            graph_fn = self.graph_data_bar
+        elif header_dict["graph-type"] == Grapher.OVERLAY:
+            graph_fn = self.graph_data_overlay
         else:
             raise ValueError("Unhandled graph type: %s" 
                 % header_dict["graph-type"])
@@ -156,57 +323,42 @@ class Grapher:
         if not os.path.exists(self.outputFolder):
             os.makedirs(self.outputFolder)
 
-    @staticmethod
-    def make_buckets(events, bucket_size=BUCKET_SIZE):
-        new_events = {ident: [] for ident in events}
-        for ident, event_list in events.items():
-            buckets = {}
-            for e in event_list:
-                bucket_no = int(e.x_value() / bucket_size)
-                if bucket_no not in buckets:
-                    buckets[bucket_no] = []
-                buckets[bucket_no].append(e.y_value())
-            for bucket_no, bucket in buckets.items():
-                bucket_time = bucket_no * bucket_size
-                bucket_value = sum(bucket) / float(len(bucket))
-                new_events[ident].append(BucketEvent(bucket_time, bucket_value))
-        return new_events
+    def downsample_data(self, data):
+        """
+        Reduces the series with more than maxPoints samples to their min/max
+        envelope, which matplotlib plots much faster than millions of points
 
-    @staticmethod
-    def make_buckets_data(data, bucket_size):
-        new_data = {identifier: [] for identifier in data}
-        for ident, values_tuple in data.items():
-            buckets = {}
-            for x, y in sorted(zip(*values_tuple)):
-                bucket_no = int(x / bucket_size)
-                if bucket_no not in buckets:
-                    buckets[bucket_no] = []
-                    buckets[bucket_no].append(y)
-            for bucket_no, bucket in buckets.items():
-                bucket_time = bucket_no * bucket_size
-                bucket_val = sum(bucket) / float(len(bucket))
-                new_data[ident].append(BucketEvent(bucket_time, bucket_val))
-        return new_data
+        :param data: Mapping of IDs to a tuple with x and y values
+        :type data: dict[str, (numpy.ndarray, numpy.ndarray)]
+        :return: Mapping of IDs to the x and y values to plot
+        :rtype: dict[str, (numpy.ndarray, numpy.ndarray)]
+        """
+        if not self.maxPoints:
+            return data
+        from resampler import Resampler
+        return {ident: (x, y) if len(x) <= self.maxPoints
+                else Resampler(x, y).envelope(self.maxPoints)
+                for ident, (x, y) in data.items()}
 
     @staticmethod
-    def graph_events_overlay(events, title, xlabel, ylabel):
+    def make_buckets_data(data, bucket_size, statistic=None):
         """
-        Plots the given events with the specified labels with all items in one
-        graph.
-
-        :param events: Dictionary with flow IDs and a list of events for the ID
-        :type events: dict[str, list[GraphEvent]]
-        :param title: Graph title
-        :type title: str
-        :param xlabel: X-label to add to the graph
-        :type xlabel: str
-        :param ylabel: Y-label to add to the graph
-        :type ylabel: str
-        :return: Nothing
-        :rtype: None
+        Reduces the values of each series in buckets of the given width
+
+        :param data: Mapping of IDs to a tuple with x and y values
+        :type data: dict[str, (numpy.ndarray, numpy.ndarray)]
+        :param bucket_size: Bucket width, in ms
+        :type bucket_size: float
+        :param statistic: Statistic of the values of a bucket, the mean if
+                          None
+        :type statistic: str
+        :return: Mapping of IDs to the bucket times and statistics
+        :rtype: dict[str, (numpy.ndarray, numpy.ndarray)]
         """
-        data = Grapher.dict_from_events(events)
-        Grapher.graph_data_overlay(data, title, xlabel, ylabel)
+        from resampler import Resampler, Statistic
+        statistic = statistic or Statistic.MEAN
+        return {ident: Resampler(x, y).bucket(bucket_size, statistic)
+                for ident, (x, y) in data.items()}
 
     @staticmethod
     def graph_data_overlay(data, title, xlabel, ylabel):
@@ -227,39 +379,21 @@ class Grapher:
         """
         if len(data) == 0:
             return
+        plt = pyplot()
         plt.figure(figsize=(15, 5))
         plt.get_current_fig_manager().set_window_title(title)
         plt.title(title)
         for identifier, plot_tuple in data.items():
             x, y = plot_tuple
             plt.plot(x, y, label=("%s" % identifier))
-        # Add legend
-        plt.legend(bbox_to_anchor=(1.006, 1), loc=2, borderaxespad=0.)
+        # Add legend, unless there are too many items to tell apart
+        if len(data) <= Grapher.MAX_SUBPLOTS:
+            plt.legend(bbox_to_anchor=(1.006, 1), loc=2, borderaxespad=0.)
         # Add graph labels
         plt.title(title)
         plt.xlabel(xlabel)
         plt.ylabel(ylabel)
 
-    @staticmethod
-    def graph_events_subplots(events, title, xlabel, ylabel):
-        """
-        Plots the given events with the specified labels with items in different
-        subplots.
-
-        :param events: Dictionary with flow IDs and a list of events for the ID
-        :type events: dict[str, list[GraphEvent]]
-        :param title: Graph title
-        :type title: str
-        :param xlabel: X-label to add to the graph
-        :type xlabel: str
-        :param ylabel: Y-label to add to the graph
-        :type ylabel: str
-        :return: Nothing
-        :rtype: None
-        """
-        data = Grapher.dict_from_events(events)
-        Grapher.graph_data_subplots(data, title, xlabel, ylabel)
-
     @staticmethod
     def graph_data_subplots(data, title, xlabel, ylabel):
         """
@@ -279,8 +413,10 @@ class Grapher:
         """
         if len(data) == 0:
             return
-        assert len(data.keys()) <= 9, \
-            "Can't put more than 9 subplots on a figure"
+        if len(data) > Grapher.MAX_SUBPLOTS:
+            Grapher.graph_data_overlay(data, title, xlabel, ylabel)
+            return
+        plt = pyplot()
         plt.figure(figsize=(15, 10))
         plt.get_current_fig_manager().set_window_title(title)
         i_subplot = 100 * len(data.keys()) + 10 + 1
@@ -299,26 +435,6 @@ class Grapher:
             plt.title(identifier)
         plt.tight_layout()
 
-    @staticmethod
-    def graph_events_bar(events, title, xlabel, ylabel):
-        """
-        Plots the given events with the specified labels as bar graphs with
-        items in different subplots.
-
-        :param events: Dictionary with flow IDs and a list of events for the ID
-        :type events: dict[str, list[GraphEvent]]
-        :param title: Graph title
-        :type title: str
-        :param xlabel: X-label to add to the graph
-        :type xlabel: str
-        :param ylabel: Y-label to add to the graph
-        :type ylabel: str
-        :return: Nothing
-        :rtype: None
-        """
-        data = Grapher.dict_from_events(events)
-        Grapher.graph_data_bar(data, title, xlabel, ylabel)
-
     @staticmethod
     def graph_data_bar(data, title, xlabel, ylabel):
         """
@@ -338,12 +454,15 @@ class Grapher:
         """
         if len(data) == 0:
             return
-        assert len(data.keys()) <= 9, \
-            "Can't put more than 9 subplots on a figure"
-        f, subplots = plt.subplots(len(data), 1, figsize=(15, 10))
+        if len(data) > Grapher.MAX_SUBPLOTS:
+            Grapher.graph_data_overlay(data, title, xlabel, ylabel)
+            return
+        plt = pyplot()
+        f, subplots = plt.subplots(len(data), 1, figsize=(15, 10),
+                                   squeeze=False)
         plt.get_current_fig_manager().set_window_title(title)
         for i, (identifier, plot_tuple) in enumerate(sorted(data.items())):
-            subplot = subplots[i] if isinstance(subplots, ndarray) else subplots
+            subplot = subplots[i][0]
             x, y = plot_tuple
             # Plot the bar graph
             subplot.bar(x, y, width=0.01)
@@ -356,53 +475,3 @@ class Grapher:
             if len(data) == 1 or i == (len(data) - 1) / 2:
                 subplot.set_ylabel(ylabel)
         plt.tight_layout()
-
-    @staticmethod
-    def filter_events(graph_events, event_type):
-        """
-        Filters flow events of the given event type
-
-        :param graph_events: Graph events to filter
-        :type graph_events: list[GraphEvent]
-        :param event_type: Event type to filter
-        :type event_type: class
-        :return: Dictionary with flow IDs and a list of events for the ID
-        :rtype: dict[str, list[GraphEvent]]
-        """
-        filtered_events = {}
-        for event in graph_events:
-            if isinstance(event, event_type):
-                identifier = event.identifier()
-                if identifier not in filtered_events:
-                    filtered_events[identifier] = []
-                filtered_events[identifier].append(event)
-        return filtered_events
-
-    @staticmethod
-    def values_from_events(graph_events):
-        """
-        Gets the x and y values form the graph events
-
-        :param graph_events: Graph events to get values from
-        :type graph_events: list[GraphEvents]
-        :return: Tuple containing two lists of x and y values respectively
-        :rtype: (list[float], list[float])
-        """
-        # zip(*lst) swaps axes; (x1, y1), (x2, y2) -> (x1, x2), (y1, y2)
-        return zip(*[(e.x_value(), e.y_value()) for e in graph_events])
-
-    @staticmethod
-    def dict_from_events(ids_events_dict):
-        """
-        Gets a dictionary mapping subplot identifiers to a tuple with two
-        lists of x and y values
-
-        :param ids_events_dict: Dictionary mapping IDs to events for ID
-        :type ids_events_dict: dict[str, GraphEvents]
-        :return: Dictionary mapping IDs to a tuple with lists of x and y values
-        :rtype: dict[str, (list[float], list[float])]
-        """
-        events = {}
-        for (identifier, graph_events) in ids_events_dict.items():
-            events[identifier] = Grapher.values_from_events(graph_events)
-        return events
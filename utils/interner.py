@@ -0,0 +1,69 @@
+class Interner(object):
+    """
+    Maps keys to dense integer indices, in the order they are first seen
+    """
+
+    def __init__(self):
+        # { key : index }
+        self.indices = {}
+        # { index : key }
+        self.keys = {}
+        # Index of the next new key. Released indices aren't handed out again,
+        # so stale references to a released key can't alias a new one
+        self.next_index = 0
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __repr__(self):
+        return "Interner[%d keys]" % len(self.indices)
+
+    def intern(self, key):
+        """
+        Index of the given key, assigning the next free index to new keys
+
+        :param key: Key to intern
+        :type key: str
+        :return: Index of the key
+        :rtype: int
+        """
+        index = self.indices.get(key)
+        if index is None:
+            index = self.next_index
+            self.next_index += 1
+            self.indices[key] = index
+            self.keys[index] = key
+        return index
+
+    def key(self, index):
+        """
+        Key interned at the given index
+
+        :param index: Index of the key
+        :type index: int
+        :return: Key
+        :rtype: str
+        """
+        return self.keys[index]
+
+    def release(self, key):
+        """
+        Forgets a key that is no longer used. Interning it again assigns it a
+        new index.
+
+        :param key: Key to forget
+        :type key: str
+        :return: Nothing
+        :rtype: None
+        """
+        index = self.indices.pop(key, None)
+        if index is not None:
+            del self.keys[index]
+
+    def clear(self):
+        """
+        Forgets every key, indices start from 0 again
+        """
+        self.indices = {}
+        self.keys = {}
+        self.next_index = 0
@@ -0,0 +1,133 @@
+import csv
+import os
+
+
+class MetricsSink(object):
+    # Records kept in memory before they're appended to the file
+    CHUNK_SIZE = 65536
+    HEADER = ["metric", "identifier", "time", "value"]
+
+    def __init__(self, filename, chunk_size=CHUNK_SIZE):
+        """
+        Writes metric samples to a file while the network runs, instead of
+        keeping every graph event until the end. Samples are buffered and
+        appended a chunk at a time, so memory stays bounded however long the
+        run is.
+
+        Args:
+            filename (str):     File to write the samples to.
+            chunk_size (int):   Samples buffered before they're written.
+        """
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.records = []
+        self.file = open(filename, "wb")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.HEADER)
+
+    def __repr__(self):
+        return "MetricsSink[%s]" % self.filename
+
+    def record(self, metric, identifier, time, value):
+        """
+        Adds a sample
+
+        :param metric: Name of the metric, e.g. "window_size"
+        :type metric: str
+        :param identifier: Flow or link the sample is about
+        :type identifier: str
+        :param time: Time of the sample, in ms
+        :type time: float
+        :param value: Value of the sample
+        :type value: float
+        :return: Nothing
+        :rtype: None
+        """
+        self.records.append((metric, identifier, time, value))
+        if len(self.records) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the buffered samples to the file
+        """
+        self.writer.writerows(self.records)
+        self.records = []
+        self.file.flush()
+
+    def close(self):
+        """
+        Writes the last samples and closes the file
+        """
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    @classmethod
+    def is_metrics_file(cls, filename):
+        """
+        Whether the file was written by a metrics sink, rather than being a
+        graph CSV file
+        """
+        with open(filename, "rb") as metrics_file:
+            return next(csv.reader(metrics_file), None) == cls.HEADER
+
+    @staticmethod
+    def read(filename, metric=None):
+        """
+        Reads the samples of a metrics file, one line at a time
+
+        :param filename: File written by a metrics sink
+        :type filename: str
+        :param metric: Only read the samples of this metric, all if None
+        :type metric: str
+        :return: { metric : { identifier : (times, values) } }
+        :rtype: dict[str, dict[str, (list[float], list[float])]]
+        """
+        series = {}
+        with open(filename, "rb") as metrics_file:
+            reader = csv.reader(metrics_file)
+            next(reader)
+            for name, identifier, time, value in reader:
+                if metric is not None and name != metric:
+                    continue
+                data = series.setdefault(name, {})
+                if identifier not in data:
+                    data[identifier] = ([], [])
+                times, values = data[identifier]
+                times.append(float(time))
+                values.append(float(value))
+        return series
+
+    @classmethod
+    def split(cls, filename, folder):
+        """
+        Splits a metrics file into one metrics file per metric, in a single
+        pass, so each metric can be read without parsing the others
+
+        :param filename: File written by a metrics sink
+        :type filename: str
+        :param folder: Folder to write the files of the metrics to
+        :type folder: str
+        :return: { metric : metrics file with only its samples }
+        :rtype: dict[str, str]
+        """
+        parts = {}
+        writers = {}
+        try:
+            with open(filename, "rb") as metrics_file:
+                reader = csv.reader(metrics_file)
+                next(reader)
+                for row in reader:
+                    writer = writers.get(row[0])
+                    if writer is None:
+                        parts[row[0]] = os.path.join(folder, "%s.csv" % row[0])
+                        part = open(parts[row[0]], "wb")
+                        writer = writers[row[0]] = (part, csv.writer(part))
+                        writer[1].writerow(cls.HEADER)
+                    writer[1].writerow(row)
+        finally:
+            for part, _ in writers.values():
+                part.close()
+        return parts
@@ -0,0 +1,96 @@
+from array import array
+
+
+class Metric:
+    """
+    Metrics recorded during a run, one series per flow or link
+    """
+    # Congestion window of a flow, in packets
+    WINDOW_SIZE = "window_size"
+    # Occupancy of a link buffer, in packets
+    LINK_BUFFER = "link_buffer"
+    # 1 for every packet dropped by a link
+    DROPPED_PACKETS = "dropped_packets"
+    # Average throughput of a link since the start, in Mbps
+    LINK_THROUGHPUT = "link_throughput"
+    # Average throughput of a flow since the start, in Mbps
+    FLOW_THROUGHPUT = "flow_throughput"
+    # RTT samples of a flow, in ms
+    PACKET_DELAY = "packet_delay"
+
+    ALL = [WINDOW_SIZE, LINK_BUFFER, DROPPED_PACKETS, LINK_THROUGHPUT,
+           FLOW_THROUGHPUT, PACKET_DELAY]
+
+
+class MetricsStore(object):
+    def __init__(self, sink=None):
+        """
+        Samples of the metrics of a run, kept as a pair of growable arrays
+        of doubles per metric and flow or link, 16 bytes a sample.
+
+        Args:
+            sink (MetricsSink): Sink the samples are written to instead of
+                                being kept in memory.
+        """
+        # { metric : { identifier : (times, values) } }
+        self.series = {}
+        self.sink = sink
+
+    def __len__(self):
+        return sum(len(times) for data in self.series.values()
+                   for times, _ in data.values())
+
+    def __repr__(self):
+        return "MetricsStore[%d samples]" % len(self)
+
+    def record(self, metric, identifier, time, value):
+        """
+        Adds a sample
+
+        :param metric: Name of the metric
+        :type metric: str
+        :param identifier: Flow or link the sample is about
+        :type identifier: str
+        :param time: Time of the sample, in ms
+        :type time: float
+        :param value: Value of the sample
+        :type value: float
+        :return: Nothing
+        :rtype: None
+        """
+        if self.sink is not None:
+            self.sink.record(metric, identifier, time, value)
+            return
+        data = self.series.get(metric)
+        if data is None:
+            data = self.series[metric] = {}
+        columns = data.get(identifier)
+        if columns is None:
+            columns = data[identifier] = (array('d'), array('d'))
+        columns[0].append(time)
+        columns[1].append(value)
+
+    def arrays(self, metric):
+        """
+        Samples of a metric as NumPy arrays sorted by time. Samples can be
+        recorded ahead of time, e.g. the window of a flow that hasn't started.
+
+        :param metric: Name of the metric
+        :type metric: str
+        :return: { identifier : (times, values) }
+        :rtype: dict[str, (numpy.ndarray, numpy.ndarray)]
+        """
+        # Only needed once the run is over, so runs that don't graph or save
+        # their metrics don't import it
+        import numpy
+        data = {}
+        for identifier, (times, values) in self.series.get(metric,
+                                                           {}).items():
+            # Copies, the arrays may be reallocated by later samples
+            times = numpy.frombuffer(times, dtype=numpy.float64).copy()
+            values = numpy.frombuffer(values, dtype=numpy.float64).copy()
+            if len(times) > 1 and (numpy.diff(times) < 0).any():
+                order = numpy.argsort(times, kind="mergesort")
+                times, values = times[order], values[order]
+            data[identifier] = (times, values)
+        return data
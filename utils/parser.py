@@ -1,43 +1,72 @@
+import ast
 import xml.etree.ElementTree as et
 
-from components import Host, Router, Link, CongestionControl
+from components import Host, Router, Link, CongestionControl, \
+    RoutingProtocol
+from components.aqm import AQM
+from components.link_scheduler import Scheduler
+from components.packet_types import Packet
+from components.traffic_source import SourceType, CBRSource, OnOffSource
+from components.workload import Workload, FlowSizes
 
 
 class Parser:
-    def __init__(self, filename):
+    def __init__(self, filename=None):
         """
         Initialize XML parser
 
-        :param filename: Path to XML filename
+        :param filename: Path to XML filename, None to only parse elements
         :type filename: str
         :return: Parser
         :rtype: Parser
         """
         self.filename = filename
+        # Workloads of the last parsed file, they're handed to the Network
+        self.workloads = []
 
     def parse(self):
         """
         Parses the XML file
 
+        :return: Hosts, routers, links and flows
+        :rtype: (list[Host], list[Router], list[Link])
+        """
+        tree = et.parse(self.filename)
+        return self.parse_element(tree.getroot())
+
+    def parse_element(self, root):
+        """
+        Parses a spec that is already an element tree, e.g. one made by the
+        topology generator
+
+        :param root: Spec element
+        :type root: et.Element
         :return: Hosts, routers, links and flows
         :rtype: (list[Host], list[Router], list[Link])
         """
         hosts = {}
         routers = {}
         links = []
-
-        tree = et.parse(self.filename)
-        root = tree.getroot()
+        self.workloads = []
 
         for host in root.iter('host'):
             host_id = host.attrib['id']
             new_host = Host(host_id)
             hosts[host_id] = new_host
 
+        # Routing protocol of all routers, unless a router sets its own
+        default_routing = RoutingProtocol.DISTANCE_VECTOR
+        default_ecmp = str(False)
+        for routers_element in root.iter('routers'):
+            default_routing = routers_element.attrib.get('routing',
+                                                         default_routing)
+            default_ecmp = routers_element.attrib.get('ecmp', default_ecmp)
         for router in root.iter('router'):
             router_id = router.attrib['id']
             dynamic_routing = self.bool_parse(router.attrib['dynamic_routing'])
-            new_router = Router(router_id, dynamic_routing)
+            routing = router.attrib.get('routing', default_routing)
+            ecmp = self.bool_parse(router.attrib.get('ecmp', default_ecmp))
+            new_router = Router(router_id, dynamic_routing, routing, ecmp)
             routers[router_id] = new_router
 
         for link in root.iter('link'):
@@ -58,25 +87,152 @@ class Parser:
             else:
                 node2 = routers[node2_id]
 
+            scheduler = link.attrib.get('scheduler', Scheduler.FIFO)
+            scheduler_key = link.attrib.get('scheduler-key',
+                                            Scheduler.BY_FLOW)
+            weights = self.weights_parse(link.attrib.get('weights', ''))
+            aqm = link.attrib.get('aqm', AQM.TAIL_DROP)
+            # Upper case attributes override the AQM's constants
+            aqm_parameters = {name: self.value_parse(value)
+                              for name, value in link.attrib.items()
+                              if name.isupper()}
+            seed = int(link.attrib['seed']) if 'seed' in link.attrib else None
+            ecn = self.bool_parse(link.attrib.get('ecn', str(False)))
+
             new_link = Link(link.attrib['id'], rate, delay,
-                            buffer_size, node1, node2)
+                            buffer_size, node1, node2, scheduler,
+                            scheduler_key, weights, aqm, aqm_parameters, seed,
+                            ecn)
             links.append(new_link)
 
         for flow in root.iter('flow'):
-            start = float(flow.attrib['start'])
-            amount = float(flow.attrib['amount'])
             src = hosts[flow.attrib['src']]
             dest = hosts[flow.attrib['dest']]
-            cong_ctrl = flow.attrib.get('congestion-control', '')
+            flow_type = flow.attrib.get('type', SourceType.TCP)
+            if flow_type != SourceType.TCP:
+                src.add_source(self.parse_source(flow, flow_type, src, dest))
+                continue
+            start = float(flow.attrib['start'])
+            amount = float(flow.attrib['amount'])
+            cong_ctrl = flow.attrib.get('congestion-control',
+                                        CongestionControl.RENO)
+            pacing = self.bool_parse(flow.attrib.get('pacing', str(False)))
+            traffic_class = int(flow.attrib.get('traffic-class',
+                                                Packet.TRAFFIC_CLASS))
+            ecn = self.bool_parse(flow.attrib.get('ecn', str(False)))
+            # Upper case attributes override the protocol's constants
+            parameters = {name: self.value_parse(value)
+                          for name, value in flow.attrib.items()
+                          if name.isupper()}
 
             src.set_flow(flow.attrib['id'], dest, amount, start,
-                         congestion_method=getattr(CongestionControl,
-                                                   cong_ctrl,
-                                                   CongestionControl.RENO))
+                         congestion_method=cong_ctrl, parameters=parameters,
+                         pacing=pacing, traffic_class=traffic_class, ecn=ecn)
+
+        for workload in root.iter('workload'):
+            self.workloads.append(self.parse_workload(workload, hosts))
 
         return hosts.values(), routers.values(), links
 
+    def parse_workload(self, workload, hosts):
+        """
+        Parses a workload. Only its parameters are read here, the flows are
+        created while the network runs.
+
+        :param workload: Workload element
+        :type workload: et.Element
+        :param hosts: Hosts by ID
+        :type hosts: dict[str, Host]
+        :return: Workload
+        :rtype: Workload
+        """
+        attrib = workload.attrib
+
+        def host_list(name):
+            if name not in attrib:
+                return [hosts[host_id] for host_id in sorted(hosts)]
+            return [hosts[host_id] for host_id in attrib[name].split()]
+
+        return Workload(
+            attrib['id'], host_list('sources'), host_list('destinations'),
+            float(attrib['rate']), float(attrib.get('start', 0)),
+            stop=float(attrib['stop']) if 'stop' in attrib else None,
+            count=int(attrib['count']) if 'count' in attrib else None,
+            sizes=attrib.get('sizes', FlowSizes.WEB_SEARCH),
+            mean=float(attrib['mean']) if 'mean' in attrib else None,
+            shape=float(attrib.get('shape', 1.5)),
+            seed=int(attrib['seed']) if 'seed' in attrib else None,
+            congestion_method=attrib.get('congestion-control',
+                                         CongestionControl.RENO),
+            parameters={name: self.value_parse(value)
+                        for name, value in attrib.items() if name.isupper()},
+            pacing=self.bool_parse(attrib.get('pacing', str(False))),
+            traffic_class=int(attrib.get('traffic-class',
+                                         Packet.TRAFFIC_CLASS)),
+            ecn=self.bool_parse(attrib.get('ecn', str(False))))
+
+    @staticmethod
+    def parse_source(flow, flow_type, src, dest):
+        """
+        Parses a CBR or on/off traffic source
+
+        :param flow: Flow element
+        :type flow: et.Element
+        :param flow_type: Type of the source
+        :type flow_type: str
+        :param src: Host sending the traffic
+        :type src: Host
+        :param dest: Host receiving the traffic
+        :type dest: Host
+        :return: Traffic source
+        :rtype: CBRSource
+        """
+        attrib = flow.attrib
+        stop = float(attrib['stop']) if 'stop' in attrib else None
+        amount = float(attrib['amount']) if 'amount' in attrib else None
+        args = (src, attrib['id'], dest, float(attrib['rate']),
+                float(attrib['start']), stop, amount)
+        traffic_class = int(attrib.get('traffic-class', Packet.TRAFFIC_CLASS))
+        if flow_type == SourceType.CBR:
+            return CBRSource(*args, traffic_class=traffic_class)
+        if flow_type == SourceType.ON_OFF:
+            seed = int(attrib['seed']) if 'seed' in attrib else None
+            return OnOffSource(*args,
+                               on_time=float(attrib.get('on', 100)),
+                               off_time=float(attrib.get('off', 100)),
+                               distribution=attrib.get(
+                                   'distribution', OnOffSource.EXPONENTIAL),
+                               shape=float(attrib.get('shape', 1.5)),
+                               seed=seed, traffic_class=traffic_class)
+        raise ValueError("Unknown flow type %s" % flow_type)
+
+    @classmethod
+    def weights_parse(cls, string):
+        """
+        Parses DRR weights written as space separated key:weight pairs, e.g.
+        "0:1 1:4". Keys are traffic classes or flow IDs.
+
+        :return: { key : weight }
+        :rtype: dict
+        """
+        weights = {}
+        for pair in string.split():
+            key, weight = pair.rsplit(':', 1)
+            weights[cls.value_parse(key)] = float(weight)
+        return weights
+
     @staticmethod
     def bool_parse(string):
         assert string == str(True) or string == str(False), "String is not bool"
         return True if string == str(True) else False
+
+    @staticmethod
+    def value_parse(string):
+        """
+        Parses a Python literal (number, list, bool...), falling back to the
+        string itself
+        """
+        try:
+            return ast.literal_eval(string)
+        except (ValueError, SyntaxError):
+            return string
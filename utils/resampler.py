@@ -0,0 +1,168 @@
+import numpy
+
+
+class Statistic:
+    """
+    Statistics a bucket of samples can be reduced to. Percentiles are written
+    as "p" and the percentage, e.g. "p99".
+    """
+    MEAN = "mean"
+    MIN = "min"
+    MAX = "max"
+    COUNT = "count"
+    MEDIAN = "p50"
+
+    @staticmethod
+    def percentile(q):
+        return "p%g" % q
+
+
+class Resampler(object):
+    def __init__(self, times, values):
+        """
+        Reduces a series to fixed-width time buckets with NumPy, without a
+        Python loop over the samples. The samples are sorted once and shared
+        by every bucket size.
+
+        Args:
+            times (numpy.ndarray):  Times of the samples, in ms.
+            values (numpy.ndarray): Values of the samples.
+        """
+        times = numpy.asarray(times, dtype=numpy.float64)
+        values = numpy.asarray(values, dtype=numpy.float64)
+        if len(times) > 1 and (numpy.diff(times) < 0).any():
+            order = numpy.argsort(times, kind="mergesort")
+            times, values = times[order], values[order]
+        self.times = times
+        self.values = values
+
+    def __repr__(self):
+        return "Resampler[%d samples]" % len(self.times)
+
+    def resample(self, bucket_sizes, statistics=(Statistic.MEAN,)):
+        """
+        Reduces the series to every combination of bucket size and statistic
+
+        :param bucket_sizes: Bucket widths, in ms
+        :type bucket_sizes: list[float]
+        :param statistics: Statistics to compute in each bucket
+        :type statistics: list[str]
+        :return: { bucket size : { statistic : (bucket times, values) } }
+        :rtype: dict[float, dict[str, (numpy.ndarray, numpy.ndarray)]]
+        """
+        resampled = {}
+        for bucket_size in bucket_sizes:
+            bucket_nos, starts = self.buckets(bucket_size)
+            bucket_times = bucket_nos * float(bucket_size)
+            # Values sorted within each bucket, shared by the percentiles
+            sorted_values = None
+            reduced = resampled[bucket_size] = {}
+            for statistic in statistics:
+                if statistic.startswith("p"):
+                    if sorted_values is None:
+                        sorted_values = self.sort_buckets(bucket_size)
+                    values = self.percentiles(sorted_values, starts,
+                                              float(statistic[1:]))
+                else:
+                    values = self.reduce(starts, statistic)
+                reduced[statistic] = (bucket_times, values)
+        return resampled
+
+    def bucket(self, bucket_size, statistic=Statistic.MEAN):
+        """
+        Reduces the series to a single bucket size and statistic
+
+        :return: Start time of each non-empty bucket, and its statistic
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        return self.resample([bucket_size], [statistic])[bucket_size][statistic]
+
+    def buckets(self, bucket_size):
+        """
+        :return: Number of each non-empty bucket, and the index of its first
+                 sample
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        bucket_nos = numpy.floor(self.times / bucket_size).astype(numpy.int64)
+        starts = self.starts(bucket_nos)
+        return bucket_nos[starts], starts
+
+    @staticmethod
+    def starts(bucket_nos):
+        """
+        :return: Index of the first sample of each run of equal bucket numbers
+        :rtype: numpy.ndarray
+        """
+        if len(bucket_nos) == 0:
+            return numpy.zeros(0, dtype=numpy.int64)
+        return numpy.concatenate(
+            ([0], numpy.flatnonzero(numpy.diff(bucket_nos)) + 1))
+
+    def envelope(self, max_points):
+        """
+        Reduces the series to at most max_points samples for plotting,
+        keeping its shape. The time range is cut into equal slices and only
+        the smallest and largest sample of each slice is kept, along with the
+        first and last sample, so spikes and drops still show. Series with
+        max_points samples or less are returned as they are.
+
+        :param max_points: Number of samples to keep at most
+        :type max_points: int
+        :return: Times and values of the kept samples
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        if len(self.times) <= max_points:
+            return self.times, self.values
+        slices = max((max_points - 2) // 2, 1)
+        start, end = self.times[0], self.times[-1]
+        width = (end - start) / slices or 1.0
+        slice_nos = numpy.minimum(
+            numpy.floor((self.times - start) / width), slices - 1)
+        starts = self.starts(slice_nos)
+        counts = numpy.diff(numpy.append(starts, len(self.values)))
+        kept = [[0, len(self.values) - 1]]
+        for extreme in (numpy.minimum, numpy.maximum):
+            extremes = numpy.repeat(extreme.reduceat(self.values, starts),
+                                    counts)
+            # First sample of each slice equal to the slice's extreme
+            indices = numpy.flatnonzero(self.values == extremes)
+            kept.append(indices[numpy.searchsorted(indices, starts)])
+        kept = numpy.unique(numpy.concatenate(kept))
+        return self.times[kept], self.values[kept]
+
+    def reduce(self, starts, statistic):
+        if len(starts) == 0:
+            return numpy.zeros(0)
+        counts = numpy.diff(numpy.append(starts, len(self.values)))
+        if statistic == Statistic.COUNT:
+            return counts.astype(numpy.float64)
+        if statistic == Statistic.MEAN:
+            return numpy.add.reduceat(self.values, starts) / counts
+        if statistic == Statistic.MIN:
+            return numpy.minimum.reduceat(self.values, starts)
+        if statistic == Statistic.MAX:
+            return numpy.maximum.reduceat(self.values, starts)
+        raise ValueError("Unknown statistic: %s" % statistic)
+
+    def sort_buckets(self, bucket_size):
+        """
+        :return: The values, sorted within each bucket
+        :rtype: numpy.ndarray
+        """
+        bucket_nos = numpy.floor(self.times / bucket_size)
+        return self.values[numpy.lexsort((self.values, bucket_nos))]
+
+    def percentiles(self, sorted_values, starts, q):
+        """
+        Percentile of each bucket, interpolated linearly between the two
+        closest samples like numpy.percentile
+        """
+        if len(starts) == 0:
+            return numpy.zeros(0)
+        counts = numpy.diff(numpy.append(starts, len(sorted_values)))
+        positions = starts + (counts - 1) * (q / 100.0)
+        below = numpy.floor(positions).astype(numpy.int64)
+        above = numpy.ceil(positions).astype(numpy.int64)
+        fraction = positions - below
+        return sorted_values[below] + \
+            (sorted_values[above] - sorted_values[below]) * fraction
@@ -0,0 +1,188 @@
+import json
+import mmap
+import shutil
+import struct
+import tempfile
+import zlib
+
+import numpy
+
+
+class ResultsFile(object):
+    """
+    Binary file holding every metric series of a run. It starts with a magic
+    line and the length of a JSON header listing each series, then the raw
+    columns: little-endian doubles, each zlib compressed or not. A series is
+    loaded by seeking to its columns, without reading the others, and
+    uncompressed columns are memory-mapped.
+    """
+    MAGIC = "NETSIM-RESULTS\n"
+    VERSION = 1
+    EXTENSION = ".nsr"
+    DTYPE = "<f8"
+    # Length of the JSON header
+    HEADER_LENGTH = struct.Struct("<Q")
+
+    def __init__(self, filename):
+        """
+        Opens a results file for reading
+
+        Args:
+            filename (str):     File written by ResultsFile.write.
+        """
+        self.filename = filename
+        self.file = open(filename, "rb")
+        if self.file.read(len(self.MAGIC)) != self.MAGIC:
+            self.file.close()
+            raise ValueError("%s is not a results file." % filename)
+        length, = self.HEADER_LENGTH.unpack(
+            self.file.read(self.HEADER_LENGTH.size))
+        self.header = json.loads(self.file.read(length))
+        # Columns are at offsets relative to the end of the header
+        self.data_offset = self.file.tell()
+        # { metric : { identifier : series header } }
+        self.index = {}
+        for series in self.header["series"]:
+            self.index.setdefault(series["metric"], {})[
+                series["identifier"]] = series
+        self.map = None
+
+    def __repr__(self):
+        return "ResultsFile[%s]" % self.filename
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # Loaded arrays keep the memory map open until they're gone
+        self.map = None
+        self.file.close()
+
+    @classmethod
+    def is_results_file(cls, filename):
+        """
+        Whether the file is a results file, rather than a metrics or graph
+        CSV file
+        """
+        with open(filename, "rb") as results_file:
+            return results_file.read(len(cls.MAGIC)) == cls.MAGIC
+
+    @classmethod
+    def write(cls, filename, metrics, compress=True):
+        """
+        Writes the series of every metric
+
+        :param filename: File to write
+        :type filename: str
+        :param metrics: { metric : { identifier : (times, values) } }
+        :type metrics: dict[str, dict[str, (numpy.ndarray, numpy.ndarray)]]
+        :param compress: Whether to zlib compress the columns
+        :type compress: bool
+        :return: Nothing
+        :rtype: None
+        """
+        cls.write_series(filename, sorted(metrics.items()), compress)
+
+    @classmethod
+    def write_series(cls, filename, metrics, compress=True):
+        """
+        Writes the series of the metrics one metric at a time, so only the
+        series of one metric need to be in memory. The columns go to a
+        temporary file first, the header preceding them is only known once
+        every metric is written.
+
+        :param filename: File to write
+        :type filename: str
+        :param metrics: (metric, { identifier : (times, values) }) pairs
+        :type metrics: iterable[(str, dict[str, (list, list)])]
+        :param compress: Whether to zlib compress the columns
+        :type compress: bool
+        :return: Nothing
+        :rtype: None
+        """
+        series = []
+        offset = 0
+        with tempfile.TemporaryFile() as columns:
+            for metric, data in metrics:
+                for identifier in sorted(data):
+                    times, values = data[identifier]
+                    entry = {"metric": metric, "identifier": identifier,
+                             "count": len(times)}
+                    for name, column in (("times", times),
+                                         ("values", values)):
+                        column = numpy.asarray(column,
+                                               dtype=cls.DTYPE).tobytes()
+                        if compress:
+                            column = zlib.compress(column)
+                        entry[name] = [offset, len(column)]
+                        offset += len(column)
+                        columns.write(column)
+                    series.append(entry)
+            header = json.dumps({"version": cls.VERSION, "dtype": cls.DTYPE,
+                                 "compression": "zlib" if compress else None,
+                                 "series": series})
+            columns.seek(0)
+            with open(filename, "wb") as results_file:
+                results_file.write(cls.MAGIC)
+                results_file.write(cls.HEADER_LENGTH.pack(len(header)))
+                results_file.write(header)
+                shutil.copyfileobj(columns, results_file)
+
+    def metrics(self):
+        """
+        :return: Names of the metrics in the file
+        :rtype: list[str]
+        """
+        return sorted(self.index)
+
+    def identifiers(self, metric):
+        """
+        :return: Flows or links the metric has a series for
+        :rtype: list[str]
+        """
+        return sorted(self.index.get(metric, {}))
+
+    def load(self, metric, identifier):
+        """
+        Loads one series
+
+        :param metric: Name of the metric
+        :type metric: str
+        :param identifier: Flow or link ID
+        :type identifier: str
+        :return: Times and values
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        series = self.index[metric][identifier]
+        return self.column(series["times"]), self.column(series["values"])
+
+    def series(self, metric):
+        """
+        Loads the series of every flow or link of a metric
+
+        :param metric: Name of the metric
+        :type metric: str
+        :return: { identifier : (times, values) }
+        :rtype: dict[str, (numpy.ndarray, numpy.ndarray)]
+        """
+        return {identifier: self.load(metric, identifier)
+                for identifier in self.identifiers(metric)}
+
+    def column(self, location):
+        offset, length = location
+        offset += self.data_offset
+        if self.header["compression"] == "zlib":
+            self.file.seek(offset)
+            data = zlib.decompress(self.file.read(length))
+            return numpy.frombuffer(data, dtype=self.header["dtype"])
+        if length == 0:
+            return numpy.zeros(0, dtype=self.header["dtype"])
+        if self.map is None:
+            self.map = mmap.mmap(self.file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        dtype = numpy.dtype(self.header["dtype"])
+        return numpy.frombuffer(self.map, dtype=dtype,
+                                count=length / dtype.itemsize, offset=offset)
@@ -0,0 +1,49 @@
+import heapq
+
+
+def dijkstra(graph, source, transit):
+    """
+    Shortest paths from the source to every reachable node
+
+    :param graph: Adjacency of the network, { node_id : [(neighbor_id, cost,
+                  link)] }
+    :type graph: dict[str, list[(str, float, Link)]]
+    :param source: ID of the node the paths start at
+    :type source: str
+    :param transit: IDs of the nodes that forward packets, paths only go
+                    through these (and end anywhere)
+    :type transit: set[str]
+    :return: Cost of the shortest paths to each node and the first links
+             taken on them, { node_id : (cost, [link]) }. The first link of
+             the list is the one of the first shortest path found, the others
+             start paths of equal cost. The source maps to (0, []).
+    :rtype: dict[str, (float, list[Link])]
+    """
+    # Tentative cost and first links of the nodes reached so far
+    costs = {source: 0}
+    first_links = {source: []}
+    paths = {}
+    # (cost, tie breaker, node_id)
+    heap = [(0, 0, source)]
+    pushed = 1
+    while heap:
+        cost, _, node_id = heapq.heappop(heap)
+        if node_id in paths:
+            continue
+        paths[node_id] = (cost, first_links[node_id])
+        if node_id != source and node_id not in transit:
+            continue
+        for neighbor_id, link_cost, link in graph.get(node_id, []):
+            if neighbor_id in paths:
+                continue
+            new_cost = cost + link_cost
+            links = first_links[node_id] if node_id != source else [link]
+            if neighbor_id not in costs or new_cost < costs[neighbor_id]:
+                costs[neighbor_id] = new_cost
+                first_links[neighbor_id] = list(links)
+                heapq.heappush(heap, (new_cost, pushed, neighbor_id))
+                pushed += 1
+            elif new_cost == costs[neighbor_id]:
+                first_links[neighbor_id].extend(
+                    l for l in links if l not in first_links[neighbor_id])
+    return paths
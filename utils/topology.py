@@ -0,0 +1,422 @@
+import math
+import random
+import xml.etree.ElementTree as et
+
+from utils.parser import Parser
+
+
+class TopologyType:
+    """
+    Topologies the generator can build
+    """
+    # Senders and receivers on either side of a single bottleneck link
+    DUMBBELL = "dumbbell"
+    # Chain of bottlenecks, a long flow crosses all of them and a cross flow
+    # shares each one
+    PARKING_LOT = "parkinglot"
+    # k-ary fat-tree data center network
+    FAT_TREE = "fattree"
+    # Random graph where close routers are more likely to be linked
+    WAXMAN = "waxman"
+    # Random scale-free graph grown by preferential attachment
+    BARABASI_ALBERT = "ba"
+
+    ALL = [DUMBBELL, PARKING_LOT, FAT_TREE, WAXMAN, BARABASI_ALBERT]
+
+
+class TrafficMatrix:
+    """
+    Who sends flows to whom
+    """
+    # The pairs the topology was built for, e.g. across the dumbbell
+    PAIRS = "pairs"
+    # Every host sends to one random host and receives from one
+    PERMUTATION = "permutation"
+    # Every other host sends to the first one
+    INCAST = "incast"
+    # A Poisson workload between all the hosts. Hosts have a single flow in
+    # a spec, so it's the way to get many flows per host.
+    WORKLOAD = "workload"
+
+    ALL = [PAIRS, PERMUTATION, INCAST, WORKLOAD]
+
+
+class TopologyGenerator(object):
+    def __init__(self, rate=10, access_rate=12.5, delay=10, buffer_size=64,
+                 dynamic_routing=True, routing=None, ecmp=False, seed=None):
+        """
+        Builds parameterised topologies and traffic as a spec, the same
+        element tree as the hand written files in flow_specs. The spec can
+        be written out or turned into hosts, routers and links directly.
+
+        Args:
+            rate (float):           Rate of the links between routers, in
+                                    Mbps.
+            access_rate (float):    Rate of the links of the hosts, in Mbps.
+            delay (float):          Propagation delay of every link, in ms.
+            buffer_size (float):    Buffer size of every link, in KB.
+            dynamic_routing (bool): Whether the routers route dynamically.
+            routing (str):          Routing protocol of the routers, the
+                                    parser's default if None.
+            ecmp (bool):            Whether the routers spread flows over
+                                    equal cost paths.
+            seed (int):             Seed of the random graphs and traffic.
+        """
+        self.rate = rate
+        self.access_rate = access_rate
+        self.delay = delay
+        self.buffer_size = buffer_size
+        self.dynamic_routing = dynamic_routing
+        self.routing = routing
+        self.ecmp = ecmp
+        self.random = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the nodes, links and flows generated so far
+        """
+        self.hosts = []
+        self.routers = []
+        # (node 1 ID, node 2 ID, rate)
+        self.links = []
+        # (source ID, destination ID) the topology was built for
+        self.pairs = []
+        # Flow and workload elements
+        self.traffic = []
+        # Workloads of the last built network, they're handed to the Network
+        self.workloads = []
+
+    def generate(self, topology, size, **kwargs):
+        """
+        Generates one of the topologies
+
+        :param topology: Topology type
+        :type topology: str
+        :param size: Hosts per side of a dumbbell, bottlenecks of a parking
+                     lot, k of a fat-tree or routers of a random graph
+        :type size: int
+        :return: Nothing
+        :rtype: None
+        """
+        if topology == TopologyType.DUMBBELL:
+            self.dumbbell(size)
+        elif topology == TopologyType.PARKING_LOT:
+            self.parking_lot(size)
+        elif topology == TopologyType.FAT_TREE:
+            self.fat_tree(size)
+        elif topology == TopologyType.WAXMAN:
+            self.waxman(size, **kwargs)
+        elif topology == TopologyType.BARABASI_ALBERT:
+            self.barabasi_albert(size, **kwargs)
+        else:
+            raise ValueError("Unknown topology %s. Known: %s"
+                             % (topology, ", ".join(TopologyType.ALL)))
+
+    def add_host(self, host_id=None):
+        host_id = host_id or "H%d" % (len(self.hosts) + 1)
+        self.hosts.append(host_id)
+        return host_id
+
+    def add_router(self, router_id=None):
+        router_id = router_id or "R%d" % (len(self.routers) + 1)
+        self.routers.append(router_id)
+        return router_id
+
+    def add_link(self, node1, node2, rate=None):
+        self.links.append((node1, node2, rate or self.rate))
+
+    def attach_hosts(self, router, count):
+        """
+        Connects new hosts to a router with access links
+
+        :return: IDs of the hosts
+        :rtype: list[str]
+        """
+        hosts = []
+        for _ in range(count):
+            host = self.add_host()
+            self.add_link(host, router, self.access_rate)
+            hosts.append(host)
+        return hosts
+
+    def dumbbell(self, hosts):
+        """
+        Hosts S1..Sn and T1..Tn on either side of a single bottleneck, Si
+        sends to Ti
+
+        :param hosts: Hosts on each side
+        :type hosts: int
+        """
+        left = self.add_router()
+        right = self.add_router()
+        self.add_link(left, right)
+        for i in range(1, hosts + 1):
+            source = self.add_host("S%d" % i)
+            destination = self.add_host("T%d" % i)
+            self.add_link(source, left, self.access_rate)
+            self.add_link(destination, right, self.access_rate)
+            self.pairs.append((source, destination))
+
+    def parking_lot(self, bottlenecks):
+        """
+        A chain of routers R1..Rn+1. S0 sends to T0 across every bottleneck,
+        Si sends to Ti across the i-th one only.
+
+        :param bottlenecks: Links of the chain
+        :type bottlenecks: int
+        """
+        routers = [self.add_router() for _ in range(bottlenecks + 1)]
+        for router1, router2 in zip(routers, routers[1:]):
+            self.add_link(router1, router2)
+        for i in range(bottlenecks + 1):
+            source = self.add_host("S%d" % i)
+            destination = self.add_host("T%d" % i)
+            if i == 0:
+                self.add_link(source, routers[0], self.access_rate)
+                self.add_link(destination, routers[-1], self.access_rate)
+            else:
+                self.add_link(source, routers[i - 1], self.access_rate)
+                self.add_link(destination, routers[i], self.access_rate)
+            self.pairs.append((source, destination))
+
+    def fat_tree(self, k):
+        """
+        k-ary fat-tree: k pods of k/2 edge and k/2 aggregation switches fully
+        connected to each other, (k/2)^2 core switches and k/2 hosts per edge
+        switch, k^3/4 hosts in all. Host i sends to host i + k^3/8, in the
+        other half of the pods.
+
+        :param k: Ports per switch, even
+        :type k: int
+        """
+        if k < 2 or k % 2:
+            raise ValueError("A fat-tree needs an even k, not %d." % k)
+        half = k / 2
+        cores = [self.add_router("C%d" % (i + 1)) for i in range(half ** 2)]
+        hosts = []
+        for pod in range(1, k + 1):
+            aggregations = [self.add_router("A%d.%d" % (pod, i + 1))
+                            for i in range(half)]
+            edges = [self.add_router("E%d.%d" % (pod, i + 1))
+                     for i in range(half)]
+            for edge in edges:
+                for aggregation in aggregations:
+                    self.add_link(edge, aggregation)
+                hosts.extend(self.attach_hosts(edge, half))
+            # Aggregation switch i is linked to the i-th group of cores
+            for i, aggregation in enumerate(aggregations):
+                for core in cores[i * half:(i + 1) * half]:
+                    self.add_link(aggregation, core)
+        middle = len(hosts) / 2
+        self.pairs.extend(zip(hosts[:middle], hosts[middle:]))
+
+    def waxman(self, routers, alpha=0.4, beta=0.4, hosts_per_router=1):
+        """
+        Waxman random graph. Routers are placed uniformly in the unit square
+        and each pair is linked with probability
+        beta * exp(-distance / (alpha * sqrt(2))). Components left apart are
+        linked to the rest so the network is connected.
+
+        :param routers: Number of routers
+        :type routers: int
+        :param alpha: Higher values make long links more likely
+        :type alpha: float
+        :param beta: Higher values make links more likely
+        :type beta: float
+        :param hosts_per_router: Hosts connected to each router
+        :type hosts_per_router: int
+        """
+        ids = [self.add_router() for _ in range(routers)]
+        positions = [(self.random.random(), self.random.random())
+                     for _ in ids]
+        # Union-find of the connected components
+        parents = range(routers)
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        scale = alpha * math.sqrt(2)
+        for i in range(routers):
+            for j in range(i + 1, routers):
+                distance = math.hypot(positions[i][0] - positions[j][0],
+                                      positions[i][1] - positions[j][1])
+                if self.random.random() < beta * math.exp(-distance / scale):
+                    self.add_link(ids[i], ids[j])
+                    parents[find(i)] = find(j)
+        for i in range(1, routers):
+            if find(i) != find(0):
+                j = self.random.choice([j for j in range(routers)
+                                        if find(j) == find(0)])
+                self.add_link(ids[i], ids[j])
+                parents[find(i)] = find(0)
+        self.attach_all(ids, hosts_per_router)
+
+    def barabasi_albert(self, routers, degree=2, hosts_per_router=1):
+        """
+        Barabasi-Albert random graph. Starts from a full mesh of degree + 1
+        routers, then every new router is linked to degree existing ones
+        chosen with probability proportional to their number of links.
+
+        :param routers: Number of routers
+        :type routers: int
+        :param degree: Links of every new router
+        :type degree: int
+        :param hosts_per_router: Hosts connected to each router
+        :type hosts_per_router: int
+        """
+        if not 0 < degree < routers:
+            raise ValueError("Barabasi-Albert degree must be between 1 and "
+                             "the number of routers - 1, not %d." % degree)
+        ids = [self.add_router() for _ in range(routers)]
+        # Every router appears once per link, sampling it is sampling
+        # proportionally to the degree
+        ends = []
+        for i in range(degree + 1):
+            for j in range(i + 1, degree + 1):
+                self.add_link(ids[i], ids[j])
+                ends.extend((i, j))
+        for i in range(degree + 1, routers):
+            targets = set()
+            while len(targets) < degree:
+                targets.add(self.random.choice(ends))
+            for j in sorted(targets):
+                self.add_link(ids[i], ids[j])
+                ends.extend((i, j))
+        self.attach_all(ids, hosts_per_router)
+
+    def attach_all(self, routers, hosts_per_router):
+        """
+        Connects hosts to every router of a random graph. Host i sends to
+        host i + n/2.
+        """
+        hosts = []
+        for router in routers:
+            hosts.extend(self.attach_hosts(router, hosts_per_router))
+        middle = len(hosts) / 2
+        self.pairs.extend(zip(hosts[:middle], hosts[middle:]))
+
+    def add_traffic(self, matrix=TrafficMatrix.PAIRS, amount=1, start=0.5,
+                    congestion_control="RENO", rate=None, count=None):
+        """
+        Adds flows between the hosts
+
+        :param matrix: Traffic matrix
+        :type matrix: str
+        :param amount: Data sent by each flow, in MB
+        :type amount: float
+        :param start: Start time of the flows, in s
+        :type start: float
+        :param congestion_control: Congestion control of the flows
+        :type congestion_control: str
+        :param rate: Arrival rate of the workload, in flows per s
+        :type rate: float
+        :param count: Number of flows of the workload
+        :type count: int
+        :return: Nothing
+        :rtype: None
+        """
+        if matrix == TrafficMatrix.WORKLOAD:
+            self.traffic.append(et.Element("workload", {
+                "id": "W%d" % (len(self.traffic) + 1),
+                "rate": str(rate or 10.), "start": str(start),
+                "count": str(count or 10 * len(self.hosts)),
+                "seed": str(self.random.randint(0, 2 ** 31)),
+                "congestion-control": congestion_control}))
+            return
+        if matrix == TrafficMatrix.PAIRS:
+            pairs = self.pairs
+        elif matrix == TrafficMatrix.PERMUTATION:
+            pairs = self.permutation()
+        elif matrix == TrafficMatrix.INCAST:
+            pairs = [(source, self.hosts[0]) for source in self.hosts[1:]]
+        else:
+            raise ValueError("Unknown traffic matrix %s. Known: %s"
+                             % (matrix, ", ".join(TrafficMatrix.ALL)))
+        for source, destination in pairs:
+            self.traffic.append(et.Element("flow", {
+                "id": "F%d" % (len(self.traffic) + 1),
+                "src": source, "dest": destination, "amount": str(amount),
+                "start": str(start),
+                "congestion-control": congestion_control}))
+
+    def permutation(self):
+        """
+        Random pairing of the hosts in which no host sends to itself
+
+        :return: (source ID, destination ID) of every host
+        :rtype: list[(str, str)]
+        """
+        if len(self.hosts) < 2:
+            return []
+        # A random cyclic order, every host sends to the next one
+        order = list(self.hosts)
+        self.random.shuffle(order)
+        return zip(order, order[1:] + order[:1])
+
+    def to_element(self):
+        """
+        :return: Spec of the generated network
+        :rtype: et.Element
+        """
+        spec = et.Element("spec")
+        hosts = et.SubElement(spec, "hosts")
+        for host in self.hosts:
+            et.SubElement(hosts, "host", {"id": host})
+        routers = et.SubElement(spec, "routers")
+        if self.routing is not None:
+            routers.set("routing", self.routing)
+        if self.ecmp:
+            routers.set("ecmp", str(True))
+        for router in self.routers:
+            et.SubElement(routers, "router", {
+                "id": router, "dynamic_routing": str(self.dynamic_routing)})
+        links = et.SubElement(spec, "links")
+        for i, (node1, node2, rate) in enumerate(self.links):
+            et.SubElement(links, "link", {
+                "id": "L%d" % (i + 1), "rate": str(rate),
+                "delay": str(self.delay),
+                "buffer-size": str(self.buffer_size),
+                "node1": node1, "node2": node2})
+        flows = [element for element in self.traffic if element.tag == "flow"]
+        if flows:
+            et.SubElement(spec, "flows").extend(flows)
+        workloads = [element for element in self.traffic
+                     if element.tag == "workload"]
+        if workloads:
+            et.SubElement(spec, "workloads").extend(workloads)
+        return spec
+
+    def write(self, output):
+        """
+        Writes the spec, indented like the files in flow_specs
+
+        :param output: File to write to
+        :type output: file
+        :return: Nothing
+        :rtype: None
+        """
+        spec = self.to_element()
+        output.write("<spec>\n")
+        for section in spec:
+            output.write("  <%s%s>\n" % (section.tag, "".join(
+                ' %s="%s"' % item for item in sorted(section.items()))))
+            for element in section:
+                output.write("    %s\n" % et.tostring(element).strip())
+            output.write("  </%s>\n" % section.tag)
+        output.write("</spec>\n")
+
+    def build(self):
+        """
+        Creates the hosts, routers and links of the generated network
+
+        :return: Hosts, routers and links
+        :rtype: (list[Host], list[Router], list[Link])
+        """
+        parser = Parser()
+        network = parser.parse_element(self.to_element())
+        self.workloads = parser.workloads
+        return network